@@ -0,0 +1,142 @@
+"""
+30 Segundos v3.1 - Agrupamento de Emits por Sala
+
+Eventos frequentes (acertos de palavra) não saem um a um para a sala:
+ficam numa janela curta e vão juntos num único pacote `event_batch`
+{"events": [[evento, dados], ...]}. Cada evento novo estende a janela
+em EMIT_BATCH_WINDOW, mas nenhum espera mais que EMIT_BATCH_MAX_DELAY
+desde o primeiro do lote. Um lote de um evento só sai como o próprio
+evento, então clientes antigos continuam funcionando.
+
+Os demais eventos da sala despacham o lote pendente antes, para a ordem
+vista pelos clientes ser a mesma de antes.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from socketio import AsyncServer
+
+# Segundos de espera por mais eventos antes de enviar o lote (0 desliga)
+EMIT_BATCH_WINDOW = float(os.environ.get('EMIT_BATCH_WINDOW', '0.05'))
+# Atraso máximo (segundos) que o agrupamento pode adicionar a um evento
+EMIT_BATCH_MAX_DELAY = float(os.environ.get('EMIT_BATCH_MAX_DELAY', '0.15'))
+
+BATCH_EVENT = 'event_batch'
+RATE_PERIOD = 5.0
+
+
+class PendingBatch:
+    __slots__ = ('events', 'first_at', 'handle')
+
+    def __init__(self, first_at: float):
+        self.events: List[Tuple[str, Any]] = []
+        self.first_at = first_at
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+
+class EmitCoalescer:
+    def __init__(self, sio: AsyncServer, events: Iterable[str],
+                 window: float = EMIT_BATCH_WINDOW, max_delay: float = EMIT_BATCH_MAX_DELAY):
+        self.sio = sio
+        self.events: FrozenSet[str] = frozenset(events)
+        self.window = window
+        self.max_delay = max(max_delay, window)
+        self._pending: Dict[str, PendingBatch] = {}
+        # sala -> [início do período, pacotes no período, pacotes/s do último]
+        self._rates: Dict[str, List[float]] = {}
+        self._tasks = set()
+        self.packets = 0
+        self.events_sent = 0
+        self.batches = 0
+
+    async def emit(self, event: str, data: Any = None, room: Optional[str] = None, **kwargs):
+        """Mesmo uso de sio.emit; eventos agrupáveis para uma sala entram no lote"""
+        if room is None or kwargs:
+            await self._send(event, data, room, **kwargs)
+            return
+
+        if event in self.events and self.window > 0:
+            self._add(room, event, data)
+            return
+
+        await self.flush(room)
+        await self._send(event, data, room)
+
+    def _add(self, room: str, event: str, data: Any):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        batch = self._pending.get(room)
+        if batch is None:
+            batch = self._pending[room] = PendingBatch(now)
+        else:
+            batch.handle.cancel()
+        batch.events.append((event, data))
+
+        delay = min(self.window, batch.first_at + self.max_delay - now)
+        batch.handle = loop.call_later(max(0.0, delay), self._flush_later, room)
+
+    def _flush_later(self, room: str):
+        task = asyncio.get_running_loop().create_task(self.flush(room))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, room: str):
+        batch = self._pending.pop(room, None)
+        if batch is None:
+            return
+        batch.handle.cancel()
+
+        if len(batch.events) == 1:
+            event, data = batch.events[0]
+            await self._send(event, data, room)
+        else:
+            self.batches += 1
+            self.events_sent += len(batch.events) - 1
+            await self._send(BATCH_EVENT, {'events': batch.events}, room)
+
+    def discard(self, room: str):
+        """Sala fechada: descarta o lote pendente e as métricas dela"""
+        batch = self._pending.pop(room, None)
+        if batch is not None:
+            batch.handle.cancel()
+        self._rates.pop(room, None)
+
+    async def _send(self, event: str, data: Any, room: Optional[str], **kwargs):
+        if room is not None and not kwargs:
+            self._count(room)
+        self.packets += 1
+        self.events_sent += 1
+        await self.sio.emit(event, data, room=room, **kwargs)
+
+    def _count(self, room: str):
+        now = time.monotonic()
+        rate = self._rates.get(room)
+        if rate is None:
+            self._rates[room] = [now, 1, 0.0]
+            return
+        rate[1] += 1
+        elapsed = now - rate[0]
+        if elapsed >= RATE_PERIOD:
+            rate[2] = rate[1] / elapsed
+            rate[0], rate[1] = now, 0
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        rooms = {}
+        for room, (started, count, last_rate) in self._rates.items():
+            elapsed = now - started
+            # Período atual ainda curto: usa o anterior, se houver
+            rooms[room] = round(last_rate if last_rate and elapsed < RATE_PERIOD
+                                else count / max(elapsed, 1.0), 2)
+        return {
+            "window_ms": self.window * 1000,
+            "max_delay_ms": self.max_delay * 1000,
+            "packets": self.packets,
+            "events": self.events_sent,
+            "batches": self.batches,
+            "pending_rooms": len(self._pending),
+            "packets_per_second": rooms
+        }
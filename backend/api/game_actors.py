@@ -0,0 +1,114 @@
+"""
+30 Segundos v3.1 - Fila de Comandos por Partida
+
+Cada partida tem uma fila própria (um "ator"): os comandos dela rodam um
+de cada vez, na ordem de chegada, inclusive os emits que cada um faz.
+Partidas diferentes continuam em paralelo. A tarefa que esvazia a fila
+só existe enquanto há comandos, então partidas paradas não custam nada.
+
+Comandos com `command_id` já visto na partida são descartados, o que
+cobre toque duplo no board e dois boards mandando a mesma ação.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+
+class GameActor:
+    __slots__ = ('queue', 'running', 'seen')
+
+    def __init__(self):
+        self.queue: Deque[Tuple[Callable[[], Awaitable], asyncio.Future]] = deque()
+        self.running = False
+        self.seen: "OrderedDict[str, None]" = OrderedDict()
+
+
+class GameActors:
+    def __init__(self, history: int = 128):
+        self.history = history
+        self._actors: Dict[str, GameActor] = {}
+        # O event loop só guarda referências fracas das tarefas
+        self._tasks: Set[asyncio.Task] = set()
+        self.commands = 0
+        self.duplicates = 0
+
+    async def submit(self, game_id: str, command_id: Optional[str],
+                     command: Callable[[], Awaitable]) -> bool:
+        """Enfileira e espera o comando; False se ele era repetido"""
+        actor = self._actors.get(game_id)
+        if actor is None:
+            actor = self._actors[game_id] = GameActor()
+
+        if command_id is not None:
+            if command_id in actor.seen:
+                self.duplicates += 1
+                return False
+            actor.seen[command_id] = None
+            if len(actor.seen) > self.history:
+                actor.seen.popitem(last=False)
+
+        future = asyncio.get_running_loop().create_future()
+        actor.queue.append((command, future))
+        if not actor.running:
+            actor.running = True
+            task = asyncio.create_task(self._drain(actor))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        try:
+            await future
+        except Exception:
+            # Falhou: a mesma ação pode ser tentada de novo
+            if command_id is not None:
+                actor.seen.pop(command_id, None)
+            raise
+        except asyncio.CancelledError:
+            # O comando foi cancelado (não só quem esperava): pode ir de novo
+            if command_id is not None and future.cancelled():
+                actor.seen.pop(command_id, None)
+            raise
+        return True
+
+    async def _drain(self, actor: GameActor):
+        try:
+            while actor.queue:
+                command, future = actor.queue.popleft()
+                self.commands += 1
+                try:
+                    await command()
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(None)
+                finally:
+                    # Cancelado no meio do comando: quem esperava não fica preso
+                    if not future.done():
+                        future.cancel()
+        finally:
+            # Cancelada, a tarefa leva junto os comandos que ainda esperavam;
+            # o próximo submit() começa outra
+            actor.running = False
+            while actor.queue:
+                actor.queue.popleft()[1].cancel()
+
+    def forget_commands(self, game_id: str, keep: Optional[str] = None):
+        """Esquece os ids vistos (partida reiniciada: as rodadas recomeçam)"""
+        actor = self._actors.get(game_id)
+        if actor is not None:
+            actor.seen.clear()
+            if keep is not None:
+                actor.seen[keep] = None
+
+    def close(self, game_id: str):
+        self._actors.pop(game_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "actors": len(self._actors),
+            "busy": sum(1 for a in self._actors.values() if a.running),
+            "commands": self.commands,
+            "duplicates": self.duplicates
+        }
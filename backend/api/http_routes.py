@@ -2,9 +2,10 @@
 
 import os
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import List, Optional
+from backend.api.static_cache import static_cache
 
 router = APIRouter()
 
@@ -125,7 +126,7 @@ async def get_qrcode(game_id: str, request: Request):
     base_url = str(request.base_url).rstrip('/')
     player_url = f"{base_url}/player?game={game_id}"
 
-    qr_base64 = qr_service.generate_qr_base64(player_url)
+    qr_base64 = await qr_service.get_data_url(player_url)
 
     return {
         "game_id": game_id,
@@ -158,63 +159,49 @@ async def get_current_round(game_id: str):
 # PÁGINAS HTML
 # ============================================
 
-def serve_html(filename: str):
-    """Serve um arquivo HTML"""
-    filepath = os.path.join(FRONTEND_PATH, filename)
-    if os.path.exists(filepath):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return HTMLResponse(content=content)
-    return HTMLResponse(
-        content=f"<h1>Arquivo não encontrado: {filename}</h1>",
-        status_code=404
-    )
+def serve_html(request: Request, filename: str):
+    """Serve um arquivo HTML (da memória, com ETag)"""
+    return static_cache.response(request, filename)
 
 
-@router.get("/", response_class=HTMLResponse)
-async def page_index():
+@router.api_route("/", methods=["GET", "HEAD"])
+async def page_index(request: Request):
     """Página inicial / Menu"""
-    return serve_html('index.html')
+    return serve_html(request, 'index.html')
 
 
-@router.get("/admin", response_class=HTMLResponse)
-async def page_admin():
+@router.api_route("/admin", methods=["GET", "HEAD"])
+async def page_admin(request: Request):
     """Página de administração"""
-    return serve_html('admin.html')
+    return serve_html(request, 'admin.html')
 
 
-@router.get("/board", response_class=HTMLResponse)
-async def page_board():
+@router.api_route("/board", methods=["GET", "HEAD"])
+async def page_board(request: Request):
     """Página do tabuleiro (TV)"""
-    return serve_html('board.html')
+    return serve_html(request, 'board.html')
 
 
-@router.get("/player", response_class=HTMLResponse)
-async def page_player():
+@router.api_route("/player", methods=["GET", "HEAD"])
+async def page_player(request: Request):
     """Página do jogador (celular)"""
-    return serve_html('player.html')
+    return serve_html(request, 'player.html')
 
 
 # ============================================
 # ARQUIVOS ESTÁTICOS
 # ============================================
 
-@router.get("/css/{filename}")
-async def serve_css(filename: str):
+@router.api_route("/css/{filename}", methods=["GET", "HEAD"])
+async def serve_css(request: Request, filename: str):
     """Serve arquivos CSS"""
-    filepath = os.path.join(FRONTEND_PATH, 'css', filename)
-    if os.path.exists(filepath):
-        return FileResponse(filepath, media_type='text/css')
-    raise HTTPException(status_code=404, detail="CSS não encontrado")
+    return static_cache.response(request, f'css/{filename}')
 
 
-@router.get("/js/{filename}")
-async def serve_js(filename: str):
+@router.api_route("/js/{filename}", methods=["GET", "HEAD"])
+async def serve_js(request: Request, filename: str):
     """Serve arquivos JavaScript"""
-    filepath = os.path.join(FRONTEND_PATH, 'js', filename)
-    if os.path.exists(filepath):
-        return FileResponse(filepath, media_type='application/javascript')
-    raise HTTPException(status_code=404, detail="JS não encontrado")
+    return static_cache.response(request, f'js/{filename}')
 
 
 @router.get("/assets/{path:path}")
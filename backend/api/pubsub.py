@@ -0,0 +1,160 @@
+"""
+30 Segundos v3.1 - Fila de Mensagens do Socket.IO entre Workers
+
+Com SOCKETIO_BROKER definido, o AsyncServer usa um client manager
+pub/sub: emits para `room=game_id` chegam aos clientes conectados em
+qualquer worker. URLs aceitas:
+
+    redis://host:6379/0     Redis (pacote redis)
+    amqp://host:5672//      RabbitMQ (pacote aio-pika)
+    tcp://127.0.0.1:8600    broker local deste módulo (LocalBroker)
+    unix:///tmp/30s.sock    broker local via socket Unix
+    memory://canal          vários servidores no mesmo processo (testes)
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from backend.services.log import get_logger
+
+SOCKETIO_BROKER = os.environ.get('SOCKETIO_BROKER', '')
+
+log = get_logger('pubsub')
+
+# Fila por assinante dos canais memory://
+_memory_channels: Dict[str, List[asyncio.Queue]] = {}
+
+
+class LocalBroker:
+    """
+    Broker pub/sub mínimo: repassa cada linha recebida de um cliente
+    para todos os outros. Serve para rodar vários workers numa máquina
+    sem Redis. Mensagens são JSON numa linha (o base64 dos anexos
+    binários já é feito pelo manager).
+    """
+
+    def __init__(self):
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self.messages = 0
+
+    async def start(self, url: str):
+        """Começa a aceitar conexões; retorna o asyncio.Server"""
+        parsed = urlparse(url)
+        if parsed.scheme == 'unix':
+            return await asyncio.start_unix_server(
+                self._handle, path=parsed.path, limit=2 ** 24)
+        return await asyncio.start_server(
+            self._handle, parsed.hostname, parsed.port, limit=2 ** 24)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.messages += 1
+                for other in list(self._writers):
+                    if other is not writer:
+                        other.write(line)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+class AsyncLocalBrokerManager(AsyncPubSubManager):
+    """Client manager ligado ao LocalBroker (tcp:// ou unix://)"""
+
+    name = 'asynclocalbroker'
+
+    def __init__(self, url: str, channel: str = 'socketio', write_only: bool = False,
+                 logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only,
+                         logger=logger, json=json)
+        self.url = url
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connecting: Optional[asyncio.Lock] = None
+
+    async def _connect(self):
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        async with self._connecting:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            parsed = urlparse(self.url)
+            if parsed.scheme == 'unix':
+                self._reader, self._writer = await asyncio.open_unix_connection(
+                    parsed.path, limit=2 ** 24)
+            else:
+                self._reader, self._writer = await asyncio.open_connection(
+                    parsed.hostname, parsed.port, limit=2 ** 24)
+
+    async def _publish(self, data):
+        await self._connect()
+        self._writer.write(self.json.dumps(data).encode('utf-8') + b'\n')
+        await self._writer.drain()
+
+    async def _listen(self):
+        retry = 1
+        while True:
+            try:
+                await self._connect()
+                line = await self._reader.readline()
+                if not line:
+                    raise ConnectionError('broker fechou a conexão')
+                retry = 1
+                yield line
+            except (ConnectionError, OSError) as e:
+                log.warning('broker_unreachable', url=self.url, retry_s=retry, error=str(e))
+                self._writer = None
+                await asyncio.sleep(retry)
+                retry = min(retry * 2, 30)
+
+
+class AsyncMemoryManager(AsyncPubSubManager):
+    """Fila em memória entre servidores do mesmo processo (testes/benchmarks)"""
+
+    name = 'asyncmemory'
+
+    def __init__(self, channel: str = 'socketio', write_only: bool = False,
+                 logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only,
+                         logger=logger, json=json)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        _memory_channels.setdefault(channel, []).append(self._queue)
+
+    async def _publish(self, data):
+        for queue in _memory_channels[self.channel]:
+            if queue is not self._queue:
+                queue.put_nowait(data)
+
+    async def _listen(self):
+        while True:
+            yield await self._queue.get()
+
+
+def create_client_manager(url: str = SOCKETIO_BROKER) -> Optional[socketio.AsyncManager]:
+    """Client manager para o broker da URL; None = só este processo"""
+    if not url:
+        return None
+
+    scheme = urlparse(url).scheme
+    log.info('broker_selected', scheme=scheme)
+    if scheme in ('redis', 'rediss'):
+        return socketio.AsyncRedisManager(url)
+    if scheme in ('amqp', 'amqps'):
+        return socketio.AsyncAioPikaManager(url)
+    if scheme in ('tcp', 'unix'):
+        return AsyncLocalBrokerManager(url)
+    if scheme == 'memory':
+        return AsyncMemoryManager(channel=urlparse(url).netloc or 'socketio')
+
+    raise ValueError(f"SOCKETIO_BROKER não suportado: {url}")
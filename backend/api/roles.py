@@ -0,0 +1,88 @@
+"""
+30 Segundos v3.1 - Salas por Papel
+
+Cada cliente entra só na sala do seu papel ("{id}:board", "{id}:player",
+"{id}:spectator"); não existe uma sala com a partida inteira. Os eventos
+da partida saem por papel, cada um com só o que aquela tela usa:
+
+  - board: placar, cronômetro e acertos; as palavras da carta só chegam
+    no fim do tempo, para a confirmação
+  - player (celular de quem joga): a carta, o estado e o cronômetro
+  - spectator: o mesmo que o board, sem nunca receber as palavras
+
+O estado incremental ('state') vai para todos os papéis, senão as
+versões de quem ficou sem um delta deixariam de bater.
+
+Cada projeção é montada uma vez por evento, não uma vez por cliente.
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+ROLES = ('board', 'player', 'spectator')
+DEFAULT_ROLE = 'player'
+
+
+def role_room(game_id: str, role: str) -> str:
+    return f'{game_id}:{role}'
+
+
+def normalize_role(role: Optional[str]) -> str:
+    return role if role in ROLES else DEFAULT_ROLE
+
+
+def _without_card(round_data: Optional[dict]) -> Optional[dict]:
+    if not round_data or round_data.get('card') is None:
+        return round_data
+    # O dict da rodada é compartilhado (cache do modelo): cria outro
+    return {key: value for key, value in round_data.items() if key != 'card'}
+
+
+def _state_only(data: dict) -> dict:
+    return {'state': data.get('state')}
+
+
+def _round_ready(data: dict) -> Dict[str, Any]:
+    round_data = data.get('round') or {}
+    hidden = {**data, 'round': _without_card(round_data)}
+    return {
+        # Board que entra depois do fim do tempo precisa da carta para confirmar
+        'board': data if round_data.get('time_up') else hidden,
+        'player': data,
+        'spectator': hidden,
+    }
+
+
+def _time_up(data: dict) -> Dict[str, Any]:
+    public = {'state': data.get('state'), 'player_hits': data.get('player_hits')}
+    return {
+        'board': {**public, 'card': data.get('card')},
+        'player': _state_only(data),
+        'spectator': public,
+    }
+
+
+def _round_confirmed(data: dict) -> Dict[str, Any]:
+    return {'board': data, 'player': _state_only(data), 'spectator': data}
+
+
+def _screens_only(data: Any) -> Dict[str, Any]:
+    # Avisos que só as telas mostram; o celular de quem joga não usa
+    return {'board': data, 'player': None, 'spectator': data}
+
+
+PROJECTIONS: Dict[str, Callable[[Any], Dict[str, Any]]] = {
+    'round_ready': _round_ready,
+    'time_up': _time_up,
+    'round_confirmed': _round_confirmed,
+    'player_connected': _screens_only,
+    'player_viewing_card': _screens_only,
+    'player_hit': _screens_only,
+}
+
+
+def project(event: str, data: Any) -> Dict[str, Any]:
+    """Payload de cada papel para o evento (None = papel não recebe)"""
+    projection = PROJECTIONS.get(event)
+    if projection is None:
+        return {role: data for role in ROLES}
+    return projection(data)
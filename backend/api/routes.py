@@ -2,11 +2,10 @@
 30 Segundos v3.1 - Rotas da API REST
 """
 
-import qrcode
-import base64
-from io import BytesIO
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Response
 from backend.services.game_service import game_service
+from backend.services.qr_service import qr_service
+from backend.api.static_cache import etag_matches
 
 router = APIRouter()
 
@@ -14,21 +13,21 @@ router = APIRouter()
 @router.get("/games")
 async def list_games():
     """Lista todas as partidas"""
-    games = game_service.get_all_games()
+    games = await game_service.load_all()
     return {"games": [g.to_dict() for g in games]}
 
 
 @router.post("/games")
 async def create_game(data: dict):
     """Cria uma nova partida"""
-    game = game_service.create_game(data)
+    game = await game_service.add_game(data)
     return game.to_dict()
 
 
 @router.get("/games/{game_id}")
 async def get_game(game_id: str):
     """Obtém uma partida específica"""
-    game = game_service.get_game(game_id)
+    game = await game_service.load(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Partida não encontrada")
     return game.to_dict()
@@ -37,55 +36,129 @@ async def get_game(game_id: str):
 @router.delete("/games/{game_id}")
 async def delete_game(game_id: str):
     """Remove uma partida"""
-    success = game_service.delete_game(game_id)
+    async with game_service.exclusive(game_id):
+        success = game_service.delete_game(game_id)
     if not success:
         raise HTTPException(status_code=404, detail="Partida não encontrada")
     return {"success": True}
 
 
-@router.get("/games/{game_id}/qrcode")
-async def get_qrcode(game_id: str, request: Request):
-    """Gera QR Code para o jogador acessar"""
-    game = game_service.get_game(game_id)
+@router.get("/games/{game_id}/words")
+async def get_words_remaining(game_id: str):
+    """Informa quantas palavras ainda não saíram no baralho da partida"""
+    from backend.services.word_service import word_service
+
+    game = await game_service.load(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Partida não encontrada")
 
-    # Obtém o host da requisição
-    host = request.headers.get("host", "localhost:8000")
+    stats = word_service.get_remaining_words(game.id)
+    if stats is None:
+        stats = {"remaining": 0, "total": 0}
 
-    # URL do jogador
-    player_url = f"http://{host}/player?game={game_id}"
+    return {"game_id": game.id, **stats}
 
-    # Gera QR Code
-    qr = qrcode.QRCode(version=1, box_size=10, border=2)
-    qr.add_data(player_url)
-    qr.make(fit=True)
 
-    img = qr.make_image(fill_color="black", back_color="white")
+def player_url_for(request: Request, game_id: str) -> str:
+    """URL que o celular do jogador abre ao ler o QR Code"""
+    host = request.headers.get("host", "localhost:8000")
+    return f"http://{host}/player?game={game_id}"
 
-    # Converte para base64
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    img_str = base64.b64encode(buffer.getvalue()).decode()
 
+@router.get("/games/{game_id}/qrcode")
+async def get_qrcode(game_id: str, request: Request):
+    """QR Code (data URL), a URL da imagem PNG e a do jogador"""
+    game = await game_service.load(game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Partida não encontrada")
+
+    player_url = player_url_for(request, game.id)
     return {
-        "qr_code": f"data:image/png;base64,{img_str}",
+        "qr_code": await qr_service.get_data_url(player_url),
+        "qr_url": f"/api/games/{game.id}/qrcode.png",
         "player_url": player_url
     }
 
 
+@router.get("/games/{game_id}/qrcode.png")
+async def get_qrcode_png(game_id: str, request: Request):
+    """Imagem PNG do QR Code para o jogador acessar"""
+    game = await game_service.load(game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Partida não encontrada")
+
+    entry = await qr_service.get_png(player_url_for(request, game.id))
+    if entry is None:
+        raise HTTPException(status_code=503, detail="QR Code indisponível")
+
+    png, etag = entry
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=png, media_type="image/png", headers=headers)
+
+
+@router.get("/stats/word-pools")
+async def word_pool_stats():
+    """Memória dos baralhos de palavras por jogo"""
+    from backend.services.word_service import word_service
+
+    return word_service.get_pool_memory_stats()
+
+
+@router.get("/stats/games")
+async def game_stats():
+    """Partidas por estado e o que o reaper já liberou"""
+    return game_service.reaper_stats()
+
+
+@router.get("/stats/emits")
+async def emit_stats():
+    """Pacotes enviados por sala (pacotes/s) e quanto o agrupamento juntou"""
+    from backend.api.socket_events import emitter
+
+    return emitter.stats() if emitter else {}
+
+
+@router.get("/stats/sessions")
+async def session_stats():
+    """Conexões em partidas neste processo, por papel"""
+    from backend.api.socket_events import sessions
+
+    return sessions.stats() if sessions is not None else {}
+
+
+@router.get("/stats/logs")
+async def logging_stats():
+    """Fila da thread de logs e registros descartados"""
+    from backend.services.log import log_stats
+
+    return log_stats()
+
+
+@router.post("/word-banks/reload")
+async def reload_word_banks():
+    """Relê os bancos de palavras alterados sem reiniciar o servidor"""
+    from backend.services.word_service import word_service
+
+    result = await word_service.reload_word_banks_async()
+    return {"success": True, **result}
+
+
 @router.get("/themes")
 async def list_themes():
     """Lista temas disponíveis"""
     from backend.services.word_service import word_service
 
+    store = word_service.store
     themes = []
-    for theme_id, words in word_service.word_banks.items():
+    for theme_id in store.theme_ids():
         if theme_id != 'desafios':
             themes.append({
                 "id": theme_id,
                 "name": theme_id.replace("_", " ").title(),
-                "word_count": len(words)
+                "word_count": store.theme_size(theme_id)
             })
 
     return {"themes": themes}
@@ -0,0 +1,105 @@
+"""
+30 Segundos v3.1 - Serialização de Respostas e Pacotes
+
+Escolhe o codificador JSON usado pelo HTTP e pelo Socket.IO. Com orjson
+instalado ele é usado automaticamente; SERIALIZER=json força o módulo
+padrão. SOCKETIO_SERIALIZER=msgpack troca os pacotes do Socket.IO para
+msgpack (os clientes precisam do socket.io-msgpack-parser).
+"""
+
+import json
+import os
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from backend.services.log import get_logger
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack  # noqa: F401
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+SERIALIZER = os.environ.get('SERIALIZER', 'orjson' if HAS_ORJSON else 'json')
+SOCKETIO_SERIALIZER = os.environ.get('SOCKETIO_SERIALIZER', 'default')
+
+log = get_logger('serialization')
+
+if SERIALIZER == 'orjson' and not HAS_ORJSON:
+    log.warning('orjson_missing', fallback='json')
+    SERIALIZER = 'json'
+
+if SOCKETIO_SERIALIZER == 'msgpack' and not HAS_MSGPACK:
+    log.warning('msgpack_missing', fallback='json')
+    SOCKETIO_SERIALIZER = 'default'
+
+
+if SERIALIZER == 'orjson':
+    def dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def dumps(obj: Any, **kwargs) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(data, **kwargs) -> Any:
+        return orjson.loads(data)
+
+    def dumps_sized(obj: Any, **kwargs) -> Tuple[str, int]:
+        data = orjson.dumps(obj)
+        return data.decode('utf-8'), len(data)
+else:
+    def dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def dumps(obj: Any, **kwargs) -> str:
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(data, **kwargs) -> Any:
+        return json.loads(data, **kwargs)
+
+    def dumps_sized(obj: Any, **kwargs) -> Tuple[str, int]:
+        # ensure_ascii padrão: um caractere por byte
+        text = dumps(obj, **kwargs)
+        return text, len(text)
+
+
+class JSONModule:
+    """
+    Interface de módulo `json` (dumps/loads) para o Socket.IO.
+
+    O Socket.IO codifica cada emit uma vez, mesmo para uma sala inteira,
+    chamando dumps([evento, dados...]). Com `on_event` definido, ele
+    recebe (evento, bytes) do texto já codificado, sem codificar de novo.
+    """
+    on_event: Optional[Callable[[str, int], None]] = None
+    loads = staticmethod(loads)
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs) -> str:
+        on_event = JSONModule.on_event
+        if on_event is None or type(obj) is not list or not obj or type(obj[0]) is not str:
+            return dumps(obj, **kwargs)
+        text, size = dumps_sized(obj, **kwargs)
+        on_event(obj[0], size)
+        return text
+
+
+class FastJSONResponse(JSONResponse):
+    """Resposta JSON usando o codificador configurado"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
+
+
+def socketio_options() -> dict:
+    """Argumentos de serialização para socketio.AsyncServer"""
+    if SOCKETIO_SERIALIZER == 'msgpack':
+        return {'serializer': 'msgpack'}
+    return {'json': JSONModule}
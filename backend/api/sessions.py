@@ -0,0 +1,86 @@
+"""
+30 Segundos v3.1 - Sessões Socket.IO
+
+Registro das conexões que entraram em uma partida (join_game): sid ->
+sessão (partida, papel, jogador) e partida -> sids, com a contagem por
+papel mantida a cada entrada e saída. Tudo O(1) por operação, inclusive
+a desconexão, que não precisa procurar em que partida o sid estava.
+
+Depois do join os handlers usam a partida da sessão, não o `game_id`
+que o cliente manda em cada evento.
+"""
+
+from typing import Dict, List, Optional, Set
+
+
+class Session:
+    __slots__ = ('sid', 'game_id', 'role', 'player')
+
+    def __init__(self, sid: str, game_id: str, role: str, player: Optional[str] = None):
+        self.sid = sid
+        self.game_id = game_id
+        self.role = role
+        self.player = player
+
+
+class SessionRegistry:
+    def __init__(self):
+        self._by_sid: Dict[str, Session] = {}
+        self._by_game: Dict[str, Set[str]] = {}
+        self._presence: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_sid)
+
+    def get(self, sid: str) -> Optional[Session]:
+        return self._by_sid.get(sid)
+
+    def bind(self, sid: str, game_id: str, role: str,
+             player: Optional[str] = None) -> Optional[Session]:
+        """Associa o sid à partida; retorna a sessão anterior (já desfeita)"""
+        previous = self.unbind(sid)
+        self._by_sid[sid] = Session(sid, game_id, role, player)
+        self._by_game.setdefault(game_id, set()).add(sid)
+        counts = self._presence.setdefault(game_id, {})
+        counts[role] = counts.get(role, 0) + 1
+        return previous
+
+    def unbind(self, sid: str) -> Optional[Session]:
+        session = self._by_sid.pop(sid, None)
+        if session is None:
+            return None
+
+        sids = self._by_game.get(session.game_id)
+        if sids is not None:
+            sids.discard(sid)
+            if not sids:
+                del self._by_game[session.game_id]
+                del self._presence[session.game_id]
+                return session
+        self._presence[session.game_id][session.role] -= 1
+        return session
+
+    def sids(self, game_id: str) -> Set[str]:
+        """Sids da partida (não alterar o conjunto retornado)"""
+        return self._by_game.get(game_id, set())
+
+    def presence(self, game_id: str) -> Dict[str, int]:
+        """Conexões ativas da partida por papel, neste processo"""
+        return {role: count for role, count in self._presence.get(game_id, {}).items() if count}
+
+    def drop_game(self, game_id: str) -> List[Session]:
+        """Partida removida: desfaz as sessões dela"""
+        sessions = [self._by_sid.pop(sid) for sid in self._by_game.pop(game_id, ())]
+        self._presence.pop(game_id, None)
+        return sessions
+
+    def stats(self) -> dict:
+        roles: Dict[str, int] = {}
+        for counts in self._presence.values():
+            for role, count in counts.items():
+                roles[role] = roles.get(role, 0) + count
+        return {
+            "sessions": len(self._by_sid),
+            "games": len(self._by_game),
+            "by_role": roles
+        }
@@ -0,0 +1,172 @@
+"""
+30 Segundos v3.1 - Proxy de Shards
+
+Proxy TCP na frente dos workers do modo shardeado. Lê só a linha e os
+cabeçalhos de cada requisição e escolhe o worker:
+
+  - /api/games/{id}...        -> shard do id
+  - /socket.io/?...&game=id   -> shard do id (query enviada pelo cliente)
+  - GET /api/games            -> todos os shards, listas concatenadas
+  - resto (páginas, criar partida, temas) -> rodízio
+
+Requisições comuns seguem com `Connection: close`, assim a próxima
+requisição do navegador passa de novo pelo roteamento. Upgrades
+(WebSocket) viram um túnel nos dois sentidos.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from backend.services.sharding import shard_for
+from backend.services.log import get_logger
+
+GAME_PATH = re.compile(r'^/api/games/([A-Za-z0-9]+)')
+HEADER_LIMIT = 64 * 1024
+HOP_HEADERS = ('connection', 'keep-alive')
+
+log = get_logger('proxy')
+
+
+class ShardProxy:
+    def __init__(self, backends: List[Tuple[str, int]]):
+        self.backends = backends
+        self._round_robin = itertools.cycle(range(len(backends)))
+        self.requests = 0
+
+    async def start(self, host: str, port: int):
+        """Começa a aceitar conexões; retorna o asyncio.Server"""
+        return await asyncio.start_server(
+            self._handle, host, port, limit=HEADER_LIMIT)
+
+    def route(self, method: str, target: str) -> Optional[int]:
+        """Shard da requisição; None = todos (listagem de partidas)"""
+        parts = urlsplit(target)
+
+        match = GAME_PATH.match(parts.path)
+        if match:
+            return shard_for(match.group(1), len(self.backends))
+
+        if parts.path.startswith('/socket.io'):
+            game = parse_qs(parts.query).get('game')
+            if game and game[0]:
+                return shard_for(game[0], len(self.backends))
+            # Sem partida o polling precisa sempre do mesmo worker
+            return 0
+
+        if method == 'GET' and parts.path.rstrip('/') == '/api/games':
+            return None
+
+        return next(self._round_robin)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+
+        self.requests += 1
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            writer.close()
+            return
+
+        headers = [line for line in lines[1:] if line]
+        upgrade = any(line.lower().startswith('upgrade:') for line in headers)
+
+        shard = self.route(method, target)
+        if shard is None:
+            await self._list_games(writer)
+            return
+
+        if not upgrade:
+            headers = [line for line in headers
+                       if line.split(':', 1)[0].strip().lower() not in HOP_HEADERS]
+            headers.append('Connection: close')
+
+        peer = writer.get_extra_info('peername')
+        if peer:
+            headers.append(f'X-Forwarded-For: {peer[0]}')
+
+        host, port = self.backends[shard]
+        try:
+            up_reader, up_writer = await asyncio.open_connection(host, port)
+        except OSError as e:
+            log.warning('shard_unavailable', shard=shard, error=str(e))
+            writer.write(b'HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n'
+                         b'Connection: close\r\n\r\n')
+            await writer.drain()
+            writer.close()
+            return
+
+        up_writer.write(('\r\n'.join([lines[0], *headers]) + '\r\n\r\n').encode('latin-1'))
+
+        if upgrade:
+            await asyncio.gather(
+                self._pipe(reader, up_writer),
+                self._pipe(up_reader, writer),
+            )
+            return
+
+        # Resposta completa = worker fechou; não espera o navegador fechar
+        upload = asyncio.create_task(self._pipe(reader, up_writer))
+        await self._pipe(up_reader, writer)
+        upload.cancel()
+        writer.close()
+        up_writer.close()
+
+    @staticmethod
+    async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # Fecha este sentido; o outro termina quando o par fechar
+            try:
+                if writer.can_write_eof():
+                    writer.write_eof()
+                else:
+                    writer.close()
+            except (OSError, RuntimeError):
+                writer.close()
+
+    async def _fetch_games(self, host: str, port: int) -> list:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f'GET /api/games HTTP/1.1\r\nHost: {host}:{port}\r\n'
+                     f'Connection: close\r\n\r\n'.encode('latin-1'))
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        body = response.split(b'\r\n\r\n', 1)[1]
+        return json.loads(body).get('games', [])
+
+    async def _list_games(self, writer: asyncio.StreamWriter):
+        results = await asyncio.gather(
+            *(self._fetch_games(host, port) for host, port in self.backends),
+            return_exceptions=True)
+
+        games = []
+        for result in results:
+            if isinstance(result, Exception):
+                log.error('shard_list_failed', error=str(result))
+                continue
+            games.extend(result)
+
+        body = json.dumps({"games": games}).encode('utf-8')
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                     + f'Content-Length: {len(body)}\r\n'.encode('latin-1')
+                     + b'Connection: close\r\n\r\n' + body)
+        await writer.drain()
+        writer.close()
@@ -2,135 +2,364 @@
 30 Segundos v3.1 - Eventos Socket.IO
 """
 
+import asyncio
+import functools
+import os
+import time
+from typing import Optional
+
 from socketio import AsyncServer
+from socketio.async_pubsub_manager import AsyncPubSubManager
 from backend.services.game_service import game_service
+from backend.services.metrics import metrics
+from backend.services.log import get_logger
+from backend.api.state_sync import GameStateSync
+from backend.api.game_actors import GameActors
+from backend.api.emit_coalescer import EmitCoalescer
+from backend.api.serialization import JSONModule
+from backend.api.roles import ROLES, normalize_role, project, role_room
+from backend.api.sessions import Session, SessionRegistry
+
+# Eventos frequentes que podem sair agrupados para a sala (timer_tick
+# não: sai a cada poucos segundos e atrasá-lo piora a correção do relógio)
+COALESCED_EVENTS = ('player_hit',)
+
+# Agrupador de emits e sessões da última chamada a register_socket_events
+emitter: Optional[EmitCoalescer] = None
+sessions: Optional[SessionRegistry] = None
+
+# Eventos que espectadores também podem mandar (não alteram a partida)
+READ_ONLY_EVENTS = ('sync_state',)
+
+# Segundos entre os ticks do cronômetro enviados aos clientes (0 desliga)
+TIMER_TICK_INTERVAL = float(os.environ.get('TIMER_TICK_INTERVAL', '5'))
+
+log = get_logger('socket')
+# Um registro por comando, com o tempo gasto (DEBUG)
+command_log = get_logger('socket.command')
 
 
 def register_socket_events(sio: AsyncServer):
     """Registra todos os eventos do Socket.IO"""
+    global emitter, sessions
+    emitter = EmitCoalescer(sio, COALESCED_EVENTS)
+    # Tamanho de cada pacote, medido na codificação que o Socket.IO já faz
+    JSONModule.on_event = metrics.record_emit
+    sessions = SessionRegistry()
+
+    # Com vários workers, as versões do estado precisam valer em todos
+    state_sync = GameStateSync(
+        content_versions=isinstance(sio.manager, AsyncPubSubManager))
+
+    async def leave_session(sid: str) -> Optional[Session]:
+        session = sessions.unbind(sid)
+        if session and session.game_id in game_service.games:
+            await game_service.adjust_clients(session.game_id, session.role, -1)
+        return session
+
+    def release_game(game_id: str):
+        """Partida removida: esquece o estado e fecha a sala"""
+        state_sync.forget(game_id)
+        game_service.timers.cancel(('tick', game_id))
+        for role in ROLES:
+            emitter.discard(role_room(game_id, role))
+        sessions.drop_game(game_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(close_rooms(game_id))
+
+    async def close_rooms(game_id: str):
+        for role in ROLES:
+            await sio.close_room(role_room(game_id, role))
+
+    game_service.add_delete_listener(release_game)
+
+    async def broadcast(game_id: str, event: str, data):
+        """Emite para cada papel a sua projeção do evento"""
+        for role, payload in project(event, data).items():
+            if payload is not None:
+                await emitter.emit(event, payload, room=role_room(game_id, role))
+
+    actors = GameActors()
+    game_service.add_delete_listener(actors.close)
+
+    async def game_exists(game_id: str) -> bool:
+        """
+        A cópia local basta (o comando relê a partida sob a trava); só uma
+        partida criada em outro worker precisa ser buscada no store
+        """
+        return bool(game_service.get_game(game_id) or await game_service.load(game_id))
+
+    def locked_command(game_id: str, command):
+        """Comando sob a trava da partida (estado compartilhado entre workers)"""
+        async def locked():
+            async with game_service.exclusive(game_id):
+                await command()
+        return locked
+
+    async def queue_command(name: str, game_id: str, data: dict, command):
+        accepted = await actors.submit(game_id, data.get('command_id'),
+                                       locked_command(game_id, command))
+        if not accepted:
+            log.info('duplicate_command', event=name, game_id=game_id,
+                     command_id=data.get('command_id'))
+
+    def game_command(handler):
+        """
+        Roda `handler(sid, data, session)` na fila da partida da sessão.
+        Exige join_game antes; espectadores só mandam READ_ONLY_EVENTS.
+        `command_id` repetido é descartado; `round` diferente da rodada
+        atual também (comando atrasado de uma rodada que já acabou).
+        """
+        name = handler.__name__
+
+        @functools.wraps(handler)
+        async def wrapper(sid, data):
+            data = data or {}
+            session = sessions.get(sid)
+            if session is None or not await game_exists(session.game_id):
+                await sio.emit('error', {'message': 'Partida não encontrada'}, to=sid)
+                return
+            if session.role == 'spectator' and name not in READ_ONLY_EVENTS:
+                log.info('spectator_command_ignored', event=name, game_id=session.game_id, sid=sid)
+                return
+
+            async def command():
+                game = game_service.get_game(session.game_id)
+                expected = data.get('round')
+                if game and expected is not None and expected != game.current_round:
+                    log.info('stale_command', event=name, game_id=session.game_id,
+                             round=expected, current_round=game.current_round)
+                    return
+                started = time.perf_counter()
+                await handler(sid, data, session)
+                command_log.debug('command', event=name, game_id=session.game_id,
+                                  ms=(time.perf_counter() - started) * 1000)
+
+            await queue_command(name, session.game_id, data, command)
+
+        return wrapper
+
+    async def emit_time_up(game_id: str, result: dict):
+        game_service.timers.cancel(('tick', game_id))
+        await broadcast(game_id, 'time_up', {
+            'state': state_sync.delta(game_service.get_game(game_id)),
+            'player_hits': result['player_hits'],
+            'card': result['round'].get('card')
+        })
+
+    async def round_deadline(game_id: str, round_number: int):
+        """Prazo da rodada venceu no servidor: encerra pela fila da partida"""
+        async def command():
+            result = game_service.expire_round(game_id, round_number)
+            if result:
+                await emit_time_up(game_id, result)
+
+        await actors.submit(game_id, f'time_up:{round_number}',
+                            locked_command(game_id, command))
+
+    game_service.add_deadline_listener(round_deadline)
+
+    def schedule_tick(game_id: str, ends_at: int):
+        if TIMER_TICK_INTERVAL <= 0:
+            return
+        next_tick = time.time() * 1000 + TIMER_TICK_INTERVAL * 1000
+        if next_tick < ends_at:
+            game_service.timers.schedule_at(('tick', game_id), next_tick,
+                                            timer_tick, game_id, ends_at)
+
+    async def timer_tick(game_id: str, ends_at: int):
+        """Corrige o cronômetro dos clientes (atraso de rede, aba em segundo plano)"""
+        game = game_service.get_game(game_id)
+        round_data = game.current_round_data if game else None
+        if not round_data or round_data.ends_at != ends_at or round_data.time_up:
+            return
+
+        schedule_tick(game_id, ends_at)
+        await broadcast(game_id, 'timer_tick', {
+            'round': round_data.round_number,
+            'ends_at': ends_at,
+            'remaining_ms': max(0, ends_at - int(time.time() * 1000))
+        })
+
+    async def emit_round_result(game_id: str, result: dict):
+        """Envia o resultado da rodada (ou o fim de jogo) para a sala"""
+        state = state_sync.delta(game_service.get_game(game_id))
 
-    player_counts = {}
+        if result.get('winner'):
+            await broadcast(game_id, 'game_finished', {
+                'state': state,
+                'winner': result['winner']
+            })
+        else:
+            await broadcast(game_id, 'round_confirmed', {
+                'state': state,
+                'result': result['result']
+            })
 
     @sio.event
     async def connect(sid, environ):
-        print(f"[Socket] Cliente conectado: {sid}")
+        log.info('client_connected', sid=sid)
 
     @sio.event
     async def disconnect(sid):
-        print(f"[Socket] Cliente desconectado: {sid}")
+        session = await leave_session(sid)
+        log.info('client_disconnected', sid=sid,
+                 game_id=session.game_id if session else None)
 
     @sio.event
     async def join_game(sid, data):
-        """Jogador ou board entra em uma partida"""
-        game_id = data.get('game_id', '').upper()
-        client_type = data.get('type', 'player')
+        """Jogador, board ou espectador entra em uma partida (cria a sessão)"""
+        data = data or {}
+        game_id = str(data.get('game_id', '')).upper()
+        if not await game_exists(game_id):
+            await sio.emit('error', {'message': 'Partida não encontrada'}, to=sid)
+            return
+
+        async def command():
+            await enter_game(sid, game_id, normalize_role(data.get('type')), data.get('player'))
+
+        await queue_command('join_game', game_id, data, command)
 
+    async def enter_game(sid: str, game_id: str, client_type: str, player: Optional[str]):
         game = game_service.get_game(game_id)
         if not game:
             await sio.emit('error', {'message': 'Partida não encontrada'}, to=sid)
             return
 
-        await sio.enter_room(sid, game_id)
-        print(f"[Socket] {client_type} entrou na partida {game_id}")
+        previous = await leave_session(sid)
+        if previous and (previous.game_id, previous.role) != (game_id, client_type):
+            await sio.leave_room(sid, role_room(previous.game_id, previous.role))
 
-        if game_id not in player_counts:
-            player_counts[game_id] = {'board': 0, 'player': 0}
+        await sio.enter_room(sid, role_room(game_id, client_type))
+        log.info('client_joined', game_id=game_id, role=client_type, sid=sid)
 
-        player_counts[game_id][client_type] += 1
+        sessions.bind(sid, game_id, client_type, player)
+        game_service.touch(game_id)
+        count = await game_service.adjust_clients(game_id, client_type, 1)
 
-        await sio.emit('game_state', game.to_dict(), to=sid)
+        await sio.emit('game_state', state_sync.full(game), to=sid)
 
         if client_type == 'player':
-            await sio.emit('player_connected', {
-                'player_count': player_counts[game_id]['player'],
+            await broadcast(game_id, 'player_connected', {
+                'player_count': count,
                 'message': 'Jogador conectado!'
-            }, room=game_id)
-            print(f"[Socket] Notificando board: jogador conectou em {game_id}")
+            })
 
         if game.current_round_data:
-            await sio.emit('round_ready', {
-                'game': game.to_dict(),
+            payload = project('round_ready', {
                 'round': game.current_round_data.to_dict()
-            }, to=sid)
+            })[client_type]
+            await sio.emit('round_ready', payload, to=sid)
 
     @sio.event
-    async def start_game(sid, data):
+    @game_command
+    async def sync_state(sid, data, session: Session):
+        """Cliente perdeu uma versão do estado e pede o estado completo"""
+        game = game_service.get_game(session.game_id)
+        await sio.emit('game_state', state_sync.full(game), to=sid)
+
+    @sio.event
+    @game_command
+    async def start_game(sid, data, session: Session):
         """Inicia uma partida"""
-        game_id = data.get('game_id', '').upper()
-        print(f"[Socket] Iniciando jogo {game_id}")
+        game_id = session.game_id
 
         game = game_service.start_game(game_id)
         if not game:
             await sio.emit('error', {'message': 'Erro ao iniciar partida'}, to=sid)
             return
 
-        await sio.emit('game_started', game.to_dict(), room=game_id)
+        # As rodadas recomeçam do zero: ids antigos ("confirm_round:1") voltam a valer
+        actors.forget_commands(game_id, keep=data.get('command_id'))
+
+        await broadcast(game_id, 'game_started', state_sync.delta(game))
 
         result = game_service.prepare_round(game_id)
         if result:
-            await sio.emit('round_ready', result, room=game_id)
-            print(f"[Socket] Rodada pronta enviada para {game_id}")
+            await broadcast(game_id, 'round_ready', {
+                'state': state_sync.delta(game),
+                'round': result['round']
+            })
 
     @sio.event
-    async def request_round(sid, data):
+    @game_command
+    async def request_round(sid, data, session: Session):
         """Solicita uma nova rodada"""
-        game_id = data.get('game_id', '').upper()
+        game_id = session.game_id
 
         result = game_service.prepare_round(game_id)
         if not result:
             await sio.emit('error', {'message': 'Erro ao preparar rodada'}, to=sid)
             return
 
-        await sio.emit('round_ready', result, room=game_id)
+        await broadcast(game_id, 'round_ready', {
+            'state': state_sync.delta(game_service.get_game(game_id)),
+            'round': result['round']
+        })
 
     @sio.event
-    async def player_view_card(sid, data):
+    @game_command
+    async def player_view_card(sid, data, session: Session):
         """Jogador visualizou a carta"""
-        game_id = data.get('game_id', '').upper()
-        await sio.emit('player_viewing_card', {}, room=game_id)
+        game_id = session.game_id
+        await broadcast(game_id, 'player_viewing_card', {})
 
     @sio.event
-    async def start_timer(sid, data):
+    @game_command
+    async def start_timer(sid, data, session: Session):
         """Inicia o timer da rodada"""
-        game_id = data.get('game_id', '').upper()
+        game_id = session.game_id
 
         result = game_service.start_timer(game_id)
         if not result:
             await sio.emit('error', {'message': 'Erro ao iniciar timer'}, to=sid)
             return
 
-        await sio.emit('timer_started', result, room=game_id)
+        await broadcast(game_id, 'timer_started', {
+            'state': state_sync.delta(game_service.get_game(game_id)),
+            'ends_at': result['ends_at'],
+            'remaining_ms': result['remaining_ms']
+        })
+        if result['ends_at'] is not None:
+            schedule_tick(game_id, result['ends_at'])
 
     @sio.event
-    async def word_hit(sid, data):
+    @game_command
+    async def word_hit(sid, data, session: Session):
         """Jogador marcou uma palavra como acertada"""
-        game_id = data.get('game_id', '').upper()
+        game_id = session.game_id
         word = data.get('word', '')
         is_bonus = data.get('is_bonus', False)
 
         success = game_service.register_hit(game_id, word, is_bonus)
 
         if success:
-            await sio.emit('player_hit', {
+            await broadcast(game_id, 'player_hit', {
                 'word': word,
                 'is_bonus': is_bonus
-            }, room=game_id)
+            })
 
     @sio.event
-    async def timer_ended(sid, data):
-        """Timer acabou"""
-        game_id = data.get('game_id', '').upper()
-
-        result = game_service.end_round(game_id)
-        if not result:
-            return
-
-        await sio.emit('time_up', result, room=game_id)
+    @game_command
+    async def timer_ended(sid, data, session: Session):
+        """
+        Cliente avisa que o tempo acabou. Quem encerra a rodada é o prazo
+        do servidor; o aviso só adianta o fim se esse prazo já passou.
+        """
+        game_id = session.game_id
+
+        result = game_service.expire_round(game_id, from_client=True)
+        if result:
+            await emit_time_up(game_id, result)
 
     @sio.event
-    async def confirm_round(sid, data):
+    @game_command
+    async def confirm_round(sid, data, session: Session):
         """Board confirma os acertos da rodada NORMAL"""
-        game_id = data.get('game_id', '').upper()
+        game_id = session.game_id
         confirmed_words = data.get('confirmed_words', [])
 
         result = game_service.confirm_round(game_id, confirmed_words)
@@ -138,18 +367,13 @@ def register_socket_events(sio: AsyncServer):
             await sio.emit('error', {'message': 'Erro ao confirmar rodada'}, to=sid)
             return
 
-        if result.get('winner'):
-            await sio.emit('game_finished', {
-                'game': result['game'],
-                'winner': result['winner']
-            }, room=game_id)
-        else:
-            await sio.emit('round_confirmed', result, room=game_id)
+        await emit_round_result(game_id, result)
 
     @sio.event
-    async def challenge_result(sid, data):
+    @game_command
+    async def challenge_result(sid, data, session: Session):
         """Board informa resultado do DESAFIO"""
-        game_id = data.get('game_id', '').upper()
+        game_id = session.game_id
         completed = data.get('completed', False)
 
         result = game_service.resolve_challenge(game_id, completed)
@@ -157,18 +381,13 @@ def register_socket_events(sio: AsyncServer):
             await sio.emit('error', {'message': 'Erro ao resolver desafio'}, to=sid)
             return
 
-        if result.get('winner'):
-            await sio.emit('game_finished', {
-                'game': result['game'],
-                'winner': result['winner']
-            }, room=game_id)
-        else:
-            await sio.emit('round_confirmed', result, room=game_id)
+        await emit_round_result(game_id, result)
 
     @sio.event
-    async def cursed_result(sid, data):
+    @game_command
+    async def cursed_result(sid, data, session: Session):
         """Board informa resultado da CARTA AMALDIÇOADA"""
-        game_id = data.get('game_id', '').upper()
+        game_id = session.game_id
         guessed = data.get('guessed', False)
 
         result = game_service.resolve_cursed(game_id, guessed)
@@ -176,10 +395,13 @@ def register_socket_events(sio: AsyncServer):
             await sio.emit('error', {'message': 'Erro ao resolver carta amaldiçoada'}, to=sid)
             return
 
-        if result.get('winner'):
-            await sio.emit('game_finished', {
-                'game': result['game'],
-                'winner': result['winner']
-            }, room=game_id)
-        else:
-            await sio.emit('round_confirmed', result, room=game_id)
+        await emit_round_result(game_id, result)
+
+    # Tempo de todos os handlers registrados acima
+    handlers = sio.handlers.get('/', {})
+    for event, handler in list(handlers.items()):
+        handlers[event] = metrics.instrument(event, handler)
+
+    metrics.add_collector(
+        'socketio_sessions', 'Conexões em partidas neste processo, por papel',
+        lambda: [({'role': role}, sessions.stats()['by_role'].get(role, 0)) for role in ROLES])
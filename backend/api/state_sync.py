@@ -0,0 +1,115 @@
+"""
+30 Segundos v3.1 - Sincronização Incremental do Estado do Jogo
+"""
+
+import hashlib
+from typing import Dict, List, Tuple
+
+from backend.api.serialization import dumps_bytes
+from backend.models.game import Game
+
+# Campos que não vão no estado sincronizado (a rodada segue nos eventos)
+EXCLUDED_FIELDS = ('current_round_data',)
+
+
+def game_state(game: Game) -> dict:
+    """Estado do jogo enviado aos clientes"""
+    state = dict(game.to_dict())
+    for name in EXCLUDED_FIELDS:
+        state.pop(name, None)
+    return state
+
+
+def diff_state(old: dict, new: dict, prefix: str = '') -> Tuple[dict, List[str]]:
+    """
+    Compara dois estados e retorna (alterados, removidos), com caminhos
+    separados por ponto ("team1.position"). Listas são valores inteiros.
+    """
+    changed = {}
+    removed = []
+
+    for key, value in new.items():
+        path = prefix + key
+        if key not in old:
+            changed[path] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            sub_changed, sub_removed = diff_state(old[key], value, path + '.')
+            changed.update(sub_changed)
+            removed.extend(sub_removed)
+        elif old[key] != value:
+            changed[path] = value
+
+    for key in old:
+        if key not in new:
+            removed.append(prefix + key)
+
+    return changed, removed
+
+
+def state_version(state: dict) -> int:
+    """Versão derivada do conteúdo: a mesma em qualquer processo"""
+    digest = hashlib.blake2b(dumps_bytes(state), digest_size=6).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class GameStateSync:
+    """
+    Guarda, por jogo, a versão e o último estado enviado. Os eventos
+    levam só o que mudou desde a versão anterior; clientes que entram ou
+    percebem um salto de versão recebem o estado completo.
+
+    Com vários workers cada processo tem seus próprios snapshots; com
+    `content_versions` a versão é um hash do estado, então um patch de
+    outro worker só é aplicado se partir do mesmo estado do cliente.
+    """
+
+    def __init__(self, content_versions: bool = False):
+        self.content_versions = content_versions
+        self._snapshots: Dict[str, Tuple[int, dict]] = {}
+
+    def _next_version(self, version: int, state: dict) -> int:
+        if self.content_versions:
+            return state_version(state)
+        return version + 1
+
+    def full(self, game: Game) -> dict:
+        """Estado completo na versão atual"""
+        version, snapshot = self._current(game)
+        return {"v": version, "full": snapshot}
+
+    def delta(self, game: Game) -> dict:
+        """Alterações desde a última versão enviada"""
+        previous = self._snapshots.get(game.id)
+        if previous is None:
+            return self.full(game)
+
+        version, old = previous
+        new = game_state(game)
+        changed, removed = diff_state(old, new)
+        if not changed and not removed:
+            return {"v": version, "base": version, "set": {}}
+
+        new_version = self._next_version(version, new)
+        self._snapshots[game.id] = (new_version, new)
+        patch = {"v": new_version, "base": version, "set": changed}
+        if removed:
+            patch["del"] = removed
+        return patch
+
+    def forget(self, game_id: str):
+        self._snapshots.pop(game_id, None)
+
+    def _current(self, game: Game) -> Tuple[int, dict]:
+        """Versão atual; se o jogo mudou sem broadcast, cria uma versão nova"""
+        previous = self._snapshots.get(game.id)
+        new = game_state(game)
+        if previous is None:
+            version = self._next_version(0, new)
+            self._snapshots[game.id] = (version, new)
+            return version, new
+
+        version, old = previous
+        if old != new:
+            version = self._next_version(version, new)
+            self._snapshots[game.id] = (version, new)
+        return version, new
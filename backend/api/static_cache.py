@@ -0,0 +1,249 @@
+"""
+30 Segundos v3.1 - Arquivos do Frontend em Memória
+
+Páginas, CSS e JS são lidos uma vez (e de novo só quando mudam no disco)
+e ficam na memória já comprimidos em gzip e, com o pacote `brotli`
+instalado, em br. Cada versão tem um ETag tirado do conteúdo, então o
+navegador revalida com If-None-Match e recebe 304 sem corpo.
+
+As páginas saem com `?v=<hash>` nos links de /css e /js. Um asset pedido
+com o hash atual é imutável (cache de um ano); sem o hash, ou com um
+hash antigo, o navegador precisa revalidar.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+from backend.services.log import get_logger
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+STATIC_DIRS = ('css', 'js')
+PAGE_EXTENSIONS = ('.html',)
+# Arquivos menores que isso não compensam a compressão
+MIN_COMPRESS_SIZE = 256
+COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+log = get_logger('static')
+
+# (mtime, tamanho) de um arquivo na última leitura
+Stamp = Tuple[float, int]
+
+ASSET_LINK = re.compile(r'((?:href|src)=")(/(?:css|js)/[^"?#]+)(")')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match pode trazer várias ETags (fracas com W/) ou *"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class StaticAsset:
+    __slots__ = ('media_type', 'version', 'bodies', 'etags')
+
+    def __init__(self, body: bytes, media_type: str):
+        self.media_type = media_type
+        self.version = hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.bodies: Dict[str, bytes] = {'identity': body}
+
+        if len(body) >= MIN_COMPRESS_SIZE and media_type.startswith(COMPRESSIBLE):
+            self.bodies['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if HAS_BROTLI:
+                self.bodies['br'] = brotli.compress(body, quality=11)
+
+        # Um ETag por codificação: são representações diferentes
+        self.etags = {encoding: f'"{self.version}"' if encoding == 'identity'
+                      else f'"{self.version}-{encoding}"' for encoding in self.bodies}
+
+
+class StaticCache:
+    def __init__(self, root: str):
+        self.root = root
+        self._assets: Dict[str, StaticAsset] = {}
+        self._stamps: Dict[str, Stamp] = {}
+        self.hits = 0
+        self.not_modified = 0
+
+    def _scan(self) -> Dict[str, Tuple[str, Stamp]]:
+        """Caminho relativo -> (caminho no disco, (mtime, tamanho)) dos arquivos servidos"""
+        files = {}
+        if not os.path.isdir(self.root):
+            return files
+        for name in os.listdir(self.root):
+            if name.endswith(PAGE_EXTENSIONS):
+                path = os.path.join(self.root, name)
+                files[name] = (path, self._stamp(path))
+        for directory in STATIC_DIRS:
+            base = os.path.join(self.root, directory)
+            if not os.path.isdir(base):
+                continue
+            for name in os.listdir(base):
+                path = os.path.join(base, name)
+                if os.path.isfile(path):
+                    files[f'{directory}/{name}'] = (path, self._stamp(path))
+        return files
+
+    @staticmethod
+    def _stamp(path: str) -> Stamp:
+        info = os.stat(path)
+        return info.st_mtime, info.st_size
+
+    def _unchanged(self, rel: str, stamp: Stamp) -> Optional[StaticAsset]:
+        """A versão em memória, se o arquivo não mudou desde a última leitura"""
+        if self._stamps.get(rel) == stamp:
+            return self._assets.get(rel)
+        return None
+
+    def reload(self) -> bool:
+        """
+        Relê o que mudou no disco; True se algo mudou. Só os arquivos com
+        mtime ou tamanho diferentes são comprimidos de novo (gzip 9 e
+        brotli 11 custam caro); as páginas também quando algum asset muda,
+        porque os links delas levam o hash.
+        """
+        files = self._scan()
+        stamps = {rel: stamp for rel, (_, stamp) in files.items()}
+        if stamps == self._stamps:
+            return False
+
+        assets = {}
+        rebuilt = 0
+        for rel, (path, stamp) in files.items():
+            if rel.endswith(PAGE_EXTENSIONS):
+                continue
+            asset = self._unchanged(rel, stamp)
+            if asset is None:
+                with open(path, 'rb') as f:
+                    asset = StaticAsset(f.read(), self._media_type(rel))
+                rebuilt += 1
+            assets[rel] = asset
+
+        previous = {rel for rel in self._assets if not rel.endswith(PAGE_EXTENSIONS)}
+        links_changed = rebuilt > 0 or set(assets) != previous
+
+        # Páginas por último: os links levam o hash dos assets já lidos
+        for rel, (path, stamp) in files.items():
+            if not rel.endswith(PAGE_EXTENSIONS):
+                continue
+            asset = None if links_changed else self._unchanged(rel, stamp)
+            if asset is None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    html = self._version_links(f.read(), assets)
+                asset = StaticAsset(html.encode('utf-8'), self._media_type(rel))
+                rebuilt += 1
+            assets[rel] = asset
+
+        self._assets = assets
+        self._stamps = stamps
+        size = sum(len(body) for asset in assets.values() for body in asset.bodies.values())
+        log.info('static_loaded', files=len(assets), rebuilt=rebuilt, kb=round(size / 1024))
+        return True
+
+    @staticmethod
+    def _media_type(rel: str) -> str:
+        media_type = mimetypes.guess_type(rel)[0] or 'application/octet-stream'
+        if media_type.startswith('text/') or media_type == 'application/javascript':
+            media_type += '; charset=utf-8'
+        return media_type
+
+    @staticmethod
+    def _version_links(html: str, assets: Dict[str, StaticAsset]) -> str:
+        def add_version(match):
+            asset = assets.get(match.group(2).lstrip('/'))
+            if asset is None:
+                return match.group(0)
+            return f'{match.group(1)}{match.group(2)}?v={asset.version}{match.group(3)}'
+        return ASSET_LINK.sub(add_version, html)
+
+    async def watch(self, interval: float = 2.0):
+        """Verifica os arquivos periodicamente e recarrega o que mudou"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Leitura e compressão fora do event loop
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                log.exception('static_reload_failed', error=str(e))
+
+    @staticmethod
+    def _encoding(accept_encoding: str, asset: StaticAsset) -> str:
+        accepted = set()
+        for part in accept_encoding.split(','):
+            name, _, params = part.partition(';')
+            params = params.replace(' ', '')
+            if params.startswith('q='):
+                try:
+                    if float(params[2:]) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(name.strip().lower())
+        for encoding in ('br', 'gzip'):
+            if encoding in asset.bodies and encoding in accepted:
+                return encoding
+        return 'identity'
+
+    def response(self, request: Request, rel: str) -> Response:
+        asset = self._assets.get(rel)
+        if asset is None:
+            return Response(f'Arquivo não encontrado: {rel}', status_code=404,
+                            media_type='text/plain; charset=utf-8')
+
+        encoding = self._encoding(request.headers.get('accept-encoding', ''), asset)
+        etag = asset.etags[encoding]
+        versioned = request.query_params.get('v') == asset.version
+        headers = {
+            'ETag': etag,
+            'Cache-Control': IMMUTABLE if versioned else REVALIDATE,
+            'Vary': 'Accept-Encoding',
+        }
+
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        self.hits += 1
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(asset.bodies[encoding], media_type=asset.media_type, headers=headers)
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self._assets),
+            "bytes": {encoding: sum(len(a.bodies[encoding]) for a in self._assets.values()
+                                    if encoding in a.bodies)
+                      for encoding in ('identity', 'gzip', 'br')},
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+            "brotli": HAS_BROTLI
+        }
+
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), 'frontend', 'src')
+
+# Instância global
+static_cache = StaticCache(FRONTEND_DIR)
@@ -3,18 +3,26 @@
 """
 
 import os
+import asyncio
 import socketio
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request, Response
 from backend.api.routes import router
 from backend.api.socket_events import register_socket_events
+from backend.api.serialization import FastJSONResponse, socketio_options
+from backend.api.pubsub import create_client_manager
+from backend.api.static_cache import static_cache
+from backend.services.word_service import word_service
+from backend.services.game_service import game_service
+from backend.services.metrics import CONTENT_TYPE, MetricsMiddleware, metrics
 
 # Cria app FastAPI
-app = FastAPI(title="30 Segundos", version="3.1")
+app = FastAPI(title="30 Segundos", version="3.1",
+              default_response_class=FastJSONResponse)
 
-# Cria Socket.IO
-sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+# Cria Socket.IO (com SOCKETIO_BROKER, as salas valem entre workers)
+sio = socketio.AsyncServer(
+    async_mode='asgi', cors_allowed_origins='*',
+    client_manager=create_client_manager(), **socketio_options())
 socket_app = socketio.ASGIApp(sio, app)
 
 # Registra eventos do Socket.IO
@@ -23,54 +31,107 @@ register_socket_events(sio)
 # Registra rotas da API
 app.include_router(router, prefix="/api")
 
-# Caminho para os arquivos estáticos
-FRONTEND_DIR = os.path.join(os.path.dirname(
-    os.path.dirname(__file__)), "frontend", "src")
+# Tempo de cada rota HTTP
+app.add_middleware(MetricsMiddleware)
 
-# Monta arquivos estáticos (CSS, JS)
-if os.path.exists(os.path.join(FRONTEND_DIR, "css")):
-    app.mount(
-        "/css", StaticFiles(directory=os.path.join(FRONTEND_DIR, "css")), name="css")
 
-if os.path.exists(os.path.join(FRONTEND_DIR, "js")):
-    app.mount(
-        "/js", StaticFiles(directory=os.path.join(FRONTEND_DIR, "js")), name="js")
+def games_by_state():
+    states = game_service.reaper_stats()["games_by_state"]
+    return [({"state": state}, count) for state, count in states.items()]
 
 
-@app.get("/")
-async def home():
+def timer_stats():
+    stats = game_service.timers.stats()
+    return [({"kind": kind}, stats[kind]) for kind in ("scheduled", "heap")]
+
+
+metrics.add_collector("games", "Partidas em memória por estado", games_by_state)
+metrics.add_collector("round_timers", "Cronômetros no heap do servidor", timer_stats)
+metrics.add_collector("round_timers_fired", "Prazos de rodada já disparados",
+                      lambda: [({}, game_service.timers.fired)])
+metrics.add_collector("round_timer_max_lag_ms", "Maior atraso de um prazo de rodada (ms)",
+                      lambda: [({}, game_service.timers.stats()["max_lag_ms"])])
+
+# Intervalo (s) para verificar alterações em data/word_banks; 0 desativa
+WORD_BANKS_WATCH_INTERVAL = float(
+    os.environ.get("WORD_BANKS_WATCH_INTERVAL", "2"))
+
+# Intervalo (s) para verificar alterações no frontend; 0 desativa
+STATIC_WATCH_INTERVAL = float(os.environ.get("STATIC_WATCH_INTERVAL", "2"))
+
+# Intervalo (s) entre as passadas do reaper de partidas; 0 desativa
+GAME_REAPER_INTERVAL = float(os.environ.get("GAME_REAPER_INTERVAL", "30"))
+
+background_tasks = []
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """Inicia tarefas de fundo do servidor"""
+    static_cache.reload()
+    if STATIC_WATCH_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            static_cache.watch(STATIC_WATCH_INTERVAL)))
+    if WORD_BANKS_WATCH_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            word_service.watch_word_banks(WORD_BANKS_WATCH_INTERVAL)))
+    if GAME_REAPER_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            game_service.reap_games(GAME_REAPER_INTERVAL)))
+    # Rodadas restauradas do store voltam a ter prazo no servidor
+    game_service.resume_timers()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    """Cancela as tarefas de fundo"""
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    game_service.timers.stop()
+    game_service.store.close()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Métricas no formato de texto do Prometheus"""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.api_route("/", methods=["GET", "HEAD"])
+async def home(request: Request):
     """Página inicial"""
-    file_path = os.path.join(FRONTEND_DIR, "index.html")
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    return {"error": "index.html não encontrado", "path": file_path}
+    return static_cache.response(request, "index.html")
 
 
-@app.get("/admin")
-async def admin():
+@app.api_route("/admin", methods=["GET", "HEAD"])
+async def admin(request: Request):
     """Página de administração"""
-    file_path = os.path.join(FRONTEND_DIR, "admin.html")
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    return {"error": "admin.html não encontrado", "path": file_path}
+    return static_cache.response(request, "admin.html")
 
 
-@app.get("/board")
-async def board():
+@app.api_route("/board", methods=["GET", "HEAD"])
+async def board(request: Request):
     """Página do tabuleiro (TV)"""
-    file_path = os.path.join(FRONTEND_DIR, "board.html")
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    return {"error": "board.html não encontrado", "path": file_path}
+    return static_cache.response(request, "board.html")
 
 
-@app.get("/player")
-async def player():
+@app.api_route("/player", methods=["GET", "HEAD"])
+async def player(request: Request):
     """Página do jogador (celular)"""
-    file_path = os.path.join(FRONTEND_DIR, "player.html")
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    return {"error": "player.html não encontrado", "path": file_path}
+    return static_cache.response(request, "player.html")
+
+
+@app.api_route("/css/{filename}", methods=["GET", "HEAD"])
+async def css(request: Request, filename: str):
+    """Arquivos CSS (da memória)"""
+    return static_cache.response(request, f"css/{filename}")
+
+
+@app.api_route("/js/{filename}", methods=["GET", "HEAD"])
+async def js(request: Request, filename: str):
+    """Arquivos JavaScript (da memória)"""
+    return static_cache.response(request, f"js/{filename}")
 
 
 # Exporta o app com Socket.IO
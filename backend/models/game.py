@@ -5,8 +5,41 @@
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict
 from datetime import datetime
-import random
-import string
+
+
+class CachedSerializable:
+    """
+    Memoriza o resultado de to_dict() até algum atributo ser reatribuído
+    (ou mark_dirty() ser chamado depois de alterar uma lista no lugar).
+    Objetos aninhados avisam o dono quando mudam, então o cache do jogo
+    inteiro cai só quando algo dentro dele muda. O dict retornado é
+    compartilhado e não deve ser alterado por quem o recebe.
+    """
+
+    _cached = None
+    _owner = None
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if isinstance(value, CachedSerializable):
+            object.__setattr__(value, '_owner', self)
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        node = self
+        while node is not None and node._cached is not None:
+            object.__setattr__(node, '_cached', None)
+            node = node._owner
+
+    def _serialize(self) -> dict:
+        raise NotImplementedError
+
+    def to_dict(self):
+        cached = self._cached
+        if cached is None:
+            cached = self._serialize()
+            object.__setattr__(self, '_cached', cached)
+        return cached
 
 
 @dataclass
@@ -18,7 +51,7 @@ class Player:
 
 
 @dataclass
-class Team:
+class Team(CachedSerializable):
     name: str
     players: List[Player] = field(default_factory=list)
     position: int = 0
@@ -35,7 +68,7 @@ class Team:
             self.current_player_index = (
                 self.current_player_index + 1) % len(self.players)
 
-    def to_dict(self):
+    def _serialize(self) -> dict:
         return {
             "name": self.name,
             "players": [p.to_dict() for p in self.players],
@@ -45,19 +78,19 @@ class Team:
 
 
 @dataclass
-class Card:
+class Card(CachedSerializable):
     yellow_words: List[dict] = field(default_factory=list)
     blue_words: List[dict] = field(default_factory=list)
 
-    def to_dict(self):
+    def _serialize(self) -> dict:
         return {
-            "yellow_words": self.yellow_words,
-            "blue_words": self.blue_words
+            "yellow_words": list(self.yellow_words),
+            "blue_words": list(self.blue_words)
         }
 
 
 @dataclass
-class RoundData:
+class RoundData(CachedSerializable):
     round_number: int
     team: int
     card: Optional[Card] = None
@@ -67,8 +100,11 @@ class RoundData:
     cursed_word: str = ""
     player_hits: List[str] = field(default_factory=list)
     started: bool = False
+    # Fim da rodada definido pelo servidor (epoch em ms) e se já acabou
+    ends_at: Optional[int] = None
+    time_up: bool = False
 
-    def to_dict(self):
+    def _serialize(self) -> dict:
         return {
             "round_number": self.round_number,
             "team": self.team,
@@ -77,13 +113,15 @@ class RoundData:
             "challenge_text": self.challenge_text,
             "is_cursed": self.is_cursed,
             "cursed_word": self.cursed_word,
-            "player_hits": self.player_hits,
-            "started": self.started
+            "player_hits": list(self.player_hits),
+            "started": self.started,
+            "ends_at": self.ends_at,
+            "time_up": self.time_up
         }
 
 
 @dataclass
-class GameConfig:
+class GameConfig(CachedSerializable):
     round_time: int = 30
     words_per_side: int = 5
     bonus_chance: float = 0.15
@@ -94,7 +132,7 @@ class GameConfig:
     max_cursed_per_game: int = 2
     cursed_chance: float = 0.10  # 10% de chance por rodada
 
-    def to_dict(self):
+    def _serialize(self) -> dict:
         return {
             "round_time": self.round_time,
             "words_per_side": self.words_per_side,
@@ -107,7 +145,7 @@ class GameConfig:
 
 
 @dataclass
-class Game:
+class Game(CachedSerializable):
     id: str
     name: str
     team1: Team
@@ -123,10 +161,6 @@ class Game:
     challenge_count: int = 0   # Contador de desafios usados
     created_at: datetime = field(default_factory=datetime.now)
 
-    @staticmethod
-    def generate_id() -> str:
-        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-
     def get_current_team(self) -> Team:
         return self.team1 if self.current_team == 1 else self.team2
 
@@ -147,14 +181,14 @@ class Game:
         """Verifica se ainda pode ter desafio"""
         return self.challenge_count < self.config.max_challenges_per_game
 
-    def to_dict(self):
+    def _serialize(self) -> dict:
         return {
             "id": self.id,
             "name": self.name,
             "team1": self.team1.to_dict(),
             "team2": self.team2.to_dict(),
-            "themes": self.themes,
-            "levels": self.levels,
+            "themes": list(self.themes),
+            "levels": list(self.levels),
             "config": self.config.to_dict(),
             "state": self.state,
             "current_team": self.current_team,
@@ -163,3 +197,61 @@ class Game:
             "cursed_count": self.cursed_count,
             "challenge_count": self.challenge_count
         }
+
+    def to_record(self) -> dict:
+        """Estado completo para persistência (to_dict + campos internos)"""
+        return {
+            "game": self.to_dict(),
+            "team1_player_index": self.team1.current_player_index,
+            "team2_player_index": self.team2.current_player_index,
+            "created_at": self.created_at.isoformat()
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> 'Game':
+        """Reconstrói um jogo salvo com to_record()"""
+        data = record["game"]
+
+        def team_from(team_data: dict, player_index: int) -> Team:
+            return Team(
+                name=team_data["name"],
+                players=[Player(name=p["name"]) for p in team_data["players"]],
+                position=team_data["position"],
+                current_player_index=player_index
+            )
+
+        round_data = None
+        rd = data.get("current_round_data")
+        if rd:
+            card = rd.get("card")
+            round_data = RoundData(
+                round_number=rd["round_number"],
+                team=rd["team"],
+                card=Card(yellow_words=card["yellow_words"],
+                          blue_words=card["blue_words"]) if card else None,
+                is_challenge=rd["is_challenge"],
+                challenge_text=rd["challenge_text"],
+                is_cursed=rd["is_cursed"],
+                cursed_word=rd["cursed_word"],
+                player_hits=list(rd["player_hits"]),
+                started=rd["started"],
+                ends_at=rd.get("ends_at"),
+                time_up=rd.get("time_up", False)
+            )
+
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            team1=team_from(data["team1"], record.get("team1_player_index", 0)),
+            team2=team_from(data["team2"], record.get("team2_player_index", 0)),
+            themes=list(data["themes"]),
+            levels=list(data["levels"]),
+            config=GameConfig(**data["config"]),
+            state=data["state"],
+            current_team=data["current_team"],
+            current_round=data["current_round"],
+            current_round_data=round_data,
+            cursed_count=data["cursed_count"],
+            challenge_count=data["challenge_count"],
+            created_at=datetime.fromisoformat(record["created_at"])
+        )
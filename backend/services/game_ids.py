@@ -0,0 +1,172 @@
+"""
+30 Segundos v3.1 - Códigos de Partida
+
+Os códigos saem de um contador embaralhado: o valor n (0 <= n < 32^k) passa
+por uma bijeção fixa (afim, xorshift, afim módulo 2^(5k)) e vira k letras
+do alfabeto abaixo. Como a bijeção não repete valores, cada código novo é
+único sem sorteio nem nova tentativa, e a sequência não parece sequencial.
+
+O alfabeto tem 32 símbolos sem 0/O e 1/I, fáceis de digitar no celular.
+Com vários shards o contador anda de N em N, então valor % N é o shard
+dono e o proxy acha o worker só decodificando o código.
+"""
+
+import hashlib
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from backend.services.log import get_logger
+
+ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+BITS_PER_CHAR = 5
+DEFAULT_WIDTH = 4
+
+GAME_ID_SECRET = os.environ.get('GAME_ID_SECRET', '30segundos')
+# Segundos até um código liberado poder ser reutilizado
+GAME_ID_COOLDOWN = float(os.environ.get('GAME_ID_COOLDOWN', '600'))
+
+log = get_logger('game.ids')
+
+_INDEX = {char: i for i, char in enumerate(ALPHABET)}
+_keys: Dict[int, Tuple[int, int, int, int, int, int]] = {}
+
+
+def _width_keys(width: int) -> Tuple[int, int, int, int, int, int]:
+    """Multiplicadores (ímpares), inversos e somas da bijeção de uma largura"""
+    keys = _keys.get(width)
+    if keys is None:
+        modulus = 1 << (BITS_PER_CHAR * width)
+        seed = hashlib.blake2b(f'{GAME_ID_SECRET}:{width}'.encode('utf-8'),
+                               digest_size=32).digest()
+        a1, b1, a2, b2 = (int.from_bytes(seed[i:i + 8], 'big') % modulus
+                          for i in range(0, 32, 8))
+        a1 |= 1
+        a2 |= 1
+        keys = (a1, pow(a1, -1, modulus), b1, a2, pow(a2, -1, modulus), b2)
+        _keys[width] = keys
+    return keys
+
+
+def scramble(value: int, width: int) -> int:
+    bits = BITS_PER_CHAR * width
+    mask = (1 << bits) - 1
+    a1, _, b1, a2, _, b2 = _width_keys(width)
+    shift = bits // 2 + 1
+
+    value = (a1 * value + b1) & mask
+    value ^= value >> shift
+    return (a2 * value + b2) & mask
+
+
+def unscramble(value: int, width: int) -> int:
+    bits = BITS_PER_CHAR * width
+    mask = (1 << bits) - 1
+    _, a1_inv, b1, _, a2_inv, b2 = _width_keys(width)
+    shift = bits // 2 + 1
+
+    value = ((value - b2) * a2_inv) & mask
+    # Desfaz value ^= value >> shift (shift > bits/2: uma passada basta)
+    value ^= value >> shift
+    return ((value - b1) * a1_inv) & mask
+
+
+def encode(value: int, width: int) -> str:
+    chars = []
+    for _ in range(width):
+        chars.append(ALPHABET[value & 31])
+        value >>= BITS_PER_CHAR
+    return ''.join(reversed(chars))
+
+
+def game_id_value(game_id: str) -> Optional[int]:
+    """Valor do contador que gerou o código; None se não veio do alocador"""
+    if not game_id:
+        return None
+    value = 0
+    for char in game_id.upper():
+        digit = _INDEX.get(char)
+        if digit is None:
+            return None
+        value = (value << BITS_PER_CHAR) | digit
+    return unscramble(value, len(game_id))
+
+
+class GameIdAllocator:
+    """
+    Aloca códigos de partida em O(1).
+
+    Códigos liberados ficam `cooldown` segundos em quarentena antes de
+    poderem voltar (clientes antigos ainda podem estar conectados a eles).
+    Quando ativos + quarentena passam de `max_load` do espaço da largura
+    atual, os códigos ganham mais um caractere.
+    """
+
+    def __init__(self, width: int = DEFAULT_WIDTH, cooldown: float = GAME_ID_COOLDOWN,
+                 max_load: float = 0.5, shard_index: int = 0, shard_count: int = 1):
+        self.width = width
+        self.cooldown = cooldown
+        self.max_load = max_load
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self._live: Set[str] = set()
+        self._cooling: "OrderedDict[str, float]" = OrderedDict()
+        self._counter = self._random_start()
+        self.retries = 0
+
+    @property
+    def capacity(self) -> int:
+        """Códigos deste shard na largura atual"""
+        return (1 << (BITS_PER_CHAR * self.width)) // self.shard_count
+
+    def _random_start(self) -> int:
+        # Começo aleatório: outro processo ou um reinício não repete a sequência
+        return random.randrange(self.capacity)
+
+    def _expire_cooling(self):
+        now = time.monotonic()
+        while self._cooling:
+            game_id, released_at = next(iter(self._cooling.items()))
+            if now - released_at < self.cooldown:
+                break
+            self._cooling.popitem(last=False)
+
+    def allocate(self, taken: Optional[Callable[[str], bool]] = None) -> str:
+        """Próximo código livre; `taken` confere usos fora deste alocador"""
+        self._expire_cooling()
+        if len(self._live) + len(self._cooling) >= self.max_load * self.capacity:
+            self.width += 1
+            self._counter = self._random_start()
+            log.info('id_width_increased', width=self.width)
+
+        while True:
+            value = self._counter * self.shard_count + self.shard_index
+            self._counter = (self._counter + 1) % self.capacity
+            game_id = encode(scramble(value, self.width), self.width)
+            if (game_id not in self._live and game_id not in self._cooling
+                    and not (taken and taken(game_id))):
+                self._live.add(game_id)
+                return game_id
+            self.retries += 1
+
+    def reserve(self, game_id: str):
+        """Marca como em uso um código que já existia (jogo restaurado)"""
+        self._live.add(game_id)
+        self._cooling.pop(game_id, None)
+
+    def release(self, game_id: str):
+        """Devolve o código; ele só volta a ser usado depois do cooldown"""
+        if game_id in self._live:
+            self._live.discard(game_id)
+            self._cooling[game_id] = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "width": self.width,
+            "live": len(self._live),
+            "cooling": len(self._cooling),
+            "capacity": self.capacity,
+            "retries": self.retries
+        }
@@ -2,22 +2,284 @@
 30 Segundos v3.1 - Serviço de Gerenciamento de Jogos
 """
 
+import asyncio
+import contextlib
+import itertools
+import json
+import os
 import random
-from typing import Dict, List, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set
 from backend.models.game import Game, Team, Player, GameConfig, RoundData, Card
 from backend.services.word_service import word_service
+from backend.services.game_store import GameStore, create_game_store
+from backend.services.game_ids import GameIdAllocator
+from backend.services.sharding import SHARD_COUNT, SHARD_INDEX
+from backend.services.timer_heap import TimerHeap
+from backend.services.metrics import metrics
+from backend.services.log import get_logger
+
+# Segundos sem atividade até uma partida ser removida pelo reaper
+GAME_IDLE_TTL = float(os.environ.get('GAME_IDLE_TTL', '7200'))
+# Segundos que uma partida terminada continua disponível
+GAME_FINISHED_TTL = float(os.environ.get('GAME_FINISHED_TTL', '600'))
+# Folga (ms) aceita quando um cliente avisa o fim do tempo antes do servidor
+TIMER_CLIENT_GRACE_MS = int(os.environ.get('TIMER_CLIENT_GRACE_MS', '500'))
+
+log = get_logger('game')
+# Um registro por rodada: LOG_LEVELS=game.round=WARNING desliga
+round_log = get_logger('game.round')
 
 
 class GameService:
-    def __init__(self):
+    def __init__(self, store: Optional[GameStore] = None):
         self.games: Dict[str, Game] = {}
+        # Só com estado compartilhado: versão da cópia local de cada jogo e
+        # o que commit() ainda precisa gravar
+        self._versions: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._removed: Set[str] = set()
+        self._lock_ids = itertools.count()
+        self.ids = GameIdAllocator(
+            shard_index=SHARD_INDEX, shard_count=SHARD_COUNT)
+        # Ordenados pelo último acesso / pelo fim da partida: o reaper só
+        # olha o começo de cada um
+        self._activity: "OrderedDict[str, float]" = OrderedDict()
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._delete_listeners: List[Callable[[str], None]] = []
+        self.idle_ttl = GAME_IDLE_TTL
+        self.finished_ttl = GAME_FINISHED_TTL
+        self.reaped_games = 0
+        self.reaped_bytes = 0
+        self.timers = TimerHeap()
+        self._deadline_listeners: List[Callable[[str, int], Any]] = []
+        self.challenges = self._load_challenges()
+        self.cursed_words = self._load_cursed_words()
+        word_service.add_reload_listener(self._reload_word_lists)
+        self.store = store if store is not None else create_game_store()
+        self._restore_games()
+
+    def _restore_games(self):
+        """Recarrega do store os jogos e baralhos salvos"""
+        if self.store.shared:
+            # Carregados sob demanda em load() e exclusive()
+            return
+
+        for record, pool in self.store.load_all():
+            try:
+                game = Game.from_record(record)
+            except (KeyError, TypeError, ValueError) as e:
+                log.warning('invalid_saved_game', error=str(e))
+                continue
+
+            self.games[game.id] = game
+            self.ids.reserve(game.id)
+            self._track(game)
+            if pool:
+                word_service.restore_pool(game.id, pool)
+            else:
+                word_service.init_game_pool(game.id, game.themes, game.levels)
+
+        if self.games:
+            log.info('games_restored', count=len(self.games))
+
+    def _track(self, game: Game):
+        """Registra atividade na partida (e o fim, se terminou)"""
+        now = time.monotonic()
+        self._activity[game.id] = now
+        self._activity.move_to_end(game.id)
+        if game.state != 'finished':
+            # Reiniciada depois do fim: volta a contar só a inatividade
+            self._finished.pop(game.id, None)
+        elif game.id not in self._finished:
+            self._finished[game.id] = now
+
+    def touch(self, game_id: str):
+        """Conta um acesso sem alteração (ex.: cliente entrando na sala)"""
+        game = self.games.get(game_id)
+        if game:
+            self._track(game)
+
+    def add_deadline_listener(self, callback: Callable[[str, int], Any]):
+        """
+        Registra quem trata o fim do tempo de uma rodada (id, nº da rodada).
+        Sem listeners, o próprio serviço encerra a rodada.
+        """
+        self._deadline_listeners.append(callback)
+
+    def _schedule_deadline(self, game: Game):
+        round_data = game.current_round_data
+        try:
+            self.timers.schedule_at(('round', game.id), round_data.ends_at,
+                                    self._on_deadline, game.id, round_data.round_number)
+        except RuntimeError:
+            # Fora do event loop (scripts, benchmarks): sem prazo no servidor
+            pass
+
+    def _on_deadline(self, game_id: str, round_number: int):
+        if not self._deadline_listeners:
+            self.expire_round(game_id, round_number)
+            return None
+
+        results = [cb(game_id, round_number) for cb in self._deadline_listeners]
+        pending = [r for r in results if asyncio.iscoroutine(r)]
+        if pending:
+            return asyncio.gather(*pending)
+        return None
+
+    def resume_timers(self):
+        """Reagenda os prazos das rodadas em andamento (depois de restaurar)"""
+        for game in self.games.values():
+            round_data = game.current_round_data
+            if round_data and round_data.started and round_data.ends_at and not round_data.time_up:
+                self._schedule_deadline(game)
+
+    def add_delete_listener(self, callback: Callable[[str], None]):
+        """Registra uma função chamada com o id de cada partida removida"""
+        self._delete_listeners.append(callback)
+
+    def _persist(self, game: Game):
+        """Agenda a gravação do jogo (não espera o disco)"""
+        self._track(game)
+        if not self.store.persistent:
+            return
+        if self.store.shared:
+            # Gravado por commit(), na thread do store
+            self._dirty.add(game.id)
+            return
+        self.store.save(game.id, game.to_record(), word_service.export_pool(game.id))
+
+    # ============================================
+    # ESTADO COMPARTILHADO ENTRE WORKERS
+    # ============================================
+
+    def _fetch_call(self, game_id: str) -> tuple:
+        return (self.store.fetch, game_id, self._versions.get(game_id, 0))
+
+    async def _refresh(self, game_id: str):
+        """Atualiza a cópia local com a versão do store compartilhado"""
+        self._apply_fetched(game_id, *await self.store.run(*self._fetch_call(game_id)))
+
+    def _apply_fetched(self, game_id: str, version: int, record: Optional[dict],
+                       pool: Optional[dict]):
+        if version == 0:
+            # Removido por outro worker
+            if game_id in self.games:
+                self._release(game_id)
+            return
+
+        if record is None:
+            return
+
+        game = Game.from_record(record)
+        self.games[game_id] = game
+        self._versions[game_id] = version
+        self._track(game)
+        if pool:
+            word_service.restore_pool(game_id, pool)
+        else:
+            word_service.init_game_pool(game_id, game.themes, game.levels)
+
+    async def load(self, game_id: str) -> Optional[Game]:
+        """get_game() com a cópia local atualizada pelo store compartilhado"""
+        game_id = game_id.upper()
+        if self.store.shared:
+            await self._refresh(game_id)
+        return self.games.get(game_id)
+
+    async def load_all(self) -> List[Game]:
+        """get_all_games() incluindo as partidas dos outros workers"""
+        if self.store.shared:
+            game_ids = await self.store.run(self.store.game_ids)
+            for game_id in set(game_ids) | set(self.games):
+                await self._refresh(game_id)
+        return list(self.games.values())
+
+    @contextlib.asynccontextmanager
+    async def exclusive(self, game_id: str):
+        """
+        Envolve cada alteração de uma partida. Com estado compartilhado,
+        pega a trava da partida no store, relê a cópia local e, na saída,
+        grava o que mudou e solta a trava. Nos outros stores não faz nada.
+        """
+        if not self.store.shared:
+            yield
+            return
+
+        game_id = game_id.upper()
+        owner = f'{os.getpid()}:{next(self._lock_ids)}'
+        unlock = (self.store.unlock, game_id, owner)
+        # Trava e leitura numa ida só à thread do store; gravação e
+        # liberação da trava também
+        fetched, = await self.store.lock(game_id, owner, self._fetch_call(game_id))
+        try:
+            self._apply_fetched(game_id, *fetched)
+            yield
+            await self.commit(game_id, unlock)
+        except BaseException:
+            # A cópia local pode ter ficado pela metade: relê na próxima vez
+            self._dirty.discard(game_id)
+            self._versions.pop(game_id, None)
+            await self.store.run(*unlock)
+            raise
+
+    async def commit(self, game_id: str, *then) -> bool:
+        """
+        Grava no store compartilhado o que _persist() marcou (e roda as
+        chamadas `then` em seguida). False se outro worker gravou antes:
+        a cópia local é relida no próximo acesso.
+        """
+        game = self.games.get(game_id)
+        if game_id in self._removed:
+            self._removed.discard(game_id)
+            await self.store.run_all((self.store.delete, game_id), *then)
+            return True
+        if game_id not in self._dirty or game is None:
+            if then:
+                await self.store.run_all(*then)
+            return True
+        self._dirty.discard(game_id)
+
+        version, *_ = await self.store.run_all(
+            (self.store.save, game_id, game.to_record(),
+             word_service.export_pool(game_id), self._versions.get(game_id, 0)),
+            *then)
+        if version is None:
+            log.warning('write_conflict', game_id=game_id)
+            self._versions.pop(game_id, None)
+            return False
+        self._versions[game_id] = version
+        return True
+
+    async def add_game(self, data: dict) -> Game:
+        """
+        create_game() já gravado no store. Com estado compartilhado, outro
+        worker pode ter usado o mesmo código: tenta o próximo.
+        """
+        for _ in range(5):
+            game = self.create_game(data)
+            if not self.store.shared or await self.commit(game.id):
+                return game
+            self._release(game.id)
+        raise RuntimeError('Não foi possível gravar a nova partida')
+
+    async def adjust_clients(self, game_id: str, client_type: str, delta: int) -> int:
+        """Clientes conectados à partida (no store compartilhado, de todos os workers)"""
+        if self.store.shared:
+            return await self.store.run(
+                self.store.adjust_clients, game_id, client_type, delta)
+        return self.store.adjust_clients(game_id, client_type, delta)
+
+    def _reload_word_lists(self):
+        """Atualiza desafios e palavras amaldiçoadas após recarga dos bancos"""
         self.challenges = self._load_challenges()
         self.cursed_words = self._load_cursed_words()
 
     def _load_challenges(self) -> List[str]:
         """Carrega desafios do word_service ou usa padrão"""
-        if 'desafios' in word_service.word_banks:
-            return [w['word'] for w in word_service.word_banks['desafios']]
+        if word_service.store.has_theme('desafios'):
+            return word_service.store.theme_words('desafios')
         return [
             "Conte de 1 a 50 em 30 segundos",
             "Diga 10 capitais de países",
@@ -41,13 +303,8 @@ class GameService:
         Palavras/frases difíceis para carta amaldiçoada.
         Mistura termos desafiadores com pequenas frases de descrição.
         """
-        cursed: List[str] = []
-
         # Pega palavras de nível alto dos bancos (se existirem)
-        for theme, words in word_service.word_banks.items():
-            for w in words:
-                if w.get('level', 1) >= 4:
-                    cursed.append(w['word'])
+        cursed: List[str] = word_service.store.words_with_min_level(4)
 
         # Lista padrão de "palavras amaldiçoadas" mais pronunciáveis
         default_cursed = [
@@ -85,9 +342,7 @@ class GameService:
 
     def create_game(self, data: dict) -> Game:
         """Cria uma nova partida"""
-        game_id = Game.generate_id()
-        while game_id in self.games:
-            game_id = Game.generate_id()
+        game_id = self.ids.allocate(taken=self.games.__contains__)
 
         # Cria times
         team1_players = [Player(name=n)
@@ -123,9 +378,10 @@ class GameService:
         )
 
         self.games[game_id] = game
-        word_service.init_game_pool(game_id)
+        word_service.init_game_pool(game_id, game.themes, game.levels)
+        self._persist(game)
 
-        print(f"[GameService] Jogo criado: {game_id}")
+        log.info('game_created', game_id=game_id, themes=game.themes, levels=game.levels)
         return game
 
     def get_game(self, game_id: str) -> Optional[Game]:
@@ -142,7 +398,8 @@ class GameService:
             game.current_round = 0
             game.cursed_count = 0
             game.challenge_count = 0
-            print(f"[GameService] Jogo {game_id} iniciado")
+            self._persist(game)
+            log.info('game_started', game_id=game_id)
         return game
 
     def prepare_round(self, game_id: str) -> Optional[dict]:
@@ -174,8 +431,9 @@ class GameService:
                 is_challenge=True,
                 challenge_text=challenge_text
             )
-            print(
-                f"[GameService] Rodada {game.current_round}: DESAFIO ({game.challenge_count}/{game.config.max_challenges_per_game})")
+            round_log.info('round_prepared', game_id=game_id, round=game.current_round,
+                           kind='challenge', count=game.challenge_count,
+                           max=game.config.max_challenges_per_game)
 
         elif is_cursed:
             # Carta amaldiçoada
@@ -187,11 +445,13 @@ class GameService:
                 is_cursed=True,
                 cursed_word=cursed_word
             )
-            print(
-                f"[GameService] Rodada {game.current_round}: CARTA AMALDIÇOADA ({game.cursed_count}/{game.config.max_cursed_per_game})")
+            round_log.info('round_prepared', game_id=game_id, round=game.current_round,
+                           kind='cursed', count=game.cursed_count,
+                           max=game.config.max_cursed_per_game)
 
         else:
             # Rodada normal
+            started = time.perf_counter()
             card_data = word_service.get_card_words(
                 game_id=game_id,
                 themes=game.themes,
@@ -200,9 +460,12 @@ class GameService:
                 bonus_chance=game.config.bonus_chance,
                 cursed_chance=0
             )
+            card_time = time.perf_counter() - started
+            metrics.card_generation.observe(card_time)
 
             if not card_data:
-                print(f"[GameService] Erro: não conseguiu gerar carta")
+                log.error('card_generation_failed', game_id=game_id, themes=game.themes,
+                          levels=game.levels)
                 return None
 
             card = Card(
@@ -215,9 +478,11 @@ class GameService:
                 team=game.current_team,
                 card=card
             )
-            print(f"[GameService] Rodada {game.current_round}: Normal")
+            round_log.info('round_prepared', game_id=game_id, round=game.current_round,
+                           kind='normal', card_ms=card_time * 1000)
 
         game.current_round_data = round_data
+        self._persist(game)
 
         return {
             'game': game.to_dict(),
@@ -230,21 +495,60 @@ class GameService:
         if not game or not game.current_round_data:
             return None
 
-        game.current_round_data.started = True
+        round_data = game.current_round_data
+        if not round_data.started:
+            # O prazo é do servidor: apertar "começar" de novo não reinicia
+            round_data.started = True
+            round_data.ends_at = int(time.time() * 1000) + game.config.round_time * 1000
+            self._persist(game)
+            self._schedule_deadline(game)
+
+        remaining_ms = None
+        if round_data.ends_at is not None:
+            remaining_ms = max(0, round_data.ends_at - int(time.time() * 1000))
 
         return {
             'game': game.to_dict(),
-            'round': game.current_round_data.to_dict()
+            'round': round_data.to_dict(),
+            'ends_at': round_data.ends_at,
+            'remaining_ms': remaining_ms
         }
 
+    def expire_round(self, game_id: str, round_number: Optional[int] = None,
+                     from_client: bool = False) -> Optional[dict]:
+        """
+        Encerra o tempo da rodada (uma vez só). Avisos de clientes só valem
+        se o prazo do servidor já passou, com TIMER_CLIENT_GRACE_MS de folga.
+        """
+        game = self.get_game(game_id)
+        if not game or not game.current_round_data:
+            return None
+
+        round_data = game.current_round_data
+        if round_number is not None and round_data.round_number != round_number:
+            return None
+        if round_data.time_up or not round_data.started:
+            return None
+        if from_client and round_data.ends_at is not None:
+            if time.time() * 1000 < round_data.ends_at - TIMER_CLIENT_GRACE_MS:
+                return None
+
+        round_data.time_up = True
+        self.timers.cancel(('round', game.id))
+        self._persist(game)
+        return self.end_round(game.id)
+
     def register_hit(self, game_id: str, word: str, is_bonus: bool = False) -> bool:
         """Registra uma palavra acertada"""
         game = self.get_game(game_id)
         if not game or not game.current_round_data:
             return False
 
-        if word not in game.current_round_data.player_hits:
-            game.current_round_data.player_hits.append(word)
+        round_data = game.current_round_data
+        if word not in round_data.player_hits:
+            round_data.player_hits.append(word)
+            round_data.mark_dirty()
+            self._persist(game)
 
         return True
 
@@ -298,6 +602,8 @@ class GameService:
 
         # Limpa rodada atual
         game.current_round_data = None
+        self.timers.cancel(('round', game.id))
+        self._persist(game)
 
         return {
             'game': game.to_dict(),
@@ -340,6 +646,8 @@ class GameService:
 
         # Limpa rodada
         game.current_round_data = None
+        self.timers.cancel(('round', game.id))
+        self._persist(game)
 
         return {
             'game': game.to_dict(),
@@ -383,6 +691,8 @@ class GameService:
 
         # Limpa rodada
         game.current_round_data = None
+        self.timers.cancel(('round', game.id))
+        self._persist(game)
 
         return {
             'game': game.to_dict(),
@@ -399,12 +709,107 @@ class GameService:
 
     def delete_game(self, game_id: str) -> bool:
         """Remove uma partida"""
-        if game_id in self.games:
-            word_service.clear_game_pool(game_id)
-            del self.games[game_id]
+        game_id = game_id.upper()
+        if self.get_game(game_id):
+            self._release(game_id)
+            if self.store.shared:
+                self._removed.add(game_id)
+            else:
+                self.store.delete(game_id)
             return True
         return False
 
+    def _release(self, game_id: str):
+        """Libera tudo que a partida ocupa neste processo"""
+        word_service.clear_game_pool(game_id)
+        del self.games[game_id]
+        self._versions.pop(game_id, None)
+        self._dirty.discard(game_id)
+        self._activity.pop(game_id, None)
+        self._finished.pop(game_id, None)
+        self.ids.release(game_id)
+        self.timers.cancel(('round', game_id))
+        for callback in self._delete_listeners:
+            try:
+                callback(game_id)
+            except Exception as e:
+                log.exception('release_listener_failed', game_id=game_id, error=str(e))
+
+    def _expired_ids(self, now: float) -> List[str]:
+        expired = []
+        for queue, ttl in ((self._finished, self.finished_ttl),
+                           (self._activity, self.idle_ttl)):
+            for game_id, since in queue.items():
+                if now - since < ttl:
+                    break
+                expired.append(game_id)
+        return list(dict.fromkeys(expired))
+
+    def _game_bytes(self, game_id: str) -> int:
+        """Estimativa do que a partida ocupa: registro serializado + baralho"""
+        game = self.games[game_id]
+        deck = word_service.decks.get(game_id)
+        size = len(json.dumps(game.to_record()))
+        return size + (deck.nbytes if deck else 0)
+
+    def _reap(self, game_id: str) -> bool:
+        size = self._game_bytes(game_id)
+        if not self.delete_game(game_id):
+            return False
+        self.reaped_games += 1
+        self.reaped_bytes += size
+        return True
+
+    def reap_expired(self, now: Optional[float] = None) -> List[str]:
+        """Remove partidas terminadas ou paradas há mais que o TTL"""
+        now = time.monotonic() if now is None else now
+        return [game_id for game_id in self._expired_ids(now) if self._reap(game_id)]
+
+    async def reap_shared(self, now: Optional[float] = None) -> List[str]:
+        """reap_expired() com estado compartilhado: cada partida sob a trava dela"""
+        now = time.monotonic() if now is None else now
+        reaped = []
+        for game_id in self._expired_ids(now):
+            version = self._versions.get(game_id)
+            async with self.exclusive(game_id):
+                # Outro worker pode ter mexido na partida
+                if (game_id in self.games and self._versions.get(game_id) == version
+                        and self._reap(game_id)):
+                    reaped.append(game_id)
+        return reaped
+
+    async def reap_games(self, interval: float = 30.0):
+        """Executa reap_expired() periodicamente"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self.store.shared:
+                    reaped = await self.reap_shared()
+                else:
+                    reaped = self.reap_expired()
+                if reaped:
+                    log.info('games_reaped', count=len(reaped))
+            except Exception as e:
+                log.exception('reaper_failed', error=str(e))
+
+    def reaper_stats(self) -> dict:
+        states: Dict[str, int] = {}
+        for game in self.games.values():
+            states[game.state] = states.get(game.state, 0) + 1
+        stats = {
+            "games": len(self.games),
+            "games_by_state": states,
+            "reaped_games": self.reaped_games,
+            "reaped_bytes": self.reaped_bytes,
+            "idle_ttl": self.idle_ttl,
+            "finished_ttl": self.finished_ttl,
+            "ids": self.ids.stats(),
+            "timers": self.timers.stats()
+        }
+        if self.store.shared:
+            stats["store"] = self.store.stats()
+        return stats
+
 
 # Instância global
 game_service = GameService()
@@ -0,0 +1,433 @@
+"""
+30 Segundos v3.1 - Persistência dos Jogos
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.services.log import get_logger
+
+# Espera (ms) do SQLite por um banco ocupado antes de cada nova tentativa
+GAME_STORE_BUSY_MS = int(os.environ.get('GAME_STORE_BUSY_MS', '50'))
+# Tentativas de uma instrução com o banco ocupado
+GAME_STORE_RETRIES = int(os.environ.get('GAME_STORE_RETRIES', '20'))
+# Segundos que a trava de uma partida vale (worker que morreu a solta)
+GAME_LOCK_TTL = float(os.environ.get('GAME_LOCK_TTL', '10'))
+
+log = get_logger('game.store')
+
+
+class GameStore:
+    """
+    Interface de persistência usada pelo GameService. Os jogos ativos
+    ficam sempre no dict em memória do serviço; o store só guarda cópias
+    para restaurar depois de um reinício.
+
+    Stores com `persistent = False` não guardam nada, e o serviço nem
+    monta o registro para eles. Stores com `shared = True` são a fonte
+    da verdade para vários processos: o serviço relê o jogo e grava as
+    alterações por GameService.exclusive(), fora do event loop.
+    """
+
+    persistent = False
+    shared = False
+
+    def __init__(self):
+        self._clients: Dict[str, Dict[str, int]] = {}
+
+    def load_all(self) -> List[Tuple[dict, Optional[dict]]]:
+        """Retorna (registro do jogo, estado do baralho) de cada jogo salvo"""
+        return []
+
+    def save(self, game_id: str, record: dict, pool: Optional[dict]) -> Optional[int]:
+        """Salva o jogo; stores compartilhados retornam a nova versão"""
+        return None
+
+    def delete(self, game_id: str):
+        self._clients.pop(game_id, None)
+
+    def adjust_clients(self, game_id: str, client_type: str, delta: int) -> int:
+        """Soma `delta` aos clientes conectados do tipo; retorna o total"""
+        counts = self._clients.setdefault(game_id, {'board': 0, 'player': 0})
+        counts[client_type] = max(0, counts.get(client_type, 0) + delta)
+        return counts[client_type]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class MemoryGameStore(GameStore):
+    """Sem persistência: o estado vive só no processo"""
+
+
+class SQLiteGameStore(GameStore):
+    """
+    Persistência em SQLite com escrita adiada (write-behind).
+
+    save() e delete() só registram a última versão de cada jogo num dict
+    pendente; uma thread grava os pendentes em lote, numa transação, a
+    cada `flush_interval` segundos. Vários eventos do mesmo jogo dentro
+    de um intervalo viram uma única escrita.
+    """
+
+    persistent = True
+    _DELETE = object()
+
+    def __init__(self, path: str, flush_interval: float = 0.05):
+        super().__init__()
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flushed = threading.Condition(self._lock)
+        self._closed = False
+        self._writing = False
+        self.writes = 0
+        self.batches = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS games (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                pool TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+        self._thread = threading.Thread(
+            target=self._run, name='game-store-writer', daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def load_all(self) -> List[Tuple[dict, Optional[dict]]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT data, pool FROM games").fetchall()
+        finally:
+            conn.close()
+
+        result = []
+        for data, pool in rows:
+            try:
+                result.append((json.loads(data), json.loads(pool) if pool else None))
+            except ValueError as e:
+                log.warning('invalid_record', error=str(e))
+        return result
+
+    def save(self, game_id: str, record: dict, pool: Optional[dict]):
+        # `record` vem de dicts memoizados e imutáveis: guardar a referência basta
+        with self._lock:
+            self._pending[game_id] = (record, pool)
+        self._wake.set()
+
+    def delete(self, game_id: str):
+        super().delete(game_id)
+        with self._lock:
+            self._pending[game_id] = self._DELETE
+        self._wake.set()
+
+    def flush(self, timeout: float = 5.0):
+        """Espera os pendentes chegarem ao disco"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while (self._pending or self._writing) and not self._closed:
+                self._wake.set()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._flushed.wait(remaining)
+
+    def close(self):
+        self.flush()
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+
+    def _run(self):
+        conn = self._connect()
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            # Junta o que chegar durante o intervalo numa só transação
+            time.sleep(self.flush_interval)
+
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._writing = bool(batch)
+            if batch:
+                try:
+                    self._write(conn, batch)
+                except sqlite3.Error as e:
+                    log.error('batch_write_failed', rows=len(batch), error=str(e))
+
+            with self._lock:
+                self._writing = False
+                self._flushed.notify_all()
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: Dict[str, object]):
+        now = time.time()
+        upserts = []
+        deletes = []
+        for game_id, item in batch.items():
+            if item is self._DELETE:
+                deletes.append((game_id,))
+            else:
+                record, pool = item
+                upserts.append((game_id, json.dumps(record),
+                                json.dumps(pool) if pool else None, now))
+
+        with conn:
+            if upserts:
+                conn.executemany(
+                    "INSERT INTO games (id, data, pool, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET data=excluded.data, "
+                    "pool=excluded.pool, updated_at=excluded.updated_at",
+                    upserts)
+            if deletes:
+                conn.executemany("DELETE FROM games WHERE id = ?", deletes)
+
+        self.writes += len(batch)
+        self.batches += 1
+
+
+class SharedSQLiteGameStore(GameStore):
+    """
+    Estado compartilhado entre processos (modo com vários workers).
+
+    Toda a E/S roda numa thread própria do store (`await store.run(...)`),
+    nunca no event loop. Quem altera uma partida pega antes a trava dela
+    (uma linha em `locks`, com prazo para o caso de o worker morrer), então
+    workers diferentes só esperam uns pelos outros na mesma partida. As
+    gravações conferem a versão lida (UPDATE ... WHERE version = ?) e cada
+    instrução é curta: com o banco ocupado, espera `busy_timeout` e tenta
+    de novo, em vez de travar por segundos.
+    """
+
+    persistent = True
+    shared = True
+
+    def __init__(self, path: str, busy_timeout: float = GAME_STORE_BUSY_MS / 1000,
+                 retries: int = GAME_STORE_RETRIES):
+        super().__init__()
+        self.path = path
+        self.retry_limit = retries
+        self.retries = 0
+        self.lock_waits = 0
+        self.conflicts = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Uma thread só: a conexão nunca é usada por duas ao mesmo tempo
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='game-store')
+        # isolation_level=None: cada instrução confirma sozinha
+        self._conn = sqlite3.connect(
+            path, timeout=busy_timeout, isolation_level=None,
+            check_same_thread=False)
+        self._retry(self._create_tables)
+
+    def _create_tables(self):
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS games (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                pool TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        columns = [row[1] for row in
+                   self._conn.execute("PRAGMA table_info(games)")]
+        if 'version' not in columns:
+            self._conn.execute(
+                "ALTER TABLE games ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS clients (
+                game_id TEXT NOT NULL,
+                type TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (game_id, type)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS locks (
+                game_id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    def _retry(self, fn: Callable, *args):
+        """Banco ocupado por outro worker: espera um pouco e tenta de novo"""
+        delay = 0.002
+        for attempt in range(self.retry_limit):
+            try:
+                return fn(*args)
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or attempt == self.retry_limit - 1:
+                    raise
+                self.retries += 1
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+
+    def _run_all(self, calls) -> list:
+        return [self._retry(fn, *args) for fn, *args in calls]
+
+    async def run(self, fn: Callable, *args):
+        """Executa `fn(*args)` na thread do store"""
+        return (await self.run_all((fn, *args)))[0]
+
+    async def run_all(self, *calls) -> list:
+        """Várias chamadas (fn, *args) numa única ida à thread do store"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_all, calls)
+
+    # ============================================
+    # TRAVA POR PARTIDA
+    # ============================================
+
+    def try_lock(self, game_id: str, owner: str, ttl: float = GAME_LOCK_TTL) -> bool:
+        now = time.time()
+        row = self._conn.execute(
+            "INSERT INTO locks (game_id, owner, expires_at) VALUES (?1, ?2, ?3) "
+            "ON CONFLICT(game_id) DO UPDATE SET owner=excluded.owner, "
+            "expires_at=excluded.expires_at WHERE locks.expires_at < ?4 "
+            "RETURNING owner",
+            (game_id, owner, now + ttl, now)).fetchone()
+        return row is not None
+
+    def unlock(self, game_id: str, owner: str):
+        self._conn.execute(
+            "DELETE FROM locks WHERE game_id = ? AND owner = ?", (game_id, owner))
+
+    def _lock_then(self, game_id: str, owner: str, calls) -> Optional[list]:
+        if not self._retry(self.try_lock, game_id, owner):
+            return None
+        return self._run_all(calls)
+
+    async def lock(self, game_id: str, owner: str, *then, timeout: float = GAME_LOCK_TTL) -> list:
+        """
+        Espera a trava da partida (sem ocupar o event loop) e roda as
+        chamadas `then` logo depois, na mesma ida à thread
+        """
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout
+        delay = 0.002
+        while True:
+            results = await loop.run_in_executor(
+                self._executor, self._lock_then, game_id, owner, then)
+            if results is not None:
+                return results
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Partida {game_id} travada por outro worker')
+            self.lock_waits += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    # ============================================
+    # PARTIDAS
+    # ============================================
+
+    def fetch(self, game_id: str, known_version: int) -> Tuple[int, Optional[dict], Optional[dict]]:
+        """
+        Retorna (versão, registro, baralho). Versão 0 = jogo não existe;
+        registro None = a cópia em `known_version` continua valendo.
+        """
+        row = self._conn.execute(
+            "SELECT version, CASE WHEN version != ?1 THEN data END, "
+            "CASE WHEN version != ?1 THEN pool END FROM games WHERE id = ?2",
+            (known_version, game_id)).fetchone()
+        if row is None:
+            return 0, None, None
+        version, data, pool = row
+        if data is None:
+            return version, None, None
+        return version, json.loads(data), json.loads(pool) if pool else None
+
+    def game_ids(self) -> List[str]:
+        return [row[0] for row in self._conn.execute("SELECT id FROM games")]
+
+    def save(self, game_id: str, record: dict, pool: Optional[dict],
+             expected_version: int = 0) -> Optional[int]:
+        """
+        Grava se o jogo ainda está em `expected_version` (0 = jogo novo).
+        Retorna a nova versão, ou None se outro worker gravou antes.
+        """
+        data = json.dumps(record)
+        pool_data = json.dumps(pool) if pool else None
+        if expected_version == 0:
+            row = self._conn.execute(
+                "INSERT INTO games (id, data, pool, updated_at, version) "
+                "VALUES (?, ?, ?, ?, 1) ON CONFLICT(id) DO NOTHING RETURNING version",
+                (game_id, data, pool_data, time.time())).fetchone()
+        else:
+            row = self._conn.execute(
+                "UPDATE games SET data = ?, pool = ?, updated_at = ?, "
+                "version = version + 1 WHERE id = ? AND version = ? RETURNING version",
+                (data, pool_data, time.time(), game_id, expected_version)).fetchone()
+        if row is None:
+            self.conflicts += 1
+            return None
+        return row[0]
+
+    def delete(self, game_id: str):
+        self._conn.execute("DELETE FROM games WHERE id = ?", (game_id,))
+        self._conn.execute("DELETE FROM clients WHERE game_id = ?", (game_id,))
+
+    def adjust_clients(self, game_id: str, client_type: str, delta: int) -> int:
+        row = self._conn.execute(
+            "INSERT INTO clients (game_id, type, count) VALUES (?1, ?2, max(0, ?3)) "
+            "ON CONFLICT(game_id, type) DO UPDATE SET "
+            "count=max(0, clients.count + ?3) RETURNING count",
+            (game_id, client_type, delta)).fetchone()
+        return row[0]
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "lock_waits": self.lock_waits,
+            "conflicts": self.conflicts
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+def create_game_store() -> GameStore:
+    """Cria o store configurado por GAME_STORE (memory | sqlite | shared)"""
+    kind = os.environ.get('GAME_STORE', 'memory').lower()
+    path = os.environ.get('GAME_DB_PATH', os.path.join('data', 'games.db'))
+    if kind == 'sqlite':
+        log.info('store_selected', kind='sqlite', path=path)
+        return SQLiteGameStore(path)
+    if kind == 'shared':
+        log.info('store_selected', kind='shared', path=path)
+        return SharedSQLiteGameStore(path)
+    return MemoryGameStore()
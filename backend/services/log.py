@@ -0,0 +1,182 @@
+"""
+30 Segundos v3.1 - Logs Estruturados
+
+Os registros saem como uma linha `chave=valor` (evento, partida, tempos)
+e são escritos por uma thread própria: o event loop só coloca o registro
+numa fila, então um terminal lento ou um stdout redirecionado não atrasa
+as partidas. Com a fila cheia (LOG_QUEUE_SIZE) o registro é descartado
+e contado, nunca espera.
+
+Cada módulo tem um logger com nome ('game', 'game.round', 'word.deck',
+'socket', 'socket.command'...) e o nível vem do ambiente:
+
+    LOG_LEVEL=INFO                                  # nível geral
+    LOG_LEVELS=game.round=WARNING,socket=WARNING    # por logger
+
+Abaixo do nível o registro é descartado antes de montar qualquer coisa
+(só um `isEnabledFor`), então o falatório por rodada desligado em
+produção não custa nada.
+
+Uso:
+    log = get_logger('game')
+    log.info('game_created', game_id=game.id, themes=game.themes)
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Nível geral dos logs (DEBUG, INFO, WARNING, ERROR)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+# Níveis por logger: "game.round=WARNING,socket=DEBUG"
+LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+# Registros aguardando a thread de escrita; além disso são descartados
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+
+ROOT = '30s'
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """'game.round=WARNING,socket=DEBUG' -> {'game.round': 'WARNING', ...}"""
+    levels = {}
+    for part in spec.split(','):
+        name, _, level = part.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return f'{value:.3f}'.rstrip('0').rstrip('.')
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+    text = str(value)
+    if not text or any(c in text for c in ' "=\n'):
+        return json.dumps(text, ensure_ascii=False)
+    return text
+
+
+class KeyValueFormatter(logging.Formatter):
+    """`hora nível logger evento chave=valor ...` em uma linha"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        created = time.strftime('%H:%M:%S', time.localtime(record.created))
+        parts = [f'{created}.{int(record.msecs):03d}', f'{record.levelname:<7}',
+                 record.name[len(ROOT) + 1:] or ROOT, record.getMessage()]
+        fields = getattr(record, 'fields', None)
+        if fields:
+            parts.extend(f'{key}={_format_value(value)}' for key, value in fields.items())
+        if record.exc_info:
+            parts.append('\n' + self.formatException(record.exc_info))
+        return ' '.join(parts)
+
+
+class _Handoff(QueueHandler):
+    """
+    Passa o registro para a thread de escrita sem formatar (o
+    QueueHandler padrão formata na thread de quem loga) e sem esperar
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredLogger:
+    __slots__ = ('_logger',)
+
+    def __init__(self, logger: logging.Logger):
+        self._logger = logger
+
+    def _log(self, level: int, event: str, fields: dict, exc_info=None):
+        if self._logger.isEnabledFor(level):
+            self._logger._log(level, event, (), exc_info=exc_info, extra={'fields': fields})
+
+    def debug(self, event: str, /, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event: str, /, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event: str, /, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event: str, /, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event: str, /, **fields):
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+_handler: Optional[_Handoff] = None
+_listener: Optional[QueueListener] = None
+_loggers: Dict[str, StructuredLogger] = {}
+
+
+def setup_logging():
+    """Liga a fila e a thread de escrita (uma vez por processo)"""
+    global _handler, _listener
+    if _handler is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(KeyValueFormatter())
+    _handler = _Handoff(log_queue)
+
+    root = logging.getLogger(ROOT)
+    root.addHandler(_handler)
+    root.propagate = False
+    root.setLevel(LOG_LEVEL)
+    set_levels(parse_levels(LOG_LEVELS))
+
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Escreve o que ainda está na fila e para a thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def set_levels(levels: Dict[str, str]):
+    """Ajusta o nível de cada logger ('game.round' -> 'WARNING')"""
+    for name, level in levels.items():
+        logging.getLogger(f'{ROOT}.{name}').setLevel(level)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    logger = _loggers.get(name)
+    if logger is None:
+        setup_logging()
+        logger = _loggers[name] = StructuredLogger(logging.getLogger(f'{ROOT}.{name}'))
+    return logger
+
+
+def log_stats() -> dict:
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "level": LOG_LEVEL,
+        "levels": parse_levels(LOG_LEVELS)
+    }
@@ -0,0 +1,265 @@
+"""
+30 Segundos v3.1 - Métricas do Servidor
+
+Contadores e histogramas em memória, expostos em /metrics no formato de
+texto do Prometheus. Registrar uma observação é uma busca binária e dois
+incrementos, sem locks (tudo roda no event loop), então a
+instrumentação fica ligada mesmo com o servidor cheio.
+
+Os valores que já existem em outros serviços (partidas por estado,
+sessões por papel, cronômetros) não são copiados: são lidos na hora da
+coleta pelos coletores registrados com `add_collector`.
+"""
+
+import inspect
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.services.log import get_logger
+
+log = get_logger('metrics')
+
+# Limites (segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Geração de carta: normalmente dezenas de µs, mais no primeiro baralho
+CARD_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                0.001, 0.0025, 0.01, 0.05, 0.25)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = Tuple[str, ...]
+Reader = Callable[[], Iterable[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _positional_count(handler: Callable) -> Optional[int]:
+    """Quantos argumentos posicionais o handler aceita (None = qualquer número)"""
+    parameters = inspect.signature(handler, follow_wrapped=False).parameters.values()
+    if any(p.kind == p.VAR_POSITIONAL for p in parameters):
+        return None
+    return sum(1 for p in parameters
+               if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Labels = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for labels, value in self._values.items():
+            formatted = _format_labels(dict(zip(self.label_names, labels)))
+            lines.append(f'{self.name}{formatted} {_format_value(value)}')
+        return lines
+
+
+class HistogramSeries:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size: int):
+        # Uma posição por limite e a última para o que passou de todos
+        self.counts = [0] * (size + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Labels = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = HistogramSeries(len(self.buckets))
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, series in self._series.items():
+            base = dict(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series.counts):
+                cumulative += count
+                bucket_labels = _format_labels({**base, 'le': _format_value(bound)})
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(base)} {_format_value(series.sum)}')
+            lines.append(f'{self.name}_count{_format_labels(base)} {series.count}')
+        return lines
+
+
+class Gauge:
+    """Valores lidos na hora da coleta"""
+
+    def __init__(self, name: str, help_text: str, read: Reader):
+        self.name = name
+        self.help = help_text
+        self.read = read
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge']
+        for labels, value in self.read():
+            lines.append(f'{self.name}{_format_labels(labels)} {_format_value(value)}')
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.started_at = time.time()
+
+        self.socket_latency = Histogram(
+            'socket_handler_duration_seconds',
+            'Tempo de cada evento Socket.IO, incluindo a espera na fila da partida',
+            ('event',))
+        self.socket_errors = Counter(
+            'socket_handler_errors_total', 'Eventos Socket.IO que terminaram em exceção',
+            ('event',))
+        self.http_latency = Histogram(
+            'http_request_duration_seconds', 'Tempo das requisições HTTP por rota',
+            ('method', 'route'))
+        self.http_requests = Counter(
+            'http_requests_total', 'Requisições HTTP por rota e status',
+            ('method', 'route', 'status'))
+        self.emit_packets = Counter(
+            'socketio_emit_packets_total', 'Pacotes emitidos por evento', ('event',))
+        self.emit_bytes = Counter(
+            'socketio_emit_bytes_total', 'Bytes (JSON) dos pacotes emitidos por evento', ('event',))
+        self.card_generation = Histogram(
+            'card_generation_duration_seconds', 'Tempo para sortear as palavras de uma carta',
+            buckets=CARD_BUCKETS)
+
+        self._metrics: List = [
+            self.socket_latency, self.socket_errors, self.http_latency,
+            self.http_requests, self.emit_packets, self.emit_bytes,
+            self.card_generation,
+        ]
+
+    def add_collector(self, name: str, help_text: str, read: Reader):
+        """Gauge calculado na coleta a partir de outro serviço"""
+        self._metrics = [m for m in self._metrics if m.name != name]
+        self._metrics.append(Gauge(name, help_text, read))
+
+    # ============================================
+    # INSTRUMENTAÇÃO
+    # ============================================
+
+    def instrument(self, event: str, handler: Callable) -> Callable:
+        """Envolve um handler assíncrono do Socket.IO medindo o tempo"""
+        observe = self.socket_latency.observe
+        # O Socket.IO passa argumentos novos (auth, motivo do disconnect) e
+        # tenta de novo sem eles se o handler der TypeError; aqui o excesso
+        # é cortado antes, senão cada conexão contaria como erro
+        accepted = _positional_count(handler)
+
+        async def timed(*args):
+            started = time.perf_counter()
+            try:
+                return await handler(*args[:accepted])
+            except Exception:
+                self.socket_errors.inc(event)
+                raise
+            finally:
+                observe(time.perf_counter() - started, event)
+
+        timed.__name__ = getattr(handler, '__name__', event)
+        timed.__doc__ = handler.__doc__
+        return timed
+
+    def record_emit(self, event: str, size: int):
+        """Um pacote codificado (uma vez por emit, não por destinatário)"""
+        self.emit_packets.inc(event)
+        self.emit_bytes.inc(event, amount=size)
+
+    def render(self) -> str:
+        lines = [
+            '# HELP process_uptime_seconds Segundos desde o início do processo',
+            '# TYPE process_uptime_seconds gauge',
+            f'process_uptime_seconds {_format_value(round(time.time() - self.started_at, 3))}',
+        ]
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                log.error('collect_failed', metric=metric.name, error=str(e))
+        return '\n'.join(lines) + '\n'
+
+
+def _with_prefix(path: str, route: str) -> str:
+    """
+    Template da rota com o prefixo do router (/api), que algumas versões
+    do FastAPI deixam de fora do `route.path`: os segmentos do caminho
+    pedido que sobram antes dos do template
+    """
+    extra = path.count('/') - route.count('/')
+    if extra <= 0 or ':path}' in route:
+        return route
+    return '/'.join(path.split('/')[:extra + 1]) + route
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede as requisições HTTP. A rota vem do template
+    (/api/games/{game_id}), não do caminho, para não abrir uma série por
+    partida; o que não casou com nenhuma rota conta como "unmatched".
+    """
+
+    def __init__(self, app, registry: Optional[Metrics] = None):
+        self.app = app
+        self.metrics = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get('route'), 'path', None)
+            path = _with_prefix(scope.get('path', ''), route) if route else 'unmatched'
+            method = scope.get('method', '')
+            self.metrics.http_latency.observe(time.perf_counter() - started, method, path)
+            self.metrics.http_requests.inc(method, path, str(status[0]))
+
+
+# Instância global
+metrics = Metrics()
@@ -1,46 +1,106 @@
 """Serviço de geração de QR Codes"""
 
+import asyncio
 import io
 import base64
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from backend.services.log import get_logger
+
+log = get_logger('qr')
 
 try:
     import qrcode
     HAS_QRCODE = True
 except ImportError:
     HAS_QRCODE = False
-    print("[QRService] Biblioteca qrcode não instalada")
+    log.warning('qrcode_missing')
 
 
 class QRService:
-    """Gera QR Codes para acesso dos jogadores"""
+    """
+    Gera QR Codes para acesso dos jogadores.
 
-    def generate_qr_base64(self, url: str) -> str:
-        """Gera QR Code e retorna como base64"""
-        if not HAS_QRCODE:
-            return ""
+    A renderização (PIL) roda num pool de threads para não travar o
+    event loop, e o PNG fica num cache LRU indexado pela URL do jogador.
+    """
 
-        try:
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(url)
-            qr.make(fit=True)
+    def __init__(self, cache_size: int = 256, workers: int = 2):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='qr')
+
+    def _render_png(self, url: str) -> bytes:
+        """Desenha o QR Code (bloqueante)"""
+        # Correção M (padrão da biblioteca): o código costuma ser lido na
+        # tela projetada ou impresso, onde o nível L falha mais
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_M,
+            box_size=10,
+            border=2,
+        )
+        qr.add_data(url)
+        qr.make(fit=True)
+
+        img = qr.make_image(fill_color="black", back_color="white")
 
-            img = qr.make_image(fill_color="black", back_color="white")
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG')
+        return buffer.getvalue()
 
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            buffer.seek(0)
+    def _store(self, url: str, png: bytes) -> Tuple[bytes, str]:
+        etag = '"' + hashlib.sha1(png).hexdigest() + '"'
+        self._cache[url] = (png, etag)
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return png, etag
 
-            img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            return f"data:image/png;base64,{img_base64}"
+    def _cached(self, url: str) -> Optional[Tuple[bytes, str]]:
+        entry = self._cache.get(url)
+        if entry is not None:
+            self._cache.move_to_end(url)
+        return entry
 
+    async def _render(self, url: str) -> Optional[Tuple[bytes, str]]:
+        loop = asyncio.get_running_loop()
+        try:
+            png = await loop.run_in_executor(self._executor, self._render_png, url)
         except Exception as e:
-            print(f"[QRService] Erro: {e}")
+            log.error('qr_render_failed', url=url, error=str(e))
+            return None
+        finally:
+            self._pending.pop(url, None)
+        return self._store(url, png)
+
+    async def get_png(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """Retorna (png, etag) do QR Code, renderizando fora do event loop"""
+        if not HAS_QRCODE:
+            return None
+
+        entry = self._cached(url)
+        if entry is not None:
+            return entry
+
+        # Pedidos simultâneos da mesma URL aguardam a mesma renderização;
+        # o shield impede que um cliente que desistiu a cancele para os outros
+        pending = self._pending.get(url)
+        if pending is None:
+            pending = self._pending[url] = asyncio.ensure_future(self._render(url))
+        return await asyncio.shield(pending)
+
+    async def get_data_url(self, url: str) -> str:
+        """QR Code como data URL base64 (mesmo cache do PNG)"""
+        entry = await self.get_png(url)
+        if entry is None:
             return ""
+        return "data:image/png;base64," + base64.b64encode(entry[0]).decode('ascii')
 
 
 # Instância global
@@ -0,0 +1,24 @@
+"""
+30 Segundos v3.1 - Shards por Código de Partida
+
+No modo shardeado (run_workers.py --sharded) cada worker é dono das
+partidas cujo código cai no seu shard; o proxy na frente usa a mesma
+função para encaminhar HTTP e Socket.IO ao worker certo.
+"""
+
+import os
+import zlib
+
+from backend.services.game_ids import game_id_value
+
+SHARD_COUNT = max(1, int(os.environ.get('SHARD_COUNT', '1')))
+SHARD_INDEX = int(os.environ.get('SHARD_INDEX', '0'))
+
+
+def shard_for(game_id: str, count: int = SHARD_COUNT) -> int:
+    """Shard dono da partida (o alocador de códigos garante o shard)"""
+    value = game_id_value(game_id)
+    if value is None:
+        # Código que não veio do alocador: hash estável
+        return zlib.crc32(game_id.upper().encode('utf-8')) % count
+    return value % count
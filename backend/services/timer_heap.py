@@ -0,0 +1,118 @@
+"""
+30 Segundos v3.1 - Temporizadores do Servidor
+
+Uma única tarefa asyncio cuida de todos os prazos (fim de rodada, ticks
+do cronômetro) de todas as partidas, com um heap ordenado pelo horário.
+Agendar ou reagendar custa O(log n); cancelar é O(1) (a entrada antiga
+fica no heap e é ignorada quando chegar a vez dela).
+"""
+
+import asyncio
+import functools
+import heapq
+import inspect
+import itertools
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from backend.services.log import get_logger
+
+log = get_logger('timers')
+
+
+class TimerHeap:
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[int, Callable, tuple]] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._callbacks: Set[asyncio.Future] = set()
+        self.fired = 0
+        self.max_lag = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule_at(self, key: Hashable, when_ms: float, callback: Callable, *args: Any):
+        """
+        Agenda `callback(*args)` para o instante `when_ms` (epoch em ms).
+        Reagendar a mesma chave substitui o agendamento anterior.
+        """
+        loop = asyncio.get_running_loop()
+        when = loop.time() + (when_ms - time.time() * 1000) / 1000
+
+        seq = next(self._seq)
+        self._entries[key] = (seq, callback, args)
+        heapq.heappush(self._heap, (when, seq, key))
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        elif self._heap[0][1] == seq:
+            # Novo primeiro prazo: acorda a tarefa para dormir menos
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Descarta entradas canceladas ou reagendadas
+            while self._heap:
+                _, seq, key = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == seq:
+                    break
+                heapq.heappop(self._heap)
+
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            when, seq, key = heapq.heappop(self._heap)
+            _, callback, args = self._entries.pop(key)
+            self.fired += 1
+            self.max_lag = max(self.max_lag, loop.time() - when)
+            try:
+                result = callback(*args)
+                if inspect.isawaitable(result):
+                    # Não segura os outros prazos esperando o callback;
+                    # corrotina ou future (ex.: asyncio.gather), tanto faz
+                    task = asyncio.ensure_future(result)
+                    self._callbacks.add(task)
+                    task.add_done_callback(functools.partial(self._callback_done, key))
+            except Exception as e:
+                log.exception('callback_failed', key=key, error=str(e))
+
+    def _callback_done(self, key: Hashable, task: asyncio.Future):
+        self._callbacks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            # Sem isso a falha só apareceria como "exception was never retrieved"
+            log.error('callback_failed', key=key, error=repr(error))
+
+    def stats(self) -> dict:
+        return {
+            "scheduled": len(self._entries),
+            "heap": len(self._heap),
+            "fired": self.fired,
+            "max_lag_ms": round(self.max_lag * 1000, 3)
+        }
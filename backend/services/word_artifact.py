@@ -0,0 +1,163 @@
+"""
+30 Segundos v3.1 - Artefato Compilado dos Bancos de Palavras
+
+Valida, remove duplicatas e normaliza data/word_banks/*.json num único
+arquivo binário, carregado com uma só leitura na inicialização.
+
+Uso:
+    python build_word_banks.py [--data data/word_banks] [--out data/word_banks.bin]
+"""
+
+import argparse
+import hashlib
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from backend.services.word_store import SEPARATOR, WordStore, load_bank_file
+
+MAGIC = b'30SWB\x00\x00\x01'
+# magic, hash sha256 das fontes, nº de temas, nº de palavras, bytes dos textos
+HEADER = struct.Struct('<8s32sIII')
+THEME = struct.Struct('<HH')      # tamanho do nome, nº de faixas por nível
+BUCKET = struct.Struct('<BII')    # nível, início, fim
+
+DEFAULT_ARTIFACT_NAME = 'word_banks.bin'
+
+
+def source_files(data_path: Path) -> List[Path]:
+    return sorted(data_path.glob('*.json'))
+
+
+def sources_hash(files: List[Path]) -> bytes:
+    """Hash sha256 do nome e conteúdo de cada arquivo fonte"""
+    digest = hashlib.sha256()
+    for file_path in files:
+        digest.update(file_path.name.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(file_path.read_bytes())
+    return digest.digest()
+
+
+def build_artifact(data_path: Path, out_path: Path) -> dict:
+    """Compila os bancos da pasta no arquivo `out_path`"""
+    files = source_files(data_path)
+    store = WordStore()
+    warnings: List[str] = []
+
+    for file_path in files:
+        words, theme_warnings = load_bank_file(file_path)
+        warnings.extend(theme_warnings)
+        if words:
+            store.add_theme(file_path.stem, words)
+
+    blob = SEPARATOR.join(store.texts).encode('utf-8')
+    digest = sources_hash(files)
+
+    parts = [HEADER.pack(MAGIC, digest, len(store.themes),
+                         len(store), len(blob))]
+    for theme_id in store.themes:
+        name = theme_id.encode('utf-8')
+        buckets = [(level, r) for (t, level), r in store.buckets.items()
+                   if t == theme_id]
+        parts.append(THEME.pack(len(name), len(buckets)))
+        parts.append(name)
+        for level, r in buckets:
+            parts.append(BUCKET.pack(level, r.start, r.stop))
+    parts.append(store.levels.tobytes())
+    parts.append(blob)
+
+    tmp_path = out_path.with_suffix(out_path.suffix + '.tmp')
+    tmp_path.write_bytes(b''.join(parts))
+    tmp_path.replace(out_path)
+
+    return {
+        "themes": len(store.themes),
+        "words": len(store),
+        "bytes": out_path.stat().st_size,
+        "hash": digest.hex(),
+        "warnings": warnings
+    }
+
+
+def load_artifact(path: Path) -> Tuple[WordStore, str]:
+    """Lê o artefato com uma única leitura; retorna (store, hash das fontes)"""
+    data = path.read_bytes()
+    magic, digest, n_themes, n_words, blob_size = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"Artefato inválido: {path}")
+
+    store = WordStore()
+    offset = HEADER.size
+    for _ in range(n_themes):
+        name_size, n_buckets = THEME.unpack_from(data, offset)
+        offset += THEME.size
+        theme_id = data[offset:offset + name_size].decode('utf-8')
+        offset += name_size
+
+        start = stop = None
+        for _ in range(n_buckets):
+            level, b_start, b_stop = BUCKET.unpack_from(data, offset)
+            offset += BUCKET.size
+            store.buckets[(theme_id, level)] = range(b_start, b_stop)
+            start = b_start if start is None else start
+            stop = b_stop
+        store.themes[theme_id] = range(start or 0, stop or 0)
+
+    store.levels = array('B', data[offset:offset + n_words])
+    offset += n_words
+
+    blob = data[offset:offset + blob_size].decode('utf-8')
+    store.texts = [sys.intern(t) for t in blob.split(SEPARATOR)] if n_words else []
+
+    if len(store.texts) != n_words:
+        raise ValueError(f"Artefato corrompido: {path}")
+
+    return store, digest.hex()
+
+
+def artifact_hash(path: Path) -> bytes:
+    """Hash das fontes gravado no cabeçalho (sem ler o resto do arquivo)"""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise ValueError(f"Artefato inválido: {path}")
+    magic, digest = HEADER.unpack(header)[:2]
+    if magic != MAGIC:
+        raise ValueError(f"Artefato inválido: {path}")
+    return digest
+
+
+def is_fresh(artifact_path: Path, data_path: Path) -> bool:
+    """
+    O artefato foi gerado exatamente dos JSON atuais? Compara o hash do
+    cabeçalho com o dos arquivos (nomes e conteúdo), então arquivo
+    novo, removido ou editado invalida o artefato, e mudar só o mtime
+    (checkout, cópia) não
+    """
+    if not artifact_path.exists():
+        return False
+    return artifact_hash(artifact_path) == sources_hash(source_files(data_path))
+
+
+def default_artifact_path(data_path: Path) -> Path:
+    return data_path.parent / DEFAULT_ARTIFACT_NAME
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Compila os bancos de palavras num artefato binário")
+    parser.add_argument('--data', type=Path,
+                        default=Path('data') / 'word_banks')
+    parser.add_argument('--out', type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    out_path = args.out or default_artifact_path(args.data)
+    info = build_artifact(args.data, out_path)
+
+    for warning in info["warnings"]:
+        print(f"[WordArtifact] Aviso: {warning}")
+    print(f"[WordArtifact] {out_path}: {info['themes']} temas, {info['words']} palavras, "
+          f"{info['bytes']} bytes, hash {info['hash'][:12]}")
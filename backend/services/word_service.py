@@ -2,20 +2,122 @@
 30 Segundos v3.1 - Serviço de Palavras
 """
 
-import json
+import asyncio
 import random
+import sys
+import weakref
+from array import array
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
+from backend.services.word_store import WordStore, load_bank_file
+from backend.services.word_artifact import (
+    default_artifact_path, is_fresh, load_artifact)
+from backend.services.log import get_logger
+
+log = get_logger('word')
+# Reembaralhos por partida: LOG_LEVELS=word.deck=WARNING desliga
+deck_log = get_logger('word.deck')
+
+
+class GameDeck:
+    """
+    Baralho de um jogo sobre a lista (compartilhada) de ids elegíveis.
+
+    A ordem embaralhada não é armazenada: a posição `i` do baralho é
+    calculada por uma permutação Feistel com chaves sorteadas, então o
+    estado do jogo é só as chaves e o cursor, qualquer que seja o
+    tamanho do banco ou quantas palavras já saíram.
+    """
+
+    __slots__ = ('key', 'store', 'word_ids', 'cursor',
+                 '_keys', '_half', '_mask')
+
+    ROUNDS = 4
+
+    def __init__(self, key: tuple, store: WordStore, word_ids: array):
+        self.key = key
+        # Store do qual os ids vieram: o baralho segue válido após um reload
+        self.store = store
+        self.word_ids = word_ids
+        self.cursor = 0
+        bits = max(2, (len(word_ids) - 1).bit_length())
+        self._half = (bits + 1) // 2
+        self._mask = (1 << self._half) - 1
+        self.shuffle()
+
+    def shuffle(self):
+        self._keys = tuple(random.getrandbits(32)
+                           for _ in range(self.ROUNDS))
+        self.cursor = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.word_ids)
+
+    @property
+    def remaining(self) -> int:
+        return len(self.word_ids) - self.cursor
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes do estado próprio do jogo (sem a lista compartilhada)"""
+        return (sys.getsizeof(self) + sys.getsizeof(self._keys)
+                + sum(sys.getsizeof(k) for k in self._keys)
+                + sys.getsizeof(self.cursor))
+
+    def _permute(self, i: int) -> int:
+        """Posição embaralhada de `i`; cycle-walking mantém o resultado < size"""
+        half, mask, size = self._half, self._mask, len(self.word_ids)
+        x = i
+        while True:
+            left, right = x >> half, x & mask
+            for k in self._keys:
+                left, right = right, left ^ (
+                    ((right ^ k) * 0x9E3779B1 >> 11) & mask)
+            x = (left << half) | right
+            if x < size:
+                return x
+
+    def draw(self, count: int) -> List[int]:
+        """Retira `count` ids do topo do baralho"""
+        start = self.cursor
+        self.cursor += count
+        word_ids = self.word_ids
+        return [word_ids[self._permute(i)] for i in range(start, self.cursor)]
 
 
 class WordService:
     def __init__(self):
-        self.word_banks: Dict[str, List[dict]] = {}
-        self.used_words: Dict[str, set] = {}
+        self.store = WordStore()
+        self.decks: Dict[str, GameDeck] = {}
+        # Listas de ids elegíveis compartilhadas entre jogos com a mesma seleção
+        self._eligible: "weakref.WeakValueDictionary[tuple, array]" = \
+            weakref.WeakValueDictionary()
+        # Assinatura (mtime, tamanho) de cada arquivo carregado, por tema
+        self._sources: Dict[str, Tuple[int, int]] = {}
+        self._data_path: Optional[Path] = None
+        self._reload_lock: Optional[asyncio.Lock] = None
+        self._reload_listeners: List[Callable[[], None]] = []
         self.load_word_banks()
 
     def load_word_banks(self):
         """Carrega todos os bancos de palavras"""
+        data_path = self._find_data_path()
+
+        if not data_path:
+            log.warning('data_path_missing', fallback='default_bank')
+            self._create_default_bank()
+            return
+
+        self._data_path = data_path
+        self._sources = self._scan_sources(data_path)
+        self.store = self._load_artifact(data_path) or \
+            self._build_store(data_path)
+
+        if not len(self.store):
+            self._create_default_bank()
+
+    def _find_data_path(self) -> Optional[Path]:
         # Tenta múltiplos caminhos possíveis
         possible_paths = [
             Path(__file__).parent.parent.parent / 'data' / 'word_banks',
@@ -23,93 +125,191 @@ class WordService:
             Path('data') / 'word_banks',
         ]
 
-        data_path = None
         for path in possible_paths:
             if path.exists():
-                data_path = path
-                break
+                return path
+        return None
+
+    def _load_artifact(self, data_path: Path) -> Optional[WordStore]:
+        """Usa o artefato compilado se ele foi gerado dos JSON atuais"""
+        artifact_path = default_artifact_path(data_path)
+        try:
+            if not is_fresh(artifact_path, data_path):
+                return None
+            store, digest = load_artifact(artifact_path)
+        except Exception as e:
+            log.error('artifact_load_failed', path=str(artifact_path), error=str(e))
+            return None
 
-        if not data_path:
-            print(
-                f"[WordService] Pasta de dados não encontrada, criando banco padrão")
-            self._create_default_bank()
-            return
+        # O hash cobre o nome e o conteúdo de cada JSON, então um tema das
+        # fontes ausente do artefato é um banco sem palavras válidas (que a
+        # leitura direta também deixaria de fora); só o contrário é erro
+        if not set(store.themes) <= set(self._sources):
+            return None
+
+        log.info('artifact_loaded', file=artifact_path.name, words=len(store),
+                 hash=digest[:12])
+        return store
+
+    @staticmethod
+    def _scan_sources(data_path: Path) -> Dict[str, Tuple[int, int]]:
+        """Assinatura de cada arquivo JSON da pasta, por tema"""
+        sources = {}
+        for file_path in data_path.glob('*.json'):
+            stat = file_path.stat()
+            sources[file_path.stem] = (stat.st_mtime_ns, stat.st_size)
+        return sources
+
+    def _build_store(
+        self,
+        data_path: Path,
+        previous: Optional[WordStore] = None,
+        changed: Optional[set] = None
+    ) -> WordStore:
+        """
+        Monta um store com os arquivos da pasta. Com `previous`, só os
+        temas em `changed` são relidos; os demais são copiados dele.
+        """
+        store = WordStore()
 
         # Carrega cada arquivo JSON
         for file_path in data_path.glob('*.json'):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    theme_id = file_path.stem
-
-                    # Suporta diferentes formatos de arquivo
-                    if isinstance(data, dict) and 'words' in data:
-                        words = data['words']
-                    elif isinstance(data, list):
-                        words = data
-                    else:
-                        words = []
-
-                    # Normaliza formato das palavras
-                    normalized_words = []
-                    for item in words:
-                        if isinstance(item, str):
-                            normalized_words.append({"word": item, "level": 1})
-                        elif isinstance(item, dict):
-                            word = item.get('word') or item.get(
-                                'texto') or item.get('name', '')
-                            level = item.get('level') or item.get(
-                                'nivel') or item.get('difficulty', 1)
-                            if word:
-                                normalized_words.append(
-                                    {"word": word, "level": int(level)})
-
-                    if normalized_words:
-                        self.word_banks[theme_id] = normalized_words
-                        print(
-                            f"[WordService] Carregado: {theme_id} ({len(normalized_words)} palavras)")
+            theme_id = file_path.stem
+
+            if previous is not None and theme_id not in changed \
+                    and previous.has_theme(theme_id):
+                store.add_theme(theme_id, previous.theme_entries(theme_id))
+                continue
 
+            try:
+                normalized_words, warnings = load_bank_file(file_path)
             except Exception as e:
-                print(f"[WordService] Erro ao carregar {file_path}: {e}")
+                log.error('bank_load_failed', path=str(file_path), error=str(e))
+                # Mantém a versão anterior do tema, se houver
+                if previous is not None and previous.has_theme(theme_id):
+                    store.add_theme(
+                        theme_id, previous.theme_entries(theme_id))
+                continue
 
-        if not self.word_banks:
-            self._create_default_bank()
+            if warnings:
+                log.warning('bank_words_skipped', theme=theme_id, count=len(warnings),
+                            first=warnings[0])
+            if normalized_words:
+                store.add_theme(theme_id, normalized_words)
+                log.info('bank_loaded', theme=theme_id, words=len(normalized_words))
+
+        return store
+
+    # ============================================
+    # RECARGA A QUENTE
+    # ============================================
+
+    def add_reload_listener(self, callback: Callable[[], None]):
+        """Registra uma função chamada depois de cada troca de store"""
+        self._reload_listeners.append(callback)
+
+    def _prepare_reload(self) -> Optional[dict]:
+        """
+        Verifica a pasta e monta um store novo se algum arquivo mudou.
+        Não altera o serviço: pode rodar fora do event loop.
+        """
+        if not self._data_path or not self._data_path.exists():
+            return None
+
+        sources = self._scan_sources(self._data_path)
+        changed = {theme for theme, sig in sources.items()
+                   if self._sources.get(theme) != sig}
+        removed = set(self._sources) - set(sources)
+        if not changed and not removed:
+            return None
+
+        store = self._build_store(self._data_path, self.store, changed)
+        return {
+            "store": store,
+            "sources": sources,
+            "changed": sorted(changed),
+            "removed": sorted(removed)
+        }
+
+    def _swap_store(self, reload: dict) -> dict:
+        """Troca o store atual pelo recarregado"""
+        if not len(reload["store"]):
+            log.warning('reload_skipped', reason='no_valid_bank')
+            return {"changed": [], "removed": []}
+
+        # Baralhos em andamento mantêm a referência ao store antigo
+        self.store = reload["store"]
+        self._sources = reload["sources"]
+        self._eligible = weakref.WeakValueDictionary()
+
+        for callback in self._reload_listeners:
+            callback()
+
+        log.info('banks_reloaded', changed=reload['changed'], removed=reload['removed'])
+        return {"changed": reload["changed"], "removed": reload["removed"]}
+
+    def reload_word_banks(self) -> dict:
+        """Relê apenas os arquivos alterados e troca o store"""
+        reload = self._prepare_reload()
+        if reload is None:
+            return {"changed": [], "removed": []}
+        return self._swap_store(reload)
+
+    async def reload_word_banks_async(self) -> dict:
+        """Como reload_word_banks, mas lê os arquivos numa thread"""
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
+
+        async with self._reload_lock:
+            reload = await asyncio.to_thread(self._prepare_reload)
+            if reload is None:
+                return {"changed": [], "removed": []}
+            return self._swap_store(reload)
+
+    async def watch_word_banks(self, interval: float = 2.0):
+        """Verifica a pasta periodicamente e recarrega o que mudou"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload_word_banks_async()
+            except Exception as e:
+                log.exception('reload_failed', error=str(e))
 
     def _create_default_bank(self):
         """Cria banco padrão se não houver arquivos"""
-        self.word_banks['geral'] = [
-            {"word": "Casa", "level": 1},
-            {"word": "Carro", "level": 1},
-            {"word": "Cachorro", "level": 1},
-            {"word": "Gato", "level": 1},
-            {"word": "Árvore", "level": 1},
-            {"word": "Computador", "level": 2},
-            {"word": "Telefone", "level": 2},
-            {"word": "Televisão", "level": 2},
-            {"word": "Geladeira", "level": 2},
-            {"word": "Bicicleta", "level": 2},
-            {"word": "Fotografia", "level": 3},
-            {"word": "Democracia", "level": 3},
-            {"word": "Filosofia", "level": 3},
-            {"word": "Astronomia", "level": 3},
-            {"word": "Arqueologia", "level": 3},
-            {"word": "Felicidade", "level": 1},
-            {"word": "Amizade", "level": 1},
-            {"word": "Futebol", "level": 1},
-            {"word": "Praia", "level": 1},
-            {"word": "Montanha", "level": 1},
-            {"word": "Hospital", "level": 2},
-            {"word": "Aeroporto", "level": 2},
-            {"word": "Restaurante", "level": 2},
-            {"word": "Supermercado", "level": 2},
-            {"word": "Biblioteca", "level": 2},
-        ]
-        print("[WordService] Banco padrão criado com 25 palavras")
+        self.store.add_theme('geral', [
+            ("Casa", 1),
+            ("Carro", 1),
+            ("Cachorro", 1),
+            ("Gato", 1),
+            ("Árvore", 1),
+            ("Computador", 2),
+            ("Telefone", 2),
+            ("Televisão", 2),
+            ("Geladeira", 2),
+            ("Bicicleta", 2),
+            ("Fotografia", 3),
+            ("Democracia", 3),
+            ("Filosofia", 3),
+            ("Astronomia", 3),
+            ("Arqueologia", 3),
+            ("Felicidade", 1),
+            ("Amizade", 1),
+            ("Futebol", 1),
+            ("Praia", 1),
+            ("Montanha", 1),
+            ("Hospital", 2),
+            ("Aeroporto", 2),
+            ("Restaurante", 2),
+            ("Supermercado", 2),
+            ("Biblioteca", 2),
+        ])
+        log.info('default_bank_created', words=len(self.store))
 
     def get_available_themes(self) -> List[dict]:
         """Retorna lista de temas disponíveis"""
         themes = []
-        for theme_id, words in self.word_banks.items():
+        for theme_id in self.store.theme_ids():
             # Não incluir desafios como tema de palavras
             if theme_id.lower() == 'desafios':
                 continue
@@ -117,7 +317,7 @@ class WordService:
             themes.append({
                 "id": theme_id,
                 "name": self._format_theme_name(theme_id),
-                "word_count": len(words)
+                "word_count": self.store.theme_size(theme_id)
             })
 
         # Ordena por nome
@@ -156,14 +356,90 @@ class WordService:
             {"level": 5, "name": "Impossível", "color": "#1a1a2e"},
         ]
 
-    def init_game_pool(self, game_id: str):
-        """Inicializa pool de palavras usadas para um jogo"""
-        self.used_words[game_id] = set()
+    def init_game_pool(
+        self,
+        game_id: str,
+        themes: Optional[List[str]] = None,
+        levels: Optional[List[int]] = None
+    ):
+        """Inicializa o baralho de palavras de um jogo"""
+        self.decks.pop(game_id, None)
+        if themes is not None and levels is not None:
+            self._get_deck(game_id, themes, levels)
 
     def clear_game_pool(self, game_id: str):
         """Limpa pool quando o jogo termina"""
-        if game_id in self.used_words:
-            del self.used_words[game_id]
+        if game_id in self.decks:
+            del self.decks[game_id]
+
+    def get_remaining_words(self, game_id: str) -> Optional[dict]:
+        """Retorna quantas palavras ainda não saíram no baralho do jogo"""
+        deck = self.decks.get(game_id)
+        if not deck:
+            return None
+        return {"remaining": deck.remaining, "total": deck.size}
+
+    def export_pool(self, game_id: str) -> Optional[dict]:
+        """Estado do baralho do jogo para persistência"""
+        deck = self.decks.get(game_id)
+        if not deck:
+            return None
+        return {
+            "themes": list(deck.key[0]),
+            "levels": list(deck.key[1]),
+            "size": deck.size,
+            "keys": list(deck._keys),
+            "cursor": deck.cursor
+        }
+
+    def restore_pool(self, game_id: str, state: dict):
+        """Recria o baralho salvo com export_pool()"""
+        deck = self._get_deck(game_id, state["themes"], state["levels"])
+        # Se os bancos mudaram, as posições salvas não valem mais
+        if deck.size != state["size"] or len(state["keys"]) != GameDeck.ROUNDS:
+            return
+        deck._keys = tuple(state["keys"])
+        deck.cursor = min(state["cursor"], deck.size)
+
+    def get_pool_memory_stats(self) -> dict:
+        """Memória usada pelos baralhos: estado por jogo e listas compartilhadas"""
+        games = len(self.decks)
+        game_bytes = sum(deck.nbytes for deck in self.decks.values())
+        shared = list(self._eligible.values())
+        return {
+            "games": games,
+            "bytes_total": game_bytes,
+            "bytes_per_game": game_bytes // games if games else 0,
+            "shared_lists": len(shared),
+            "shared_bytes": sum(ids.buffer_info()[1] * ids.itemsize for ids in shared)
+        }
+
+    def _get_deck(self, game_id: str, themes: List[str], levels: List[int]) -> GameDeck:
+        """Retorna o baralho do jogo, criando-o se a seleção mudou"""
+        key = (tuple(themes), tuple(levels))
+        deck = self.decks.get(game_id)
+        if deck is None or deck.key != key:
+            word_ids = self._eligible.get(key)
+            if word_ids is None:
+                word_ids = self._eligible_ids(themes, levels)
+                self._eligible[key] = word_ids
+            deck = GameDeck(key, self.store, word_ids)
+            self.decks[game_id] = deck
+        return deck
+
+    def _eligible_ids(self, themes: List[str], levels: List[int]) -> array:
+        """Ids das palavras das faixas selecionadas, sem textos repetidos"""
+        texts = self.store.texts
+        ids = array('I')
+        seen = set()
+        for theme in themes:
+            for level in levels:
+                for idx in self.store.bucket(theme, level):
+                    text = texts[idx]
+                    if text not in seen:
+                        seen.add(text)
+                        ids.append(idx)
+        return ids
 
     def get_card_words(
         self,
@@ -178,56 +454,28 @@ class WordService:
         Gera uma carta com palavras para os dois lados
         """
 
-        # Inicializa pool se não existir
-        if game_id not in self.used_words:
-            self.used_words[game_id] = set()
+        deck = self._get_deck(game_id, themes, levels)
 
-        # Coleta palavras disponíveis
-        available_words = []
-        for theme in themes:
-            if theme in self.word_banks:
-                for word_data in self.word_banks[theme]:
-                    word = word_data.get('word', '')
-                    level = word_data.get('level', 1)
-
-                    if level in levels and word not in self.used_words[game_id]:
-                        available_words.append({
-                            "text": word,
-                            "level": level
-                        })
-
-        # Se não tem palavras suficientes, reseta o pool
         total_needed = words_per_side * 2
-        if len(available_words) < total_needed:
-            print(
-                f"[WordService] Resetando pool de palavras para jogo {game_id}")
-            self.used_words[game_id] = set()
-
-            # Recoleta
-            available_words = []
-            for theme in themes:
-                if theme in self.word_banks:
-                    for word_data in self.word_banks[theme]:
-                        word = word_data.get('word', '')
-                        level = word_data.get('level', 1)
-                        if level in levels:
-                            available_words.append({
-                                "text": word,
-                                "level": level
-                            })
-
-        if len(available_words) < total_needed:
-            print(
-                f"[WordService] Palavras insuficientes: {len(available_words)} < {total_needed}")
+        if deck.size < total_needed:
+            log.warning('not_enough_words', game_id=game_id, available=deck.size,
+                        needed=total_needed)
             return None
 
-        # Embaralha e seleciona
-        random.shuffle(available_words)
-        selected = available_words[:total_needed]
-
-        # Marca como usadas
-        for word in selected:
-            self.used_words[game_id].add(word["text"])
+        # Baralho acabou: reembaralha (ou adota os bancos recarregados)
+        if deck.remaining < total_needed:
+            deck_log.info('deck_reshuffled', game_id=game_id, size=deck.size)
+            if deck.store is not self.store:
+                self.decks.pop(game_id, None)
+                deck = self._get_deck(game_id, themes, levels)
+                if deck.size < total_needed:
+                    return None
+            else:
+                deck.shuffle()
+
+        store = deck.store
+        selected = [(store.texts[idx], store.levels[idx])
+                    for idx in deck.draw(total_needed)]
 
         # Divide entre amarelo e azul
         yellow_words = selected[:words_per_side]
@@ -246,7 +494,7 @@ class WordService:
 
     def _apply_special_words(
         self,
-        words: List[dict],
+        words: List[Tuple[str, int]],
         bonus_chance: float,
         cursed_chance: float
     ) -> List[dict]:
@@ -255,10 +503,10 @@ class WordService:
         has_bonus = False
         has_cursed = False
 
-        for word in words:
+        for text, level in words:
             word_data = {
-                "text": word["text"],
-                "level": word["level"],
+                "text": text,
+                "level": level,
                 "is_bonus": False,
                 "is_cursed": False
             }
@@ -0,0 +1,160 @@
+"""
+30 Segundos v3.1 - Armazenamento Colunar dos Bancos de Palavras
+"""
+
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+# Separa os textos no artefato compilado: não pode aparecer numa palavra
+SEPARATOR = '\x00'
+
+
+class WordStore:
+    """
+    Bancos de palavras em colunas: textos internados numa única lista,
+    níveis num array('B') e cada tema como uma faixa contígua de ids.
+
+    Dentro de um tema as palavras ficam ordenadas por nível, então cada
+    par (tema, nível) também é uma faixa. Depois de montado o store não
+    muda: recarregar bancos cria um store novo.
+    """
+
+    def __init__(self):
+        self.texts: List[str] = []
+        self.levels = array('B')
+        self.themes: Dict[str, range] = {}
+        self.buckets: Dict[Tuple[str, int], range] = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add_theme(self, theme_id: str, words: Iterable[Tuple[str, int]]):
+        """Acrescenta um tema a partir de pares (texto, nível)"""
+        by_level: Dict[int, List[str]] = {}
+        for text, level in words:
+            by_level.setdefault(level, []).append(text)
+
+        start = len(self.texts)
+        for level in sorted(by_level):
+            level_start = len(self.texts)
+            self.texts.extend(sys.intern(t) for t in by_level[level])
+            self.levels.extend([level] * len(by_level[level]))
+            self.buckets[(theme_id, level)] = range(
+                level_start, len(self.texts))
+
+        self.themes[theme_id] = range(start, len(self.texts))
+
+    # ============================================
+    # ACESSO
+    # ============================================
+
+    def theme_ids(self) -> List[str]:
+        return list(self.themes)
+
+    def has_theme(self, theme_id: str) -> bool:
+        return theme_id in self.themes
+
+    def theme_size(self, theme_id: str) -> int:
+        return len(self.themes.get(theme_id, ()))
+
+    def theme_words(self, theme_id: str) -> List[str]:
+        """Textos de um tema"""
+        r = self.themes.get(theme_id)
+        if r is None:
+            return []
+        return self.texts[r.start:r.stop]
+
+    def theme_entries(self, theme_id: str) -> List[Tuple[str, int]]:
+        """Pares (texto, nível) de um tema"""
+        r = self.themes.get(theme_id, range(0))
+        return list(zip(self.texts[r.start:r.stop], self.levels[r.start:r.stop]))
+
+    def bucket(self, theme_id: str, level: int) -> range:
+        """Faixa de ids de um par (tema, nível)"""
+        return self.buckets.get((theme_id, level), range(0))
+
+    def text(self, word_id: int) -> str:
+        return self.texts[word_id]
+
+    def level(self, word_id: int) -> int:
+        return self.levels[word_id]
+
+    def words_with_min_level(self, min_level: int) -> List[str]:
+        """Textos de todas as palavras com nível >= min_level"""
+        result: List[str] = []
+        for (_, level), r in self.buckets.items():
+            if level >= min_level:
+                result.extend(self.texts[r.start:r.stop])
+        return result
+
+    @property
+    def nbytes(self) -> int:
+        """Memória aproximada do store (textos repetidos contam uma vez)"""
+        unique = {id(t): t for t in self.texts}
+        return (sys.getsizeof(self.texts)
+                + sum(sys.getsizeof(t) for t in unique.values())
+                + self.levels.buffer_info()[1] * self.levels.itemsize
+                + sys.getsizeof(self.themes) + sys.getsizeof(self.buckets))
+
+
+def parse_bank_file(file_path: Path) -> List[Tuple[str, int]]:
+    """Lê um arquivo de banco e normaliza as palavras em (texto, nível)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    # Suporta diferentes formatos de arquivo
+    if isinstance(data, dict) and 'words' in data:
+        words = data['words']
+    elif isinstance(data, list):
+        words = data
+    else:
+        words = []
+
+    # Normaliza formato das palavras
+    normalized_words = []
+    for item in words:
+        if isinstance(item, str):
+            normalized_words.append((item, 1))
+        elif isinstance(item, dict):
+            word = item.get('word') or item.get(
+                'texto') or item.get('name', '')
+            level = item.get('level') or item.get(
+                'nivel') or item.get('difficulty', 1)
+            if word:
+                normalized_words.append((word, int(level)))
+
+    return normalized_words
+
+
+def validate_theme(theme_id: str, words: List[Tuple[str, int]]) -> Tuple[List[Tuple[str, int]], List[str]]:
+    """Normaliza e valida as palavras de um tema; retorna (palavras, avisos)"""
+    result = []
+    warnings = []
+    seen = set()
+
+    for text, level in words:
+        text = ' '.join(str(text).split())
+        if not text or SEPARATOR in text:
+            warnings.append(f"{theme_id}: palavra inválida {text!r}")
+            continue
+        if not 1 <= level <= 255:
+            warnings.append(f"{theme_id}: nível inválido {level} em {text!r}")
+            continue
+        if text in seen:
+            warnings.append(f"{theme_id}: duplicada {text!r}")
+            continue
+        seen.add(text)
+        result.append((text, level))
+
+    return result, warnings
+
+
+def load_bank_file(file_path: Path) -> Tuple[List[Tuple[str, int]], List[str]]:
+    """
+    Lê e valida um banco; retorna (palavras, avisos). O artefato e a
+    leitura direta dos JSON passam por aqui, então montam o mesmo store.
+    """
+    return validate_theme(file_path.stem, parse_bank_file(file_path))
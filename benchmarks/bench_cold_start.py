@@ -0,0 +1,74 @@
+"""
+30 Segundos v3.1 - Benchmark de inicialização dos bancos de palavras
+
+Compara o carregador JSON (json.load + normalização de cada entrada)
+com o artefato compilado, nos bancos reais e num corpus sintético.
+
+Uso:
+    python -m benchmarks.bench_cold_start [--words 100000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from backend.services.word_artifact import build_artifact, load_artifact
+from backend.services.word_service import WordService
+
+DATA_PATH = Path(__file__).parent.parent / 'data' / 'word_banks'
+
+
+def write_synthetic_banks(path: Path, total_words: int, themes: int = 11):
+    """Grava bancos JSON sintéticos no formato dos arquivos reais"""
+    rng = random.Random(30)
+    path.mkdir(parents=True, exist_ok=True)
+    per_theme = total_words // themes
+    for t in range(themes):
+        words = [{"word": f"palavra_{t}_{i}", "level": rng.randint(1, 5)}
+                 for i in range(per_theme)]
+        with open(path / f"tema_{t}.json", 'w', encoding='utf-8') as f:
+            json.dump({"name": f"Tema {t}", "words": words}, f)
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(label: str, data_path: Path, repeat: int):
+    service = WordService.__new__(WordService)
+    artifact_path = data_path.parent / 'bench_word_banks.bin'
+    info = build_artifact(data_path, artifact_path)
+
+    json_time = best_of(lambda: service._build_store(data_path), repeat)
+    artifact_time = best_of(lambda: load_artifact(artifact_path), repeat)
+    artifact_path.unlink()
+
+    print(f"{label:<22} {info['words']:>9} palavras   "
+          f"JSON {json_time * 1000:8.2f} ms   artefato {artifact_time * 1000:8.2f} ms   "
+          f"({json_time / artifact_time:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    compare("bancos do projeto", DATA_PATH, args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        banks = Path(tmp) / 'word_banks'
+        write_synthetic_banks(banks, args.words)
+        compare("corpus sintético", banks, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
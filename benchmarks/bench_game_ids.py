@@ -0,0 +1,70 @@
+"""
+30 Segundos v3.1 - Benchmark dos códigos de partida
+
+Compara o sorteio antigo (4 caracteres aleatórios, repetindo enquanto
+colidir com uma partida ativa) com o GameIdAllocator, para vários
+números de partidas ativas.
+
+Uso:
+    python -m benchmarks.bench_game_ids [--live 1000 100000 400000]
+"""
+
+import argparse
+import random
+import string
+import time
+
+from backend.services.game_ids import GameIdAllocator
+
+
+def random_id() -> str:
+    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
+
+
+def bench_random(live: int, samples: int):
+    games = set()
+    while len(games) < live:
+        games.add(random_id())
+
+    tries = 0
+    start = time.perf_counter()
+    for _ in range(samples):
+        game_id = random_id()
+        tries += 1
+        while game_id in games:
+            game_id = random_id()
+            tries += 1
+    elapsed = time.perf_counter() - start
+    return elapsed / samples, tries / samples
+
+
+def bench_allocator(live: int, samples: int):
+    allocator = GameIdAllocator()
+    for _ in range(live):
+        allocator.allocate()
+
+    allocator.retries = 0
+    start = time.perf_counter()
+    for _ in range(samples):
+        allocator.release(allocator.allocate())
+    elapsed = time.perf_counter() - start
+    return elapsed / samples, 1 + allocator.retries / samples, allocator.width
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--live', type=int, nargs='+', default=[1000, 100000, 400000])
+    parser.add_argument('--samples', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'ativas':>8}{'aleatório µs':>14}{'tentativas':>12}"
+          f"{'alocador µs':>13}{'tentativas':>12}{'largura':>9}")
+    for live in args.live:
+        random_time, random_tries = bench_random(live, args.samples)
+        alloc_time, alloc_tries, width = bench_allocator(live, args.samples)
+        print(f"{live:>8}{random_time * 1e6:>14.2f}{random_tries:>12.2f}"
+              f"{alloc_time * 1e6:>13.2f}{alloc_tries:>12.2f}{width:>9}")
+
+
+if __name__ == '__main__':
+    main()
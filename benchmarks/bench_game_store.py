@@ -0,0 +1,86 @@
+"""
+30 Segundos v3.1 - Benchmark da persistência dos jogos
+
+Joga rodadas completas com o store em memória e com o SQLite
+(write-behind) e mede o custo por evento visto pelo GameService, além
+de quantos lotes a thread de escrita precisou para gravar tudo.
+
+Uso:
+    python -m benchmarks.bench_game_store [--games 50] [--rounds 10]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from backend.services.game_service import GameService
+from backend.services.game_store import MemoryGameStore, SQLiteGameStore
+
+
+def play(service: GameService, games: int, rounds: int) -> int:
+    """Joga `rounds` rodadas normais em `games` jogos; retorna nº de eventos"""
+    events = 0
+    ids = []
+    for i in range(games):
+        game = service.create_game({
+            'themes': ['geral'],
+            'levels': [1, 2, 3],
+            'team1_players': ['Ana', 'Bruno'],
+            'team2_players': ['Carla', 'Diego'],
+        })
+        game.config.challenge_chance = 0
+        game.config.cursed_chance = 0
+        service.start_game(game.id)
+        ids.append(game.id)
+        events += 2
+
+    for _ in range(rounds):
+        for game_id in ids:
+            ready = service.prepare_round(game_id)
+            service.start_timer(game_id)
+            words = [w['text'] for w in ready['round']['card']['yellow_words'][:3]]
+            for word in words:
+                service.register_hit(game_id, word)
+            service.confirm_round(game_id, words)
+            events += 3 + len(words)
+
+    for game_id in ids:
+        service.delete_game(game_id)
+    return events
+
+
+def run(name: str, store, games: int, rounds: int):
+    service = GameService(store=store)
+    start = time.perf_counter()
+    events = play(service, games, rounds)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.flush()
+    drain = time.perf_counter() - start
+
+    line = f"{name:<10}{events:>8}{elapsed / events * 1e6:>12.1f}{drain * 1e3:>10.1f}"
+    if isinstance(store, SQLiteGameStore):
+        line += f"{store.writes:>9}{store.batches:>9}"
+    print(line)
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'store':<10}{'eventos':>8}{'µs/evento':>12}{'drain ms':>10}"
+          f"{'escritas':>9}{'lotes':>9}")
+    run('memory', MemoryGameStore(), args.games, args.rounds)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteGameStore(os.path.join(tmp, 'games.db'))
+        run('sqlite', store, args.games, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+30 Segundos v3.1 - Benchmark de serialização dos eventos
+
+Codifica os payloads reais de round_ready e round_confirmed (formato
+incremental atual e o formato antigo com game.to_dict() completo) com
+json, orjson e msgpack, comparando tempo e tamanho.
+
+Uso:
+    python -m benchmarks.bench_serialization [--repeat 20000]
+"""
+
+import argparse
+import json
+import time
+
+from backend.api.state_sync import GameStateSync
+from backend.services.game_service import GameService
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def real_payloads():
+    """Joga uma rodada normal e captura os payloads emitidos"""
+    service = GameService()
+    sync = GameStateSync()
+    game = service.create_game({
+        'themes': ['geral', 'cinema'],
+        'levels': [1, 2, 3],
+        'team1_players': ['Ana', 'Bruno', 'Carla'],
+        'team2_players': ['Diego', 'Eva', 'Fábio'],
+    })
+    service.start_game(game.id)
+    sync.full(game)
+
+    # Garante uma rodada normal (com carta)
+    game.config.challenge_chance = 0
+    game.config.cursed_chance = 0
+    ready = service.prepare_round(game.id)
+    round_ready = {'state': sync.delta(game), 'round': ready['round']}
+
+    words = [w['text'] for w in ready['round']['card']['yellow_words'][:3]]
+    confirmed = service.confirm_round(game.id, words)
+    round_confirmed = {'state': sync.delta(game), 'result': confirmed['result']}
+
+    return {
+        'round_ready': round_ready,
+        'round_ready (antigo)': ready,
+        'round_confirmed': round_confirmed,
+        'round_confirmed (antigo)': confirmed,
+    }
+
+
+def encoders():
+    result = {
+        'json': lambda obj: json.dumps(obj, separators=(',', ':')).encode('utf-8'),
+    }
+    if orjson:
+        result['orjson'] = orjson.dumps
+    if msgpack:
+        result['msgpack'] = msgpack.packb
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20000)
+    args = parser.parse_args()
+
+    payloads = real_payloads()
+    print(f"{'payload':<26}{'codificador':<12}{'µs/encode':>10}{'bytes':>8}")
+    for name, payload in payloads.items():
+        for enc_name, encode in encoders().items():
+            size = len(encode(payload))
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                encode(payload)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f"{name:<26}{enc_name:<12}{elapsed * 1e6:>10.2f}{size:>8}")
+
+
+if __name__ == '__main__':
+    main()
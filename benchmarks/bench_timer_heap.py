@@ -0,0 +1,82 @@
+"""
+30 Segundos v3.1 - Benchmark dos prazos de rodada
+
+Agenda N prazos espalhados em alguns segundos e compara uma tarefa
+asyncio por partida (asyncio.sleep até o prazo) com o TimerHeap
+compartilhado: tempo para agendar e atraso de disparo (p50/p99/máx).
+
+Uso:
+    python -m benchmarks.bench_timer_heap [--games 1000 10000] [--spread 2]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from backend.services.timer_heap import TimerHeap
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def bench_tasks(deadlines):
+    lags = []
+    done = asyncio.Event()
+
+    async def wait_deadline(when_ms):
+        await asyncio.sleep(max(0.0, (when_ms - time.time() * 1000) / 1000))
+        lags.append(time.time() * 1000 - when_ms)
+        if len(lags) == len(deadlines):
+            done.set()
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(wait_deadline(when)) for when in deadlines]
+    setup = time.perf_counter() - start
+    await done.wait()
+    del tasks
+    return setup, lags
+
+
+async def bench_heap(deadlines):
+    lags = []
+    done = asyncio.Event()
+    timers = TimerHeap()
+
+    def fire(when_ms):
+        lags.append(time.time() * 1000 - when_ms)
+        if len(lags) == len(deadlines):
+            done.set()
+
+    start = time.perf_counter()
+    for i, when in enumerate(deadlines):
+        timers.schedule_at(('round', i), when, fire, when)
+    setup = time.perf_counter() - start
+    await done.wait()
+    timers.stop()
+    return setup, lags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--games', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--spread', type=float, default=2.0,
+                        help='segundos em que os prazos se espalham')
+    args = parser.parse_args()
+
+    print(f"{'partidas':>9}{'modo':>8}{'agendar ms':>12}"
+          f"{'p50 ms':>9}{'p99 ms':>9}{'máx ms':>9}")
+    for games in args.games:
+        offsets = [200 + random.random() * args.spread * 1000 for _ in range(games)]
+        for name, bench in (('tarefas', bench_tasks), ('heap', bench_heap)):
+            base = time.time() * 1000
+            setup, lags = asyncio.run(bench([base + offset for offset in offsets]))
+            print(f"{games:>9}{name:>8}{setup * 1000:>12.1f}"
+                  f"{percentile(lags, 0.5):>9.2f}{percentile(lags, 0.99):>9.2f}"
+                  f"{max(lags):>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
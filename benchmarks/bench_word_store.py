@@ -0,0 +1,100 @@
+"""
+30 Segundos v3.1 - Benchmark do armazenamento de palavras
+
+Compara o formato antigo (um dict {"word", "level"} por entrada) com o
+WordStore colunar num corpus sintético.
+
+Uso:
+    python -m benchmarks.bench_word_store [--words 1000000] [--themes 11]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from backend.services.word_store import WordStore
+
+
+def synthetic_corpus(total_words: int, themes: int, seed: int = 30):
+    """Gera {tema: [(texto, nível), ...]} com ~20% de textos repetidos entre temas"""
+    rng = random.Random(seed)
+    vocab_size = max(1, int(total_words * 0.8))
+    per_theme = total_words // themes
+    corpus = {}
+    for t in range(themes):
+        corpus[f"tema_{t}"] = [
+            (f"palavra_{rng.randrange(vocab_size)}", rng.randint(1, 5))
+            for _ in range(per_theme)
+        ]
+    return corpus
+
+
+def build_dicts(corpus):
+    # Cópias dos textos simulam strings vindas de json.load
+    return {
+        theme: [{"word": "".join(text), "level": level} for text, level in words]
+        for theme, words in corpus.items()
+    }
+
+
+def build_store(corpus):
+    store = WordStore()
+    for theme, words in corpus.items():
+        store.add_theme(theme, (("".join(text), level) for text, level in words))
+    return store
+
+
+def measure(label, builder, corpus):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = builder(corpus)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} build {elapsed * 1000:8.1f} ms   memória {size / 1e6:8.1f} MB")
+    return result, size
+
+
+def time_iteration(label, fn, repeat=3):
+    best = min(_timed(fn) for _ in range(repeat))
+    print(f"{label:<40} {best * 1000:8.1f} ms")
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=1_000_000)
+    parser.add_argument('--themes', type=int, default=11)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.words, args.themes)
+    print(f"Corpus sintético: {args.words} palavras em {args.themes} temas\n")
+
+    banks, dict_bytes = measure("dicts", build_dicts, corpus)
+    store, store_bytes = measure("WordStore", build_store, corpus)
+    print(f"\nRedução de memória: {dict_bytes / store_bytes:.1f}x\n")
+
+    time_iteration("dicts: palavras com nível >= 4", lambda: [
+        w['word'] for words in banks.values() for w in words if w.get('level', 1) >= 4])
+    time_iteration("WordStore: palavras com nível >= 4",
+                   lambda: store.words_with_min_level(4))
+    time_iteration("dicts: contagem por tema", lambda: {
+        t: len(w) for t, w in banks.items()})
+    time_iteration("WordStore: contagem por tema", lambda: {
+        t: store.theme_size(t) for t in store.theme_ids()})
+    time_iteration("dicts: (tema, nível) de uma seleção", lambda: [
+        w['word'] for w in banks['tema_0'] if w['level'] in (1, 2)])
+    time_iteration("WordStore: (tema, nível) de uma seleção", lambda: [
+        store.texts[i] for level in (1, 2) for i in store.bucket('tema_0', level)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+30 Segundos v3.1 - Teste de carga com vários workers
+
+Sobe o servidor com run_workers.py para cada quantidade de workers,
+conecta um board e um jogador por partida e mede quantos eventos
+word_hit -> player_hit por segundo o conjunto processa. Cada jogador só
+envia o próximo acerto depois de o board receber o anterior (carga
+fechada), então a vazão cresce com os workers enquanto houver núcleos
+livres para eles (e para os próprios clientes deste script).
+
+Uso:
+    python -m benchmarks.bench_workers [--workers 1 2 4] [--games 40] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import socketio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def http_json(url: str, data: dict = None) -> dict:
+    body = json.dumps(data).encode('utf-8') if data is not None else None
+    request = urllib.request.Request(
+        url, data=body, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def start_cluster(workers: int, port: int, broker_port: int, db_path: str) -> subprocess.Popen:
+    # Sem agrupamento de emits: a carga fechada mediria a janela, não os workers
+    env = dict(os.environ, GAME_STORE='shared', GAME_DB_PATH=db_path,
+               WORD_BANKS_WATCH_INTERVAL='0', EMIT_BATCH_WINDOW='0')
+    process = subprocess.Popen(
+        [sys.executable, 'run_workers.py', '--workers', str(workers),
+         '--port', str(port), '--broker', f'tcp://127.0.0.1:{broker_port}'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            http_json(f'http://127.0.0.1:{port}/api/themes')
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('servidor não respondeu')
+
+
+class GameClients:
+    """Board + jogador de uma partida, com o laço fechado de acertos"""
+
+    def __init__(self, base_url: str, game_id: str):
+        self.base_url = base_url
+        self.game_id = game_id
+        self.board = socketio.AsyncClient()
+        self.player = socketio.AsyncClient()
+        self.round_ready = asyncio.Event()
+        self.echo = asyncio.Event()
+        self.hits = 0
+        self.board_events = 0
+
+        # Só as telas recebem player_hit (às vezes dentro de um event_batch)
+        @self.board.on('player_hit')
+        async def on_board_hit(data):
+            self.board_events += 1
+            self.echo.set()
+
+        @self.board.on('event_batch')
+        async def on_board_batch(data):
+            for event, _ in data['events']:
+                if event == 'player_hit':
+                    await on_board_hit(None)
+
+        @self.player.on('round_ready')
+        async def on_round_ready(data):
+            self.round_ready.set()
+
+    async def connect(self):
+        for client, kind in ((self.board, 'board'), (self.player, 'player')):
+            await client.connect(self.base_url, transports=['websocket'])
+            await client.emit('join_game', {'game_id': self.game_id, 'type': kind})
+
+    async def run(self, stop_at: float):
+        await self.board.emit('start_game', {'game_id': self.game_id})
+        await asyncio.wait_for(self.round_ready.wait(), 10)
+
+        while time.monotonic() < stop_at:
+            self.echo.clear()
+            await self.player.emit('word_hit', {
+                'game_id': self.game_id, 'word': f'palavra {self.hits % 10}'})
+            try:
+                await asyncio.wait_for(self.echo.wait(), 5)
+            except asyncio.TimeoutError:
+                break
+            self.hits += 1
+
+    async def close(self):
+        await self.board.disconnect()
+        await self.player.disconnect()
+
+
+async def measure(port: int, games: int, seconds: float) -> dict:
+    base_url = f'http://127.0.0.1:{port}'
+    loop = asyncio.get_running_loop()
+
+    clients = []
+    for _ in range(games):
+        game = await loop.run_in_executor(
+            None, http_json, f'{base_url}/api/games', {'themes': ['geral']})
+        clients.append(GameClients(base_url, game['id']))
+
+    await asyncio.gather(*(c.connect() for c in clients))
+    await asyncio.sleep(0.5)
+
+    start = time.monotonic()
+    await asyncio.gather(*(c.run(start + seconds) for c in clients))
+    elapsed = time.monotonic() - start
+
+    hits = sum(c.hits for c in clients)
+    board_events = sum(c.board_events for c in clients)
+    await asyncio.gather(*(c.close() for c in clients))
+
+    return {'hits': hits, 'rate': hits / elapsed,
+            'board_missing': hits - board_events}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--games', type=int, default=40)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8790)
+    args = parser.parse_args()
+
+    print(f"núcleos: {os.cpu_count()}")
+    print(f"{'workers':>8}{'eventos':>10}{'eventos/s':>12}{'escala':>8}{'perdidos':>10}")
+    baseline = None
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            process = start_cluster(workers, args.port, args.port + 1,
+                                    os.path.join(tmp, 'games.db'))
+            try:
+                result = asyncio.run(measure(args.port, args.games, args.seconds))
+            finally:
+                process.terminate()
+                process.wait()
+
+        baseline = baseline or result['rate']
+        print(f"{workers:>8}{result['hits']:>10}{result['rate']:>12.0f}"
+              f"{result['rate'] / baseline:>8.2f}{result['board_missing']:>10}")
+
+
+if __name__ == '__main__':
+    main()
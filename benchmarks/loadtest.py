@@ -0,0 +1,345 @@
+"""
+30 Segundos v3.1 - Teste de carga com partidas simuladas
+
+Cria N partidas, cada uma com um board e alguns celulares (clientes
+python-socketio), e joga rodadas com a mesma sequência do frontend:
+join_game -> start_game -> start_timer -> word_hit x k -> timer_ended
+-> confirm_round (ou challenge_result / cursed_result) -> request_round.
+
+Para cada passo mede o tempo entre o comando e a chegada do evento de
+resposta em todos os clientes que deveriam recebê-lo; o que não chega
+em --timeout segundos conta como perdido. Com o servidor iniciado pelo
+próprio script (padrão) também mede a CPU gasta por ele, por partida.
+
+Uso:
+    python -m benchmarks.loadtest [--games 20] [--players 3] [--rounds 3] [--hits 6]
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000   # servidor já rodando
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional, Tuple
+
+import socketio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def http_json(url: str, data: dict = None) -> dict:
+    body = json.dumps(data).encode('utf-8') if data is not None else None
+    request = urllib.request.Request(
+        url, data=body, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def start_server(port: int) -> subprocess.Popen:
+    env = dict(os.environ, WORD_BANKS_WATCH_INTERVAL='0', STATIC_WATCH_INTERVAL='0')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'backend.main:app_with_socket',
+         '--port', str(port), '--log-level', 'warning'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            http_json(f'http://127.0.0.1:{port}/api/themes')
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('servidor não respondeu')
+
+
+def process_cpu(pid: int) -> Optional[float]:
+    """Segundos de CPU (usuário + sistema) do processo; None fora do Linux"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Metrics:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.dropped: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, step: str, seconds: float):
+        self.latencies.setdefault(step, []).append(seconds * 1000)
+
+    def drop(self, step: str, count: int = 1):
+        self.dropped[step] = self.dropped.get(step, 0) + count
+
+
+class VirtualClient:
+    """Um cliente Socket.IO que registra quem espera por qual evento"""
+
+    def __init__(self, role: str, metrics: Metrics):
+        self.role = role
+        self.metrics = metrics
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self._waiters: List[Tuple[str, Callable[[dict], bool], asyncio.Future]] = []
+
+        @self.sio.on('*')
+        async def on_any(event, data=None):
+            if event == 'event_batch':
+                for batched, payload in data.get('events', []):
+                    self._dispatch(batched, payload)
+            else:
+                self._dispatch(event, data)
+
+    def _dispatch(self, event: str, data):
+        if event == 'error':
+            self.metrics.errors += 1
+        now = time.perf_counter()
+        for waiter in list(self._waiters):
+            name, predicate, future = waiter
+            if name == event and not future.done() and predicate(data):
+                future.set_result(now)
+                self._waiters.remove(waiter)
+
+    def expect(self, event: str, predicate: Callable[[dict], bool] = lambda data: True):
+        """Registra a espera antes do emit; o future recebe o instante da chegada"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((event, predicate, future))
+        return future
+
+    def forget(self, future: asyncio.Future):
+        self._waiters = [w for w in self._waiters if w[2] is not future]
+
+
+class VirtualGame:
+    def __init__(self, base_url: str, game_id: str, players: int, args, metrics: Metrics):
+        self.base_url = base_url
+        self.game_id = game_id
+        self.args = args
+        self.metrics = metrics
+        self.board = VirtualClient('board', metrics)
+        self.players = [VirtualClient('player', metrics) for _ in range(players)]
+        self.round = 0
+        self.finished = False
+
+    @property
+    def clients(self) -> List[VirtualClient]:
+        return [self.board, *self.players]
+
+    async def wait(self, step: str, started: float, futures: List[asyncio.Future]):
+        """Espera as respostas de um passo e registra latência ou perda"""
+        done, pending = await asyncio.wait(futures, timeout=self.args.timeout)
+        for future in done:
+            self.metrics.record(step, future.result() - started)
+        if pending:
+            self.metrics.drop(step, len(pending))
+            for client in self.clients:
+                for future in pending:
+                    client.forget(future)
+        return [future.result() for future in done]
+
+    async def command(self, client: VirtualClient, event: str, payload: dict = None,
+                      key: str = None):
+        # Mesmo formato do sendCommand() do frontend
+        command_id = f'{event}:{self.round}' + (f':{key}' if key else '')
+        await client.sio.emit(event, {
+            'game_id': self.game_id, 'command_id': command_id,
+            'round': self.round, **(payload or {})})
+
+    async def connect(self):
+        url = f'{self.base_url}?game={self.game_id}'
+        for client in self.clients:
+            await client.sio.connect(url, transports=['websocket'])
+            future = client.expect('game_state')
+            started = time.perf_counter()
+            await client.sio.emit('join_game', {'game_id': self.game_id, 'type': client.role})
+            await self.wait('join_game', started, [future])
+
+    async def next_round(self, first: bool) -> Optional[dict]:
+        rounds = {}
+
+        def capture(client):
+            def predicate(data):
+                rounds[client] = data.get('round')
+                return True
+            return predicate
+
+        futures = [c.expect('round_ready', capture(c)) for c in self.clients]
+        started = time.perf_counter()
+        if first:
+            await self.command(self.board, 'start_game')
+        else:
+            await self.command(self.board, 'request_round')
+        await self.wait('round_ready', started, futures)
+        # O celular recebe a rodada completa (com a carta)
+        return next((rounds[c] for c in self.players if rounds.get(c)), None)
+
+    async def play_round(self, round_data: dict, player: VirtualClient):
+        self.round = round_data['round_number']
+
+        ends_at = {}
+
+        def capture_deadline(data):
+            ends_at['ms'] = data.get('ends_at')
+            return True
+
+        futures = [c.expect('timer_started', capture_deadline) for c in self.clients]
+        started = time.perf_counter()
+        await player.sio.emit('player_view_card', {'game_id': self.game_id})
+        await self.command(player, 'start_timer')
+        await self.wait('start_timer', started, futures)
+
+        card = round_data.get('card')
+        if card:
+            words = [w['text'] for w in card['yellow_words'] + card['blue_words']]
+            for word in random.sample(words, min(self.args.hits, len(words))):
+                await asyncio.sleep(random.uniform(0.05, self.args.hit_gap))
+                future = self.board.expect('player_hit', lambda d, w=word: d.get('word') == w)
+                started = time.perf_counter()
+                await self.command(player, 'word_hit', {'word': word, 'is_bonus': False}, key=word)
+                await self.wait('word_hit', started, [future])
+
+        # O celular avisa no fim do seu cronômetro; quem encerra é o servidor
+        futures = [c.expect('time_up') for c in self.clients]
+        if ends_at.get('ms'):
+            await asyncio.sleep(max(0.0, ends_at['ms'] / 1000 - time.time()))
+        deadline = time.perf_counter()
+        await self.command(player, 'timer_ended')
+        await self.wait('time_up', deadline, futures)
+
+        futures = [c.expect(event) for c in self.clients for event in ('round_confirmed', 'game_finished')]
+        started = time.perf_counter()
+        if round_data.get('is_challenge'):
+            await self.command(self.board, 'challenge_result', {'completed': True})
+        elif round_data.get('is_cursed'):
+            await self.command(self.board, 'cursed_result', {'guessed': True})
+        else:
+            await self.command(self.board, 'confirm_round', {'confirmed_words': []})
+
+        # Cada cliente recebe um dos dois; o outro future fica sem resposta
+        done, pending = await asyncio.wait(futures, timeout=self.args.timeout)
+        for future in done:
+            self.metrics.record('confirm_round', future.result() - started)
+        missing = len(self.clients) - len(done)
+        if missing > 0:
+            self.metrics.drop('confirm_round', missing)
+        for client in self.clients:
+            for future in pending:
+                client.forget(future)
+        if any(f in done for f in futures[1::2]):
+            self.finished = True
+
+    async def run(self):
+        await asyncio.sleep(random.uniform(0, self.args.ramp))
+        await self.connect()
+        for number in range(self.args.rounds):
+            round_data = await self.next_round(first=number == 0)
+            if not round_data:
+                break
+            self.round = round_data['round_number']
+            await self.play_round(round_data, self.players[number % len(self.players)])
+            if self.finished:
+                break
+
+    async def close(self):
+        for client in self.clients:
+            await client.sio.disconnect()
+
+
+async def run_load(base_url: str, args) -> Tuple[Metrics, float]:
+    metrics = Metrics()
+    loop = asyncio.get_running_loop()
+
+    games = []
+    for _ in range(args.games):
+        game = await loop.run_in_executor(None, http_json, f'{base_url}/api/games', {
+            'themes': ['geral'], 'levels': [1, 2], 'round_time': args.round_time})
+        games.append(VirtualGame(base_url, game['id'], args.players, args, metrics))
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(game.run() for game in games), return_exceptions=True)
+    elapsed = time.monotonic() - start
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"partida abortada: {result!r}")
+            metrics.errors += 1
+    await asyncio.gather(*(game.close() for game in games), return_exceptions=True)
+    return metrics, elapsed
+
+
+def report(metrics: Metrics, elapsed: float, args, server_cpu: Optional[float]):
+    print(f"{args.games} partidas x {args.players + 1} clientes, "
+          f"{args.rounds} rodadas, {elapsed:.1f} s")
+    print(f"{'passo':<16}{'n':>7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+          f"{'máx ms':>9}{'perdidos':>10}")
+    steps = ('join_game', 'round_ready', 'start_timer', 'word_hit', 'time_up', 'confirm_round')
+    for step in steps:
+        values = metrics.latencies.get(step, [])
+        dropped = metrics.dropped.get(step, 0)
+        if not values:
+            print(f"{step:<16}{0:>7}{'-':>9}{'-':>9}{'-':>9}{'-':>9}{dropped:>10}")
+            continue
+        print(f"{step:<16}{len(values):>7}{percentile(values, 0.5):>9.1f}"
+              f"{percentile(values, 0.9):>9.1f}{percentile(values, 0.99):>9.1f}"
+              f"{max(values):>9.1f}{dropped:>10}")
+    print(f"erros recebidos: {metrics.errors}")
+    print(f"CPU do script: {time.process_time():.2f} s")
+    if server_cpu is not None:
+        print(f"CPU do servidor: {server_cpu:.2f} s "
+              f"({server_cpu / args.games * 1000:.0f} ms por partida, "
+              f"{server_cpu / elapsed / args.games * 100:.2f}% de um núcleo por partida)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='servidor já rodando (sem isso, sobe um local)')
+    parser.add_argument('--port', type=int, default=8795)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--players', type=int, default=3, help='celulares por partida')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--hits', type=int, default=6, help='acertos por rodada normal')
+    parser.add_argument('--hit-gap', type=float, default=0.4,
+                        help='intervalo máximo (s) entre acertos')
+    parser.add_argument('--round-time', type=int, default=5, help='segundos por rodada')
+    parser.add_argument('--ramp', type=float, default=2.0,
+                        help='segundos para todas as partidas começarem')
+    parser.add_argument('--timeout', type=float, default=5.0)
+    args = parser.parse_args()
+
+    process = None
+    base_url = args.url
+    if not base_url:
+        process = start_server(args.port)
+        base_url = f'http://127.0.0.1:{args.port}'
+
+    try:
+        cpu_before = process_cpu(process.pid) if process else None
+        metrics, elapsed = asyncio.run(run_load(base_url, args))
+        cpu_after = process_cpu(process.pid) if process else None
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    server_cpu = None
+    if cpu_before is not None and cpu_after is not None:
+        server_cpu = cpu_after - cpu_before
+    report(metrics, elapsed, args, server_cpu)
+
+
+if __name__ == '__main__':
+    main()
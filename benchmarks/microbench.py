@@ -0,0 +1,346 @@
+"""
+30 Segundos v3.1 - Microbenchmarks com baseline
+
+Mede os caminhos quentes do WordService e do GameService em escala de
+uso real: os 11 bancos do repositório, bancos sintéticos de 100 mil e
+1 milhão de palavras e 10 mil partidas ativas. `run` grava o resultado
+em JSON; `compare` roda de novo (ou lê outro JSON) e sai com código 1
+se algum caso ficou mais lento que a baseline além do limite.
+
+A baseline vale para a máquina em que foi gerada: depois de trocar de
+máquina (ou de Python), gere outra com `run --output`.
+
+Uso:
+    python -m benchmarks.microbench run [--quick] [--output benchmarks/baselines/microbench.json]
+    python -m benchmarks.microbench compare [--baseline ...] [--current resultado.json] [--threshold 0.25]
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.bench_word_store import build_store, synthetic_corpus
+from backend.services.game_service import GameService
+from backend.services.game_store import MemoryGameStore
+from backend.services.log import set_levels
+from backend.services.word_service import WordService, word_service
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'baselines', 'microbench.json')
+SYNTHETIC_THEMES = 11
+MIN_BATCH_TIME = 0.05
+REPEAT = 5
+
+
+def measure(fn: Callable[[], object], repeat: int = REPEAT) -> dict:
+    """Tempo por chamada (µs): melhor e mediana de `repeat` lotes"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_BATCH_TIME:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(MIN_BATCH_TIME / elapsed) + 1))
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        'best_us': round(min(samples) * 1e6, 3),
+        'median_us': round(statistics.median(samples) * 1e6, 3),
+        'calls': number * repeat
+    }
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+class Fixtures:
+    """Serviços montados uma vez e reaproveitados entre os casos"""
+
+    def __init__(self, quick: bool):
+        self.quick = quick
+        self.live_games = 1000 if quick else 10000
+        self._word_services: Dict[int, WordService] = {}
+        self._game_service: Optional[GameService] = None
+
+    def word_service(self, words: int) -> WordService:
+        """WordService com um banco sintético de `words` palavras"""
+        service = self._word_services.get(words)
+        if service is None:
+            service = WordService()
+            service.store = build_store(synthetic_corpus(words, SYNTHETIC_THEMES))
+            service.decks.clear()
+            self._word_services[words] = service
+        return service
+
+    def game_service(self) -> GameService:
+        if self._game_service is None:
+            service = GameService(store=MemoryGameStore())
+            for i in range(self.live_games):
+                game = service.create_game({'name': f'Bench {i}', 'themes': ['geral'],
+                                            'levels': [1, 2, 3]})
+                service.start_game(game.id)
+            self._game_service = service
+        return self._game_service
+
+
+def synthetic_selection(service: WordService) -> Tuple[List[str], List[int]]:
+    return list(service.store.themes), [1, 2]
+
+
+# ============================================
+# CASOS
+# ============================================
+
+def card_words(service: WordService, themes: List[str], levels: List[int]) -> Callable:
+    game_ids = [f'BENCH{i}' for i in range(100)]
+    counter = iter(range(1 << 62))
+
+    def run():
+        service.get_card_words(game_ids[next(counter) % 100], themes, levels)
+    return run
+
+
+def case_card_words_banks(fx: Fixtures) -> Callable:
+    themes = list(word_service.store.themes)
+    return card_words(word_service, themes, [1, 2])
+
+
+def case_card_words_synthetic(words: int) -> Callable[[Fixtures], Callable]:
+    def factory(fx: Fixtures) -> Callable:
+        service = fx.word_service(words)
+        themes, levels = synthetic_selection(service)
+        return card_words(service, themes, levels)
+    return factory
+
+
+def case_first_deck_synthetic(words: int) -> Callable[[Fixtures], Callable]:
+    """Primeira carta de uma seleção nova: monta a lista de ids elegíveis"""
+    def factory(fx: Fixtures) -> Callable:
+        service = fx.word_service(words)
+        themes, levels = synthetic_selection(service)
+
+        def run():
+            service.decks.pop('BENCH', None)
+            service._eligible.clear()
+            service.get_card_words('BENCH', themes, levels)
+        return run
+    return factory
+
+
+def case_apply_special_words(fx: Fixtures) -> Callable:
+    words = [(f'palavra {i}', 1 + i % 3) for i in range(5)]
+    random.seed(30)
+
+    def run():
+        word_service._apply_special_words(words, 0.15, 0.10)
+    return run
+
+
+def case_load_word_banks(fx: Fixtures) -> Callable:
+    service = WordService()
+    return service.load_word_banks
+
+
+def case_build_store_json(words: int) -> Callable[[Fixtures], Callable]:
+    """Leitura dos JSON sem artefato compilado (primeira carga, bancos editados)"""
+    def factory(fx: Fixtures) -> Callable:
+        folder = Path(tempfile.mkdtemp(prefix='microbench_'))
+        atexit.register(shutil.rmtree, folder, ignore_errors=True)
+        for theme, entries in synthetic_corpus(words, SYNTHETIC_THEMES).items():
+            with open(folder / f'{theme}.json', 'w', encoding='utf-8') as f:
+                json.dump([{'word': text, 'level': level} for text, level in entries], f)
+        service = WordService()
+        return lambda: service._build_store(folder)
+    return factory
+
+
+def game_round_cycle(fx: Fixtures) -> Callable:
+    service = fx.game_service()
+    game_ids = list(service.games)
+    counter = iter(range(1 << 62))
+
+    def run():
+        game_id = game_ids[next(counter) % len(game_ids)]
+        game = service.games[game_id]
+        if game.state == 'finished':
+            service.start_game(game_id)
+        if game.current_round_data is None:
+            service.prepare_round(game_id)
+        round_data = game.current_round_data
+        if round_data.is_challenge:
+            service.resolve_challenge(game_id, True)
+        elif round_data.is_cursed:
+            service.resolve_cursed(game_id, True)
+        else:
+            words = [w['text'] for w in round_data.card.yellow_words[:2]]
+            service.confirm_round(game_id, words)
+    return run
+
+
+def case_prepare_confirm(fx: Fixtures) -> Callable:
+    return game_round_cycle(fx)
+
+
+def case_game_to_dict(dirty: bool) -> Callable[[Fixtures], Callable]:
+    def factory(fx: Fixtures) -> Callable:
+        service = fx.game_service()
+        games = list(service.games.values())
+        counter = iter(range(1 << 62))
+
+        def run():
+            game = games[next(counter) % len(games)]
+            if dirty:
+                # Mudança típica de uma rodada: posição de um time
+                game.team1.position = game.team1.position
+            game.to_dict()
+        return run
+    return factory
+
+
+def case_cursed_loader(words: Optional[int]) -> Callable[[Fixtures], Callable]:
+    def factory(fx: Fixtures) -> Callable:
+        service = fx.game_service()
+        store = fx.word_service(words).store if words else word_service.store
+
+        def run():
+            previous, word_service.store = word_service.store, store
+            try:
+                service._load_cursed_words()
+            finally:
+                word_service.store = previous
+        return run
+    return factory
+
+
+def cases(quick: bool) -> List[Tuple[str, Callable[[Fixtures], Callable]]]:
+    scales = [100_000] if quick else [100_000, 1_000_000]
+    suite = [
+        ('word.get_card_words[banks]', case_card_words_banks),
+        ('word.apply_special_words', case_apply_special_words),
+        ('word.load_word_banks[banks]', case_load_word_banks),
+        ('game.cursed_loader[banks]', case_cursed_loader(None)),
+        ('game.prepare_confirm_round[live]', case_prepare_confirm),
+        ('game.to_dict[cached]', case_game_to_dict(dirty=False)),
+        ('game.to_dict[dirty]', case_game_to_dict(dirty=True)),
+    ]
+    for words in scales:
+        label = f'{words // 1000}k' if words < 1_000_000 else f'{words // 1_000_000}M'
+        suite += [
+            (f'word.get_card_words[{label}]', case_card_words_synthetic(words)),
+            (f'word.first_deck[{label}]', case_first_deck_synthetic(words)),
+            (f'word.build_store_json[{label}]', case_build_store_json(words)),
+            (f'game.cursed_loader[{label}]', case_cursed_loader(words)),
+        ]
+    return suite
+
+
+# ============================================
+# COMANDOS
+# ============================================
+
+def run_suite(quick: bool, only: Optional[str] = None) -> dict:
+    # Logs dos serviços (cargas, rodadas, reembaralhos) ficam de fora
+    set_levels({'word': 'WARNING', 'game': 'WARNING'})
+    fx = Fixtures(quick)
+    results = {}
+    for name, factory in cases(quick):
+        if only and only not in name:
+            continue
+        results[name] = measure(factory(fx))
+        print(f"{name:<36}{results[name]['best_us']:>14.2f} µs"
+              f"{results[name]['median_us']:>14.2f} µs", flush=True)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'quick': quick,
+            'live_games': fx.live_games,
+            'date': time.strftime('%Y-%m-%d'),
+        },
+        'results': results
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Imprime a comparação e retorna os casos que regrediram"""
+    regressions = []
+    print(f"{'caso':<36}{'baseline µs':>14}{'atual µs':>14}{'razão':>8}")
+    for name, base in baseline['results'].items():
+        result = current['results'].get(name)
+        if result is None:
+            continue
+        ratio = result['best_us'] / base['best_us'] if base['best_us'] else 1.0
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '  REGRESSÃO'
+        print(f"{name:<36}{base['best_us']:>14.2f}{result['best_us']:>14.2f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='roda a suíte e grava o JSON')
+    run_parser.add_argument('--quick', action='store_true',
+                            help='sem o banco de 1M e com 1000 partidas')
+    run_parser.add_argument('--only', help='só os casos com este trecho no nome')
+    run_parser.add_argument('--output', help='arquivo JSON do resultado')
+
+    compare_parser = commands.add_parser('compare', help='compara com a baseline')
+    compare_parser.add_argument('--baseline', default=BASELINE_PATH)
+    compare_parser.add_argument('--current', help='JSON já medido (sem isso, roda agora)')
+    compare_parser.add_argument('--threshold', type=float, default=0.25,
+                                help='fração de piora tolerada (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        result = run_suite(args.quick, args.only)
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+                f.write('\n')
+            print(f"Resultado gravado em {args.output}")
+        return
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        current = run_suite(baseline['meta'].get('quick', False))
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} caso(s) acima de {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("Nenhuma regressão")
+
+
+if __name__ == '__main__':
+    main()
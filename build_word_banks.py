@@ -0,0 +1,12 @@
+"""
+30 Segundos v3.1 - Compila os bancos de palavras
+
+Gera data/word_banks.bin a partir de data/word_banks/*.json. O servidor
+usa o artefato automaticamente enquanto ele corresponder aos JSON atuais.
+"""
+
+from backend.services.word_artifact import main
+
+
+if __name__ == "__main__":
+    main()
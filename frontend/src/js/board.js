@@ -11,6 +11,7 @@ let gameId = null;
 let gameState = null;
 let currentRound = null;
 let timerInterval = null;
+let timerDeadline = 0;
 let timeRemaining = 30;
 let confirmedWords = [];
 let playerConnected = false;
@@ -54,16 +55,19 @@ function toggleFullscreen() {
 // ============================================
 
 function connectSocket() {
-    socket = io();
+    // WebSocket primeiro: com vários workers o polling exigiria sessão fixa.
+    // `game` na query deixa o proxy shardeado achar o worker da partida.
+    socket = io({ transports: ['websocket', 'polling'], query: { game: gameId } });
+    handleEventBatches(socket);
     
     socket.on('connect', () => {
         console.log('[Board] Conectado');
         socket.emit('join_game', { game_id: gameId, type: 'board' });
     });
     
-    socket.on('game_state', (game) => {
-        console.log('[Board] Estado:', game);
-        gameState = game;
+    socket.on('game_state', (data) => {
+        console.log('[Board] Estado:', data);
+        gameState = gameSync.apply(data, requestSync);
         updateUI();
         
         if (gameState.state === 'waiting') {
@@ -77,15 +81,15 @@ function connectSocket() {
         updateWaitingStatus();
     });
     
-    socket.on('game_started', (game) => {
+    socket.on('game_started', (data) => {
         console.log('[Board] Jogo iniciado');
-        gameState = game;
+        gameState = gameSync.apply(data, requestSync);
         updateUI();
     });
     
     socket.on('round_ready', (data) => {
         console.log('[Board] Rodada pronta:', data);
-        gameState = data.game;
+        gameState = gameSync.apply(data.state, requestSync);
         currentRound = data.round;
         
         updateUI();
@@ -104,8 +108,9 @@ function connectSocket() {
     
     socket.on('timer_started', (data) => {
         console.log('[Board] Timer iniciado');
-        currentRound = data.round;
-        gameState = data.game;
+        gameState = gameSync.apply(data.state, requestSync);
+        if (!currentRound) return;
+        currentRound.started = true;
         
         if (currentRound.is_challenge) {
             showState('stateChallengeTimer');
@@ -118,7 +123,11 @@ function connectSocket() {
             updatePlayingTeamIndicator();
         }
         
-        startTimer();
+        startTimer(data.remaining_ms);
+    });
+    
+    socket.on('timer_tick', (data) => {
+        if (timerInterval) syncTimer(data.remaining_ms);
     });
     
     socket.on('player_hit', (data) => {
@@ -128,10 +137,13 @@ function connectSocket() {
     socket.on('time_up', (data) => {
         console.log('[Board] Tempo esgotado');
         stopTimer();
-        currentRound = data.round;
-        gameState = data.game;
+        gameState = gameSync.apply(data.state, requestSync);
         
         updateUI();
+        if (!currentRound) return;
+        currentRound.player_hits = data.player_hits;
+        // As palavras só chegam ao board no fim do tempo
+        if (data.card) currentRound.card = data.card;
         
         if (currentRound.is_challenge) {
             showState('stateChallengeConfirm');
@@ -144,7 +156,7 @@ function connectSocket() {
     
     socket.on('round_confirmed', (data) => {
         console.log('[Board] Rodada confirmada');
-        gameState = data.game;
+        gameState = gameSync.apply(data.state, requestSync);
         hideConfirmationModal();
         updateUI();
         showRoundResult(data.result);
@@ -152,6 +164,7 @@ function connectSocket() {
     
     socket.on('game_finished', (data) => {
         console.log('[Board] Jogo finalizado');
+        gameState = gameSync.apply(data.state, requestSync);
         showVictory(data.winner);
     });
     
@@ -161,6 +174,25 @@ function connectSocket() {
     });
 }
 
+function requestSync() {
+    socket.emit('sync_state', { game_id: gameId });
+}
+
+/**
+ * Envia um comando do board. O id vem da ação + rodada, então um toque
+ * duplo (ou outro board na mesma partida) manda o mesmo id e o servidor
+ * aplica uma vez só; `round` descarta comandos de uma rodada encerrada.
+ */
+function sendCommand(event, payload = {}) {
+    const round = currentRound ? currentRound.round_number : (gameState?.current_round || 0);
+    socket.emit(event, {
+        game_id: gameId,
+        command_id: `${event}:${round}`,
+        round,
+        ...payload
+    });
+}
+
 // ============================================
 // ATUALIZAR STATUS DE AGUARDANDO
 // ============================================
@@ -245,8 +277,8 @@ async function loadQRCode() {
         const response = await fetch(`/api/games/${gameId}/qrcode`);
         const data = await response.json();
         
-        if (data.qr_code) {
-            document.getElementById('qrContainer').innerHTML = `<img src="${data.qr_code}" alt="QR Code">`;
+        if (data.qr_url) {
+            document.getElementById('qrContainer').innerHTML = `<img src="${data.qr_url}" alt="QR Code">`;
         }
         document.getElementById('playerUrl').textContent = data.player_url;
     } catch (error) {
@@ -318,15 +350,22 @@ function showState(stateId) {
 // TIMER
 // ============================================
 
-function startTimer() {
-    timeRemaining = gameState?.config?.round_time || 30;
+// O prazo é do servidor: o board só mostra quanto falta até ele
+function startTimer(remainingMs) {
+    stopTimer();
+    syncTimer(remainingMs ?? (gameState?.config?.round_time || 30) * 1000);
+    timerInterval = setInterval(tickTimer, 250);
+}
+
+function syncTimer(remainingMs) {
+    timerDeadline = Date.now() + remainingMs;
+    tickTimer();
+}
+
+function tickTimer() {
+    timeRemaining = Math.max(0, Math.ceil((timerDeadline - Date.now()) / 1000));
     updateTimerDisplay();
-    
-    timerInterval = setInterval(() => {
-        timeRemaining--;
-        updateTimerDisplay();
-        if (timeRemaining <= 0) stopTimer();
-    }, 1000);
+    if (timeRemaining <= 0) stopTimer();
 }
 
 function stopTimer() {
@@ -405,10 +444,7 @@ function updateConfirmedCount() {
 }
 
 function confirmRound() {
-    socket.emit('confirm_round', {
-        game_id: gameId,
-        confirmed_words: confirmedWords
-    });
+    sendCommand('confirm_round', { confirmed_words: confirmedWords });
     confirmedWords = [];
 }
 
@@ -417,11 +453,11 @@ function confirmRound() {
 // ============================================
 
 function challengeSuccess() {
-    socket.emit('challenge_result', { game_id: gameId, completed: true });
+    sendCommand('challenge_result', { completed: true });
 }
 
 function challengeFail() {
-    socket.emit('challenge_result', { game_id: gameId, completed: false });
+    sendCommand('challenge_result', { completed: false });
 }
 
 // ============================================
@@ -429,11 +465,11 @@ function challengeFail() {
 // ============================================
 
 function cursedSuccess() {
-    socket.emit('cursed_result', { game_id: gameId, guessed: true });
+    sendCommand('cursed_result', { guessed: true });
 }
 
 function cursedFail() {
-    socket.emit('cursed_result', { game_id: gameId, guessed: false });
+    sendCommand('cursed_result', { guessed: false });
 }
 
 // ============================================
@@ -485,11 +521,11 @@ function startGame() {
         alert('Aguarde um jogador conectar primeiro!');
         return;
     }
-    socket.emit('start_game', { game_id: gameId });
+    sendCommand('start_game');
 }
 
 function nextRound() {
-    socket.emit('request_round', { game_id: gameId });
+    sendCommand('request_round');
 }
 
 // ============================================
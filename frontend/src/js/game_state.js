@@ -0,0 +1,71 @@
+/**
+ * 30 Segundos v3.1 - Estado sincronizado do jogo
+ *
+ * O servidor envia o estado completo ao entrar ({v, full}) e depois só
+ * as alterações de cada versão ({v, base, set, del}). Se a versão base
+ * não bate com a local, o cliente pede o estado completo de novo.
+ */
+
+const gameSync = {
+    version: 0,
+    state: null,
+    syncPending: false,
+
+    /**
+     * Aplica um estado completo ou incremental e retorna o estado atual
+     */
+    apply(patch, requestSync) {
+        if (!patch) return this.state;
+
+        if (patch.full) {
+            this.state = patch.full;
+            this.version = patch.v;
+            this.syncPending = false;
+            return this.state;
+        }
+
+        if (!this.state || patch.base !== this.version) {
+            if (!this.syncPending) {
+                this.syncPending = true;
+                requestSync();
+            }
+            return this.state;
+        }
+
+        Object.entries(patch.set || {}).forEach(([path, value]) => {
+            const keys = path.split('.');
+            const last = keys.pop();
+            let target = this.state;
+            keys.forEach(key => {
+                if (typeof target[key] !== 'object' || target[key] === null) target[key] = {};
+                target = target[key];
+            });
+            target[last] = value;
+        });
+
+        (patch.del || []).forEach(path => {
+            const keys = path.split('.');
+            const last = keys.pop();
+            let target = this.state;
+            for (const key of keys) {
+                target = target?.[key];
+            }
+            if (target) delete target[last];
+        });
+
+        this.version = patch.v;
+        return this.state;
+    }
+};
+
+/**
+ * Eventos frequentes (acertos, ticks) podem chegar agrupados em um
+ * `event_batch`; cada um é repassado aos handlers normais, em ordem.
+ */
+function handleEventBatches(socket) {
+    socket.on('event_batch', (data) => {
+        (data.events || []).forEach(([event, payload]) => {
+            socket.listeners(event).forEach(handler => handler(payload));
+        });
+    });
+}
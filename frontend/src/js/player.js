@@ -11,6 +11,7 @@ let gameId = null;
 let gameState = null;
 let currentRound = null;
 let timerInterval = null;
+let timerDeadline = 0;
 let timeRemaining = 30;
 let myHits = [];
 let yellowWords = [];
@@ -54,16 +55,19 @@ function toggleFullscreen() {
 // ============================================
 
 function connectSocket() {
-    socket = io();
+    // WebSocket primeiro: com vários workers o polling exigiria sessão fixa.
+    // `game` na query deixa o proxy shardeado achar o worker da partida.
+    socket = io({ transports: ['websocket', 'polling'], query: { game: gameId } });
+    handleEventBatches(socket);
     
     socket.on('connect', () => {
         console.log('[Player] Conectado');
         socket.emit('join_game', { game_id: gameId, type: 'player' });
     });
     
-    socket.on('game_state', (game) => {
-        console.log('[Player] Estado:', game);
-        gameState = game;
+    socket.on('game_state', (data) => {
+        console.log('[Player] Estado:', data);
+        gameState = gameSync.apply(data, requestSync);
         
         if (gameState.state === 'waiting') {
             showScreen('screenWaiting');
@@ -72,14 +76,14 @@ function connectSocket() {
         }
     });
     
-    socket.on('game_started', (game) => {
+    socket.on('game_started', (data) => {
         console.log('[Player] Jogo iniciou');
-        gameState = game;
+        gameState = gameSync.apply(data, requestSync);
     });
     
     socket.on('round_ready', (data) => {
         console.log('[Player] Rodada pronta:', data);
-        gameState = data.game;
+        gameState = gameSync.apply(data.state, requestSync);
         currentRound = data.round;
         myHits = [];
         
@@ -92,6 +96,15 @@ function connectSocket() {
         }
     });
     
+    // O servidor manda o prazo real; o cronômetro local só acompanha
+    socket.on('timer_started', (data) => {
+        if (timerInterval && data.remaining_ms != null) syncTimer(data.remaining_ms);
+    });
+    
+    socket.on('timer_tick', (data) => {
+        if (timerInterval) syncTimer(data.remaining_ms);
+    });
+    
     socket.on('time_up', () => {
         console.log('[Player] Tempo esgotado');
         stopTimer();
@@ -101,12 +114,13 @@ function connectSocket() {
     
     socket.on('round_confirmed', (data) => {
         console.log('[Player] Rodada confirmada');
-        gameState = data.game;
+        gameState = gameSync.apply(data.state, requestSync);
         showScreen('screenWaitingRound');
     });
     
     socket.on('game_finished', (data) => {
         console.log('[Player] Jogo finalizado');
+        gameSync.apply(data.state, requestSync);
         stopTimer();
         showVictory(data.winner);
     });
@@ -117,6 +131,24 @@ function connectSocket() {
     });
 }
 
+function requestSync() {
+    socket.emit('sync_state', { game_id: gameId });
+}
+
+/**
+ * Envia um comando do jogador com id derivado da ação + rodada (+ `key`),
+ * para o servidor descartar repetições e comandos de rodadas encerradas.
+ */
+function sendCommand(event, payload = {}, key = '') {
+    const round = currentRound ? currentRound.round_number : (gameState?.current_round || 0);
+    socket.emit(event, {
+        game_id: gameId,
+        command_id: `${event}:${round}` + (key ? `:${key}` : ''),
+        round,
+        ...payload
+    });
+}
+
 // ============================================
 // TELAS
 // ============================================
@@ -151,7 +183,7 @@ function viewCard() {
     if (!currentRound?.card) return;
     
     socket.emit('player_view_card', { game_id: gameId });
-    socket.emit('start_timer', { game_id: gameId });
+    sendCommand('start_timer');
     
     yellowWords = currentRound.card.yellow_words.map(w => ({...w, hit: false}));
     blueWords = currentRound.card.blue_words.map(w => ({...w, hit: false}));
@@ -187,11 +219,10 @@ function hitWord(index) {
     word.hit = true;
     myHits.push(word.text);
     
-    socket.emit('word_hit', {
-        game_id: gameId,
+    sendCommand('word_hit', {
         word: word.text,
         is_bonus: word.is_bonus || false
-    });
+    }, word.text);
     
     // Vira o lado
     setTimeout(() => {
@@ -210,7 +241,7 @@ function showChallengeReady() {
 }
 
 function startChallenge() {
-    socket.emit('start_timer', { game_id: gameId });
+    sendCommand('start_timer');
     showScreen('screenChallengeRunning');
     document.getElementById('challengeTextRunning').textContent = currentRound.challenge_text;
     startTimer();
@@ -226,7 +257,7 @@ function showCursedReady() {
 }
 
 function startCursed() {
-    socket.emit('start_timer', { game_id: gameId });
+    sendCommand('start_timer');
     showScreen('screenCursedRunning');
     document.getElementById('cursedWordRunning').textContent = currentRound.cursed_word;
     startTimer();
@@ -237,17 +268,20 @@ function startCursed() {
 // ============================================
 
 function startTimer() {
-    timeRemaining = gameState?.config?.round_time || 30;
+    stopTimer();
+    syncTimer((gameState?.config?.round_time || 30) * 1000);
+    timerInterval = setInterval(tickTimer, 250);
+}
+
+function syncTimer(remainingMs) {
+    timerDeadline = Date.now() + remainingMs;
+    tickTimer();
+}
+
+function tickTimer() {
+    timeRemaining = Math.max(0, Math.ceil((timerDeadline - Date.now()) / 1000));
     updateTimerDisplay();
-    
-    timerInterval = setInterval(() => {
-        timeRemaining--;
-        updateTimerDisplay();
-        
-        if (timeRemaining <= 0) {
-            endTimer();
-        }
-    }, 1000);
+    if (timeRemaining <= 0) endTimer();
 }
 
 function stopTimer() {
@@ -259,7 +293,8 @@ function stopTimer() {
 
 function endTimer() {
     stopTimer();
-    socket.emit('timer_ended', { game_id: gameId });
+    // Reserva: quem encerra a rodada é o prazo do servidor (time_up)
+    sendCommand('timer_ended');
 }
 
 function updateTimerDisplay() {
@@ -0,0 +1,136 @@
+"""
+30 Segundos v3.1 - Inicializador com Vários Workers
+
+Modo compartilhado (padrão): N processos na mesma porta, que dividem
+  - as salas do Socket.IO, por um broker pub/sub (o LocalBroker embutido
+    ou SOCKETIO_BROKER=redis://... já definido no ambiente);
+  - o estado dos jogos, pelo store SQLite compartilhado (GAME_STORE=shared).
+
+Modo shardeado (--sharded): cada worker roda numa porta interna e é dono
+das partidas do seu shard, sem estado compartilhado. Um proxy na porta
+pública encaminha cada requisição ao worker da partida.
+
+Uso:
+    python run_workers.py [--workers 4] [--port 8000] [--broker tcp://127.0.0.1:8600]
+    python run_workers.py --sharded [--workers 4] [--port 8000] [--backend-port 8100]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+import uvicorn
+
+DEFAULT_BROKER = "tcp://127.0.0.1:8600"
+
+
+def start_local_broker(url: str):
+    """Roda o LocalBroker numa thread com event loop próprio"""
+    # Importado só aqui: o pacote backend lê o ambiente já configurado
+    from backend.api.pubsub import LocalBroker
+
+    broker = LocalBroker()
+    ready = threading.Event()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(broker.start(url))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="socketio-broker", daemon=True).start()
+    ready.wait()
+    return broker
+
+
+def run_sharded(args):
+    """Sobe um uvicorn por shard e o proxy na porta pública"""
+    from backend.api.shard_proxy import ShardProxy
+
+    backends = []
+    processes = []
+    for index in range(args.workers):
+        port = args.backend_port + index
+        env = dict(os.environ, SHARD_INDEX=str(index),
+                   SHARD_COUNT=str(args.workers))
+        env.pop("SOCKETIO_BROKER", None)
+        if env.get("GAME_STORE") == "sqlite":
+            env["GAME_DB_PATH"] = os.path.join("data", f"games.{index}.db")
+
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app_with_socket",
+             "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning"],
+            env=env))
+        backends.append(("127.0.0.1", port))
+
+    proxy = ShardProxy(backends)
+
+    async def serve():
+        server = await proxy.start(args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+    # SIGTERM também derruba os workers (o finally abaixo)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    print(f"[Workers] {args.workers} shards em http://{args.host}:{args.port} "
+          f"(workers a partir da porta {args.backend_port})")
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Servidor 30 Segundos com vários workers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--broker", default=None,
+                        help="URL do broker (padrão: SOCKETIO_BROKER ou o broker local)")
+    parser.add_argument("--sharded", action="store_true",
+                        help="Um worker por shard de partidas, atrás de um proxy")
+    parser.add_argument("--backend-port", type=int, default=None,
+                        help="Primeira porta interna dos shards (padrão: port + 100)")
+    args = parser.parse_args()
+
+    if args.sharded:
+        if args.backend_port is None:
+            args.backend_port = args.port + 100
+        run_sharded(args)
+        return
+
+    broker_url = args.broker or os.environ.get("SOCKETIO_BROKER") or DEFAULT_BROKER
+
+    # Lidos pelos workers ao importar backend.main
+    os.environ["SOCKETIO_BROKER"] = broker_url
+    os.environ.setdefault("GAME_STORE", "shared")
+
+    if broker_url.startswith(("tcp://", "unix://")):
+        start_local_broker(broker_url)
+        print(f"[Workers] Broker local em {broker_url}")
+
+    print(f"[Workers] {args.workers} workers em http://{args.host}:{args.port}")
+    uvicorn.run(
+        "backend.main:app_with_socket",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Fixtures compartilhadas dos testes do backend"""
+
+import weakref
+
+import pytest
+
+from backend.services.word_service import WordService
+from backend.services.word_store import WordStore
+
+
+def small_store(words_per_level: int = 10, themes=('geral', 'cinema')) -> WordStore:
+    """Banco pequeno e determinístico: textos únicos por tema e nível"""
+    store = WordStore()
+    for theme in themes:
+        store.add_theme(theme, [(f'{theme} {level} {i}', level)
+                                for level in (1, 2, 3) for i in range(words_per_level)])
+    return store
+
+
+@pytest.fixture
+def make_word_service():
+    """WordService sobre um banco próprio (não toca no serviço global)"""
+    def factory(store: WordStore) -> WordService:
+        service = WordService()
+        service.store = store
+        service.decks.clear()
+        service._eligible = weakref.WeakValueDictionary()
+        return service
+    return factory
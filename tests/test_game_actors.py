@@ -0,0 +1,128 @@
+"""Fila de comandos por partida (GameActors)"""
+
+import asyncio
+
+import pytest
+
+from backend.api.game_actors import GameActors
+
+
+def recorder(log, name, delay=0.0):
+    async def command():
+        log.append(f'{name} start')
+        await asyncio.sleep(delay)
+        log.append(f'{name} end')
+    return command
+
+
+def test_commands_of_a_game_run_in_order():
+    async def main():
+        actors = GameActors()
+        log = []
+        # O primeiro demora mais: mesmo assim ninguém passa na frente
+        await asyncio.gather(*(
+            actors.submit('G1', None, recorder(log, i, delay=0.01 * (5 - i)))
+            for i in range(5)))
+        assert log == [entry for i in range(5) for entry in (f'{i} start', f'{i} end')]
+
+    asyncio.run(main())
+
+
+def test_games_run_in_parallel():
+    async def main():
+        actors = GameActors()
+        log = []
+        await asyncio.gather(actors.submit('G1', None, recorder(log, 'a', 0.02)),
+                             actors.submit('G2', None, recorder(log, 'b', 0)))
+        assert log == ['a start', 'b start', 'b end', 'a end']
+
+    asyncio.run(main())
+
+
+def test_duplicate_command_id_runs_once():
+    async def main():
+        actors = GameActors()
+        log = []
+        results = await asyncio.gather(
+            actors.submit('G1', 'cmd-1', recorder(log, 'first', 0.01)),
+            actors.submit('G1', 'cmd-1', recorder(log, 'again')))
+        # O repetido não roda: submit responde False na hora
+        assert results == [True, False]
+        assert log == ['first start', 'first end']
+        assert await actors.submit('G1', 'cmd-1', recorder(log, 'later')) is False
+        assert actors.stats()['duplicates'] == 2
+
+        # O mesmo id em outra partida é outro comando
+        assert await actors.submit('G2', 'cmd-1', recorder(log, 'other'))
+
+    asyncio.run(main())
+
+
+def test_failed_command_can_be_retried():
+    async def main():
+        actors = GameActors()
+
+        async def fail():
+            raise ValueError('falhou')
+
+        with pytest.raises(ValueError):
+            await actors.submit('G1', 'cmd-1', fail)
+        log = []
+        assert await actors.submit('G1', 'cmd-1', recorder(log, 'retry'))
+        assert log == ['retry start', 'retry end']
+
+    asyncio.run(main())
+
+
+def test_forget_commands_keeps_restart_id():
+    async def main():
+        actors = GameActors()
+        log = []
+        await actors.submit('G1', 'old', recorder(log, 'old'))
+        await actors.submit('G1', 'restart', recorder(log, 'restart'))
+        actors.forget_commands('G1', keep='restart')
+
+        assert await actors.submit('G1', 'old', recorder(log, 'old again'))
+        assert not await actors.submit('G1', 'restart', recorder(log, 'restart again'))
+
+    asyncio.run(main())
+
+
+def test_cancelled_command_does_not_block_queue():
+    async def main():
+        actors = GameActors()
+        log = []
+
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        waiting = asyncio.ensure_future(actors.submit('G1', 'cmd-1', cancelled))
+        queued = asyncio.ensure_future(actors.submit('G1', None, recorder(log, 'queued')))
+        for task in (waiting, queued):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        assert actors.stats()['busy'] == 0
+
+        # A fila da partida continua andando, e o comando cancelado pode ir de novo
+        assert await actors.submit('G1', 'cmd-1', recorder(log, 'next'))
+        assert log == ['next start', 'next end']
+
+    asyncio.run(main())
+
+
+def test_cancelled_drain_releases_waiters():
+    async def main():
+        actors = GameActors()
+        first = asyncio.ensure_future(actors.submit('G1', None, recorder([], 'slow', 1)))
+        second = asyncio.ensure_future(actors.submit('G1', None, recorder([], 'queued')))
+        await asyncio.sleep(0.01)
+        for task in list(actors._tasks):
+            task.cancel()
+
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+        log = []
+        assert await actors.submit('G1', None, recorder(log, 'after'))
+        assert log == ['after start', 'after end']
+
+    asyncio.run(main())
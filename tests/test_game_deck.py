@@ -0,0 +1,84 @@
+"""Baralho por jogo: permutação Feistel, esgotamento e persistência"""
+
+from array import array
+
+import pytest
+
+from backend.services.word_service import GameDeck
+from tests.conftest import small_store
+
+
+def make_deck(size: int) -> GameDeck:
+    return GameDeck((('t',), (1,)), small_store(1), array('I', range(size)))
+
+
+@pytest.mark.parametrize('size', list(range(1, 70)) + [1000, 1025, 4097])
+def test_permutation_is_bijection(size):
+    deck = make_deck(size)
+    positions = [deck._permute(i) for i in range(size)]
+    assert sorted(positions) == list(range(size))
+
+
+def test_permutation_changes_with_shuffle():
+    deck = make_deck(1000)
+    first = [deck._permute(i) for i in range(1000)]
+    deck.shuffle()
+    assert [deck._permute(i) for i in range(1000)] != first
+    assert deck.cursor == 0
+
+
+def test_draw_has_no_repeats_until_exhausted():
+    deck = make_deck(1000)
+    drawn = []
+    while deck.remaining >= 10:
+        drawn.extend(deck.draw(10))
+    assert deck.remaining == 0
+    assert sorted(drawn) == list(range(1000))
+
+
+def test_card_words_reshuffle_after_exhaustion(make_word_service):
+    # 2 temas x 1 nível x 15 palavras = 30: três cartas de 10 esgotam o baralho
+    service = make_word_service(small_store(15))
+    themes, levels = ['geral', 'cinema'], [1]
+
+    seen = []
+    for _ in range(3):
+        card = service.get_card_words('G1', themes, levels, cursed_chance=0)
+        seen.extend(w['text'] for w in card['yellow_words'] + card['blue_words'])
+    assert len(seen) == len(set(seen)) == 30
+    assert service.get_remaining_words('G1') == {'remaining': 0, 'total': 30}
+
+    card = service.get_card_words('G1', themes, levels, cursed_chance=0)
+    assert len(card['yellow_words']) == len(card['blue_words']) == 5
+    assert service.get_remaining_words('G1') == {'remaining': 20, 'total': 30}
+
+
+def test_not_enough_words_returns_none(make_word_service):
+    service = make_word_service(small_store(4, themes=('geral',)))
+    assert service.get_card_words('G1', ['geral'], [1]) is None
+
+
+def test_export_restore_round_trip(make_word_service):
+    store = small_store(20)
+    themes, levels = ['geral', 'cinema'], [1, 2]
+    original = make_word_service(store)
+    for _ in range(3):
+        original.get_card_words('G1', themes, levels)
+
+    state = original.export_pool('G1')
+    restored = make_word_service(store)
+    restored.restore_pool('G1', state)
+
+    assert restored.export_pool('G1') == state
+    assert restored.decks['G1'].draw(40) == original.decks['G1'].draw(40)
+
+
+def test_restore_ignores_state_from_other_bank(make_word_service):
+    themes, levels = ['geral'], [1]
+    original = make_word_service(small_store(20))
+    original.get_card_words('G1', themes, levels)
+    state = original.export_pool('G1')
+
+    restored = make_word_service(small_store(30))
+    restored.restore_pool('G1', state)
+    assert restored.decks['G1'].cursor == 0
@@ -0,0 +1,60 @@
+"""Códigos de partida (GameIdAllocator)"""
+
+from backend.services import game_ids
+from backend.services.game_ids import ALPHABET, GameIdAllocator, game_id_value
+
+
+def test_ids_stay_unique_past_first_width():
+    allocator = GameIdAllocator(width=1, cooldown=0)
+    ids = [allocator.allocate() for _ in range(600)]
+
+    assert len(set(ids)) == len(ids)
+    assert allocator.width > 2
+    assert {len(game_id) for game_id in ids} == {1, 2, 3}
+    assert all(char in ALPHABET for game_id in ids for char in game_id)
+    # O código decodifica para o valor do contador (o proxy depende disso)
+    assert all(0 <= game_id_value(game_id) < 32 ** len(game_id) for game_id in ids)
+
+
+def test_shard_ids_decode_to_own_shard():
+    allocator = GameIdAllocator(width=2, shard_index=2, shard_count=3)
+    for _ in range(100):
+        assert game_id_value(allocator.allocate()) % 3 == 2
+
+
+def test_taken_ids_are_skipped():
+    allocator = GameIdAllocator(width=2)
+    checked = []
+
+    def taken(game_id):
+        # Os três primeiros já existem fora do alocador
+        checked.append(game_id)
+        return len(checked) <= 3
+
+    assert allocator.allocate(taken=taken) == checked[3]
+    assert allocator.retries == 3
+
+
+def test_released_id_waits_for_cooldown(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(game_ids.time, 'monotonic', lambda: now[0])
+    # 32 códigos de 1 letra; max_load=1 deixa ocupar todos sem alargar
+    allocator = GameIdAllocator(width=1, cooldown=60, max_load=1.0)
+    ids = [allocator.allocate() for _ in range(31)]
+    released = ids[0]
+    allocator.release(released)
+
+    # Ainda em quarentena: o último código livre é outro
+    last = allocator.allocate()
+    assert last != released and last not in ids
+    assert allocator.width == 1
+
+    # Tudo ocupado ou em quarentena: o próximo código ganha uma letra
+    assert len(allocator.allocate()) == 2
+
+    allocator = GameIdAllocator(width=1, cooldown=60, max_load=1.0)
+    ids = [allocator.allocate() for _ in range(31)]
+    allocator.release(ids[0])
+    now[0] += 61
+    assert {allocator.allocate(), allocator.allocate()} == set(ALPHABET) - set(ids[1:])
+    assert allocator.width == 1
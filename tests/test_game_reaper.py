@@ -0,0 +1,42 @@
+"""Reaper de partidas (TTL de inatividade e de partida terminada)"""
+
+import time
+
+import pytest
+
+from backend.services.game_service import GameService
+from backend.services.game_store import MemoryGameStore
+
+
+@pytest.fixture
+def service():
+    service = GameService(store=MemoryGameStore())
+    service.finished_ttl = 60
+    service.idle_ttl = 3600
+    return service
+
+
+def finish(service, game):
+    game.state = 'finished'
+    service.touch(game.id)
+
+
+def test_finished_game_is_reaped_after_ttl(service):
+    game = service.create_game({'name': 'Teste'})
+    finish(service, game)
+
+    assert service.reap_expired(time.monotonic() + 30) == []
+    assert service.reap_expired(time.monotonic() + 61) == [game.id]
+    assert service.get_game(game.id) is None
+
+
+def test_restarted_game_survives_finished_ttl(service):
+    game = service.create_game({'name': 'Teste'})
+    finish(service, game)
+    service.start_game(game.id)
+
+    assert service.reap_expired(time.monotonic() + 61) == []
+    assert service.get_game(game.id) is game
+
+    # Continua sujeita ao TTL de inatividade
+    assert service.reap_expired(time.monotonic() + 3601) == [game.id]
@@ -0,0 +1,111 @@
+"""Estado compartilhado entre workers (SharedSQLiteGameStore)"""
+
+import asyncio
+
+import pytest
+
+from backend.services.game_service import GameService
+from backend.services.game_store import SharedSQLiteGameStore
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Dois serviços no mesmo banco, como dois processos"""
+    path = str(tmp_path / 'games.db')
+    services = [GameService(store=SharedSQLiteGameStore(path)) for _ in range(2)]
+    yield services
+    for service in services:
+        service.store.close()
+
+
+def test_changes_reach_other_worker(workers):
+    a, b = workers
+
+    async def main():
+        game = await a.add_game({'name': 'Teste'})
+        assert b.get_game(game.id) is None
+        assert (await b.load(game.id)).name == 'Teste'
+
+        async with b.exclusive(game.id):
+            b.start_game(game.id)
+        assert (await a.load(game.id)).state == 'playing'
+
+        async with a.exclusive(game.id):
+            a.delete_game(game.id)
+        assert await b.load(game.id) is None
+
+    asyncio.run(main())
+
+
+def test_lock_serializes_workers(workers):
+    a, b = workers
+
+    async def main():
+        game = await a.add_game({'name': 'Teste'})
+        order = []
+
+        async def change(service, name, hold):
+            async with service.exclusive(game.id):
+                order.append(f'{name} in')
+                service.start_game(game.id)
+                await asyncio.sleep(hold)
+                order.append(f'{name} out')
+
+        first = asyncio.create_task(change(a, 'a', 0.05))
+        await asyncio.sleep(0.01)
+        await change(b, 'b', 0)
+        await first
+
+        assert order == ['a in', 'a out', 'b in', 'b out']
+        assert b.store.lock_waits > 0
+        assert (await a.load(game.id)).state == 'playing'
+
+    asyncio.run(main())
+
+
+def test_stale_write_is_rejected(workers):
+    a, b = workers
+
+    async def main():
+        game = await a.add_game({'name': 'Teste'})
+        await b.load(game.id)
+
+        async with a.exclusive(game.id):
+            a.start_game(game.id)
+
+        # Sem a trava, b grava por cima de uma versão que já mudou
+        b.get_game(game.id).name = 'Outro nome'
+        b._persist(b.get_game(game.id))
+        assert not await b.commit(game.id)
+        assert b.store.conflicts == 1
+
+        reloaded = await b.load(game.id)
+        assert reloaded.name == 'Teste' and reloaded.state == 'playing'
+
+    asyncio.run(main())
+
+
+def test_client_counts_are_shared(workers):
+    a, b = workers
+
+    async def main():
+        game = await a.add_game({'name': 'Teste'})
+        assert await a.adjust_clients(game.id, 'player', 1) == 1
+        assert await b.adjust_clients(game.id, 'player', 1) == 2
+        assert await a.adjust_clients(game.id, 'player', -1) == 1
+
+    asyncio.run(main())
+
+
+def test_expired_lock_is_taken_over(workers):
+    a, b = workers
+
+    async def main():
+        game = await a.add_game({'name': 'Teste'})
+        # Trava de um worker que morreu no meio de um comando
+        await a.store.run(a.store.try_lock, game.id, 'morto', -1)
+        async with b.exclusive(game.id):
+            b.start_game(game.id)
+        assert (await a.load(game.id)).state == 'playing'
+
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+"""Estado versionado por deltas (GameStateSync + gameSync.apply do cliente)"""
+
+import copy
+
+import pytest
+
+from backend.api.state_sync import GameStateSync, diff_state, game_state
+from backend.services.game_service import GameService
+from backend.services.game_store import MemoryGameStore
+
+
+class Client:
+    """Mesmo algoritmo de gameSync.apply (frontend/src/js/game_state.js)"""
+
+    def __init__(self):
+        self.state = None
+        self.version = None
+        self.sync_requests = 0
+
+    def apply(self, patch: dict):
+        patch = copy.deepcopy(patch)
+        if 'full' in patch:
+            self.state, self.version = patch['full'], patch['v']
+            return
+        if self.state is None or patch['base'] != self.version:
+            self.sync_requests += 1
+            return
+        for path, value in patch.get('set', {}).items():
+            *keys, last = path.split('.')
+            target = self.state
+            for key in keys:
+                if not isinstance(target.get(key), dict):
+                    target[key] = {}
+                target = target[key]
+            target[last] = value
+        for path in patch.get('del', []):
+            *keys, last = path.split('.')
+            target = self.state
+            for key in keys:
+                target = target.get(key) if isinstance(target, dict) else None
+            if isinstance(target, dict):
+                target.pop(last, None)
+        self.version = patch['v']
+
+
+@pytest.fixture
+def service():
+    return GameService(store=MemoryGameStore())
+
+
+def play_round(service, game_id):
+    result = service.prepare_round(game_id)
+    round_data = service.get_game(game_id).current_round_data
+    if round_data.is_challenge:
+        return service.resolve_challenge(game_id, True)
+    if round_data.is_cursed:
+        return service.resolve_cursed(game_id, False)
+    words = [w['text'] for w in result['round']['card']['yellow_words'][:2]]
+    service.start_timer(game_id)
+    service.register_hit(game_id, words[0], False)
+    return service.confirm_round(game_id, words)
+
+
+@pytest.mark.parametrize('content_versions', [False, True])
+def test_delta_chain_matches_server_state(service, content_versions):
+    sync = GameStateSync(content_versions=content_versions)
+    game = service.create_game({'name': 'Teste', 'themes': ['geral'], 'levels': [1, 2]})
+    client = Client()
+    client.apply(sync.full(game))
+
+    service.start_game(game.id)
+    client.apply(sync.delta(game))
+    for _ in range(6):
+        play_round(service, game.id)
+        client.apply(sync.delta(game))
+
+    assert client.sync_requests == 0
+    assert client.state == game_state(game)
+    expected = dict(game.to_dict())
+    expected.pop('current_round_data')
+    assert client.state == expected
+
+
+def test_unchanged_state_keeps_version(service):
+    sync = GameStateSync()
+    game = service.create_game({'name': 'Teste'})
+    version = sync.full(game)['v']
+    assert sync.delta(game) == {'v': version, 'base': version, 'set': {}}
+
+
+def test_stale_base_requests_full_resync(service):
+    sync = GameStateSync()
+    game = service.create_game({'name': 'Teste'})
+    client = Client()
+    client.apply(sync.full(game))
+
+    service.start_game(game.id)
+    sync.delta(game)                     # perdido pelo cliente
+    play_round(service, game.id)
+    stale = sync.delta(game)
+    before = copy.deepcopy(client.state)
+
+    client.apply(stale)
+    assert client.sync_requests == 1
+    assert client.state == before
+
+    client.apply(sync.full(game))
+    assert client.state == game_state(game)
+    assert client.version == stale['v']
+
+
+def test_patch_from_other_worker_needs_same_base(service):
+    """Com content_versions a versão é o hash do estado: igual entre workers"""
+    worker_a = GameStateSync(content_versions=True)
+    worker_b = GameStateSync(content_versions=True)
+    game = service.create_game({'name': 'Teste'})
+
+    client = Client()
+    client.apply(worker_a.full(game))
+    assert worker_b.full(game)['v'] == client.version
+
+    service.start_game(game.id)
+    client.apply(worker_b.delta(game))
+    assert client.sync_requests == 0
+    assert client.state == game_state(game)
+
+    # worker_a não viu o início: o patch dele parte de outra versão
+    play_round(service, game.id)
+    worker_a_patch = worker_a.delta(game)
+    assert worker_a_patch['base'] != client.version
+    client.apply(worker_a_patch)
+    assert client.sync_requests == 1
+
+
+def test_removed_paths_are_deleted():
+    old = {'team1': {'name': 'A', 'bonus': 1}, 'extra': True, 'round': 3}
+    new = {'team1': {'name': 'A'}, 'round': 4}
+    changed, removed = diff_state(old, new)
+    assert changed == {'round': 4}
+    assert sorted(removed) == ['extra', 'team1.bonus']
+
+    client = Client()
+    client.apply({'v': 1, 'full': copy.deepcopy(old)})
+    client.apply({'v': 2, 'base': 1, 'set': changed, 'del': removed})
+    assert client.state == new
@@ -0,0 +1,58 @@
+"""Arquivos do frontend em memória (StaticCache)"""
+
+import os
+
+from backend.api.static_cache import StaticCache
+
+PAGE = '<link href="/css/app.css"><script src="/js/app.js"></script>'
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    # Avança o mtime: a mudança precisa aparecer mesmo no mesmo segundo
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def make_frontend(root):
+    (root / 'css').mkdir()
+    (root / 'js').mkdir()
+    (root / 'index.html').write_text(PAGE, encoding='utf-8')
+    (root / 'css' / 'app.css').write_text('body { color: red; }\n' * 40, encoding='utf-8')
+    (root / 'js' / 'app.js').write_text('console.log(1);\n' * 40, encoding='utf-8')
+
+
+def test_reload_rebuilds_only_changed_files(tmp_path):
+    make_frontend(tmp_path)
+    cache = StaticCache(str(tmp_path))
+    assert cache.reload()
+    css, js, page = (cache._assets[rel] for rel in ('css/app.css', 'js/app.js', 'index.html'))
+    assert 'gzip' in css.bodies
+    assert f'?v={js.version}' in page.bodies['identity'].decode()
+
+    assert not cache.reload()
+
+    write(tmp_path / 'js' / 'app.js', 'console.log(2);\n' * 40)
+    assert cache.reload()
+    assert cache._assets['css/app.css'] is css
+    new_js = cache._assets['js/app.js']
+    assert new_js is not js and new_js.version != js.version
+    # A página aponta para o hash novo
+    assert f'?v={new_js.version}' in cache._assets['index.html'].bodies['identity'].decode()
+
+
+def test_page_change_keeps_assets(tmp_path):
+    make_frontend(tmp_path)
+    cache = StaticCache(str(tmp_path))
+    cache.reload()
+    css, js, page = (cache._assets[rel] for rel in ('css/app.css', 'js/app.js', 'index.html'))
+
+    write(tmp_path / 'index.html', PAGE + '<p>novo</p>')
+    assert cache.reload()
+    assert cache._assets['css/app.css'] is css and cache._assets['js/app.js'] is js
+    assert cache._assets['index.html'] is not page
+
+    (tmp_path / 'js' / 'app.js').unlink()
+    assert cache.reload()
+    assert 'js/app.js' not in cache._assets
+    assert '?v=' + js.version not in cache._assets['index.html'].bodies['identity'].decode()
@@ -0,0 +1,51 @@
+"""Temporizadores do servidor (TimerHeap)"""
+
+import asyncio
+import logging
+import time
+
+from backend.services.timer_heap import TimerHeap
+
+
+def run_due(callback, *args):
+    """Agenda `callback` para agora e espera ele (e o que devolver) terminar"""
+    async def main():
+        timers = TimerHeap()
+        loop = asyncio.get_running_loop()
+        unretrieved = []
+        loop.set_exception_handler(lambda _loop, context: unretrieved.append(context))
+
+        timers.schedule_at('due', time.time() * 1000, callback, *args)
+        while timers.fired == 0 or timers._callbacks:
+            await asyncio.sleep(0.001)
+        timers.stop()
+        return unretrieved
+
+    return asyncio.run(main())
+
+
+async def failing():
+    raise ValueError('boom')
+
+
+def test_failing_coroutine_callback_is_logged(caplog):
+    with caplog.at_level(logging.ERROR):
+        unretrieved = run_due(failing)
+
+    assert unretrieved == []
+    assert [r.getMessage() for r in caplog.records] == ['callback_failed']
+
+
+def test_future_returned_by_callback_is_awaited_and_logged(caplog):
+    # GameService._on_deadline devolve asyncio.gather(...), que não é corrotina
+    done = []
+
+    async def listener():
+        done.append('ok')
+
+    with caplog.at_level(logging.ERROR):
+        unretrieved = run_due(lambda: asyncio.gather(listener(), failing()))
+
+    assert done == ['ok']
+    assert unretrieved == []
+    assert [r.getMessage() for r in caplog.records] == ['callback_failed']
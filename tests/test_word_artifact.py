@@ -0,0 +1,95 @@
+"""Artefato compilado dos bancos: validade em relação aos JSON"""
+
+import json
+import os
+
+from backend.services.word_artifact import build_artifact, is_fresh, load_artifact
+
+
+def write_bank(folder, theme, words):
+    path = folder / f'{theme}.json'
+    path.write_text(json.dumps([{'word': w, 'level': 1} for w in words]), encoding='utf-8')
+    return path
+
+
+def make_banks(tmp_path):
+    data = tmp_path / 'word_banks'
+    data.mkdir()
+    write_bank(data, 'geral', ['Casa', 'Carro', 'Praia'])
+    write_bank(data, 'cinema', ['Filme', 'Ator'])
+    artifact = tmp_path / 'word_banks.bin'
+    build_artifact(data, artifact)
+    return data, artifact
+
+
+def test_artifact_round_trip(tmp_path):
+    data, artifact = make_banks(tmp_path)
+    store, _ = load_artifact(artifact)
+    assert sorted(store.themes) == ['cinema', 'geral']
+    assert sorted(store.theme_words('geral')) == ['Carro', 'Casa', 'Praia']
+    assert is_fresh(artifact, data)
+
+
+def test_new_bank_invalidates_artifact(tmp_path):
+    data, artifact = make_banks(tmp_path)
+    write_bank(data, 'esporte', ['Bola'])
+    # Mesmo com o artefato "mais novo" que o arquivo adicionado
+    os.utime(data / 'esporte.json', ns=(0, 0))
+    assert not is_fresh(artifact, data)
+
+
+def test_removed_or_edited_bank_invalidates_artifact(tmp_path):
+    data, artifact = make_banks(tmp_path)
+    (data / 'cinema.json').unlink()
+    assert not is_fresh(artifact, data)
+
+    (tmp_path / 'edited').mkdir()
+    data, artifact = make_banks(tmp_path / 'edited')
+    write_bank(data, 'geral', ['Casa'])
+    os.utime(data / 'geral.json', ns=(0, 0))
+    assert not is_fresh(artifact, data)
+
+
+def test_touching_sources_keeps_artifact(tmp_path):
+    data, artifact = make_banks(tmp_path)
+    for path in data.iterdir():
+        os.utime(path)
+    assert is_fresh(artifact, data)
+
+
+
+def load_service(data):
+    from backend.services.word_service import WordService
+
+    service = WordService.__new__(WordService)
+    service._sources = WordService._scan_sources(data)
+    return service
+
+
+def store_contents(store):
+    return {theme: sorted(zip(store.theme_words(theme), store.levels[r.start:r.stop]))
+            for theme, r in store.themes.items()}
+
+
+def test_artifact_and_json_build_the_same_store(tmp_path):
+    data = tmp_path / 'word_banks'
+    data.mkdir()
+    (data / 'geral.json').write_text(json.dumps([
+        {'word': '  Casa   de  praia ', 'level': 1},
+        {'word': 'Casa de praia', 'level': 2},
+        {'word': 'Carro', 'level': 999},
+        {'word': 'Bo\x00la', 'level': 1},
+        'Praia',
+    ]), encoding='utf-8')
+    # Nenhuma palavra válida: o tema não entra em nenhum dos dois
+    (data / 'vazio.json').write_text(json.dumps([{'word': 'X', 'level': 300}]),
+                                     encoding='utf-8')
+    build_artifact(data, tmp_path / 'word_banks.bin')
+
+    service = load_service(data)
+    from_json = service._build_store(data)
+    from_artifact = service._load_artifact(data)
+
+    assert from_artifact is not None
+    assert store_contents(from_json) == store_contents(from_artifact) == {
+        'geral': [('Casa de praia', 1), ('Praia', 1)]}